@@ -0,0 +1,88 @@
+"""
+Per-query cost of src.database.get_db before and after connection pooling.
+Runs against a throwaway database, so your voice_ai.db is never touched.
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import database
+
+ROUNDS = 2000
+
+
+@contextmanager
+def unpooled_db():
+    """The original get_db: a fresh default-journal connection per call."""
+    conn = sqlite3.connect(database.DB_PATH, timeout=10.0)
+    conn.row_factory = sqlite3.Row
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def read_query(get_db):
+    with get_db() as conn:
+        conn.execute(
+            "SELECT role, content FROM memory WHERE user_id = ? ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (1, 3),
+        ).fetchall()
+
+
+def write_query(get_db):
+    with get_db() as conn:
+        conn.execute(
+            "INSERT INTO memory (user_id, role, content) VALUES (?, ?, ?)",
+            (1, "user", "benchmark turn"),
+        )
+        conn.commit()
+
+
+def time_per_query(fn, get_db, rounds=ROUNDS):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(get_db)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def run(label, get_db):
+    read_us = time_per_query(read_query, get_db)
+    write_us = time_per_query(write_query, get_db, rounds=ROUNDS // 4)
+    print(f"{label:<28} read: {read_us:>8.1f} us   write+commit: {write_us:>8.1f} us")
+
+
+def fresh_database(tmp, name, journal_mode):
+    """Point src.database at a new seeded database file."""
+    database.close_db_pool()
+    database.DB_PATH = os.path.join(tmp, name)
+    database.init_db()
+    for _ in range(200):
+        write_query(database.get_db)
+    database.close_db_pool()
+    conn = sqlite3.connect(database.DB_PATH)
+    conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        print("=" * 72)
+        print("NOVA DATABASE MICROBENCHMARK")
+        print("=" * 72)
+
+        fresh_database(tmp, "before.db", "DELETE")
+        run("before (connect per call)", unpooled_db)
+
+        fresh_database(tmp, "after.db", "WAL")
+        run("after (pooled, WAL)", database.get_db)
+
+        print("=" * 72)
+        database.close_db_pool()
@@ -0,0 +1,168 @@
+"""
+End-to-end latency benchmark for the voice loop, without a mic or speakers.
+Replays WAV fixtures through src.replay.FileCapture into voice_engine.listen,
+answers with stand-in STT (stt.ScriptedTranscriber), LLM
+(replay.ScriptedResponder) and TTS (tts.FakeSynthesizer), and plays the
+answer into replay.FileSink. Per-stage latency:
+    listen              - speech end -> listen() returns the transcript
+    llm_first_sentence  - transcript -> first sentence from the responder
+    tts_first_audio     - first sentence -> first audio written to the sink
+    end_to_end          - speech end -> first audio of the answer
+Fixtures are 16 kHz mono WAV files. <name>.json may give {"speech_end":
+seconds, "text": transcript}; otherwise speech end is estimated from the
+energy envelope.
+Run: python benchmarks/bench_e2e.py [fixtures_dir] [report.json]
+Without a directory, synthetic fixtures are generated. The p50/p95/p99
+report is printed as JSON, and also written to report.json if given.
+"""
+
+import sys
+import os
+import glob
+import json
+import queue
+import shutil
+import tempfile
+import time
+import wave
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import voice_engine
+from src.replay import FileCapture, FileSink, ScriptedResponder, read_wav
+from src.stt import ScriptedTranscriber
+from src.tts import FakeSynthesizer
+
+RATE = 16000
+STT_DELAY = 0.25  # recognition time of the stand-in STT after the endpoint
+ANSWER = ["It is half past four.", "Anything else?"]
+STAGES = ("listen", "llm_first_sentence", "tts_first_audio", "end_to_end")
+
+
+def _syllables(seconds, rng):
+    """Voiced bursts with short gaps, roughly the rhythm of a spoken command."""
+    t = np.arange(int(seconds * RATE)) / RATE
+    pitch = rng.uniform(100, 220)
+    voice = sum(np.sin(2 * np.pi * pitch * h * t) / h for h in range(1, 12))
+    envelope = np.clip(np.sin(np.pi * rng.uniform(3.5, 5.5) * t), 0, None) ** 0.5
+    return voice * envelope
+
+
+def make_synthetic_fixtures(root, rng, count=10):
+    os.makedirs(root, exist_ok=True)
+    for i in range(count):
+        lead, speech = rng.uniform(0.3, 0.8), rng.uniform(0.8, 1.8)
+        clip = np.concatenate([np.zeros(int(lead * RATE)), _syllables(speech, rng) * 6000])
+        clip += rng.uniform(30, 300) * rng.standard_normal(len(clip))
+        path = os.path.join(root, f"command_{i}.wav")
+        with wave.open(path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(RATE)
+            f.writeframes(np.clip(clip, -32768, 32767).astype("<i2").tobytes())
+        with open(path[:-4] + ".json", "w", encoding="utf-8") as f:
+            json.dump({"speech_end": lead + speech, "text": "what time is it"}, f)
+
+
+def _label(path):
+    """Return (speech_end seconds, transcript) for a fixture."""
+    label = {}
+    if os.path.exists(path[:-4] + ".json"):
+        with open(path[:-4] + ".json", "r", encoding="utf-8") as f:
+            label = json.load(f)
+    if "speech_end" not in label:
+        pcm, rate = read_wav(path)
+        samples = np.frombuffer(pcm, dtype="<i2").astype(np.float32)
+        hop = rate // 100
+        frames = samples[:len(samples) // hop * hop].reshape(-1, hop)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        label["speech_end"] = (np.flatnonzero(rms > rms.max() * 0.1)[-1] + 1) * hop / rate
+    return label["speech_end"], label.get("text", "what time is it")
+
+
+def run_fixture(path, capture, sink, transcriber, responder):
+    """Replay one fixture through listen -> respond -> speak; returns {stage: seconds} or None."""
+    speech_end, transcriber.text = _label(path)
+    end_pos = capture.queue(path) + int(speech_end * RATE) * 2
+
+    text = voice_engine.listen(skip_wake_word=True)
+    heard = time.monotonic()
+    if not text:
+        return None
+    spoken_end = capture.time_of(end_pos)
+
+    sink.mark()
+    sentences, first = queue.Queue(), []
+
+    def on_sentence(sentence):
+        if not first:
+            first.append(time.monotonic())
+        sentences.put(sentence)
+
+    speech = voice_engine.say_stream(iter(sentences.get, None))
+    try:
+        responder("bench", text, on_sentence)
+    finally:
+        sentences.put(None)
+    speech.result()
+
+    return {
+        "listen": heard - spoken_end,
+        "llm_first_sentence": first[0] - heard,
+        "tts_first_audio": sink.first_audio - first[0],
+        "end_to_end": sink.first_audio - spoken_end,
+    }
+
+
+def _percentiles(values):
+    ms = np.array(values) * 1000
+    return {f"p{p}": round(float(np.percentile(ms, p)), 1) for p in (50, 95, 99)}
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("NOVA END-TO-END LATENCY BENCHMARK")
+    print("=" * 60)
+
+    synthetic = len(sys.argv) < 2
+    root = tempfile.mkdtemp(prefix="nova_e2e_") if synthetic else sys.argv[1]
+    if synthetic:
+        make_synthetic_fixtures(root, np.random.default_rng(5))
+        print("Using synthetic fixtures")
+
+    capture, sink = FileCapture(RATE), FileSink()
+    capture.start()
+    transcriber = ScriptedTranscriber(delay=STT_DELAY)
+    voice_engine.set_capture(capture)
+    voice_engine.set_audio_sink(sink)
+    voice_engine.set_transcriber(transcriber)
+    voice_engine.set_synthesizer(FakeSynthesizer(sample_rate=24000))
+    responder = ScriptedResponder(ANSWER)
+
+    paths = sorted(glob.glob(os.path.join(root, "*.wav")))
+    results = {stage: [] for stage in STAGES}
+    missed = 0
+    for path in paths:
+        timings = run_fixture(path, capture, sink, transcriber, responder)
+        if timings is None:
+            missed += 1
+            continue
+        for stage, seconds in timings.items():
+            results[stage].append(seconds)
+    capture.stop()
+
+    report = {
+        "fixtures": len(paths),
+        "missed": missed,
+        "stages_ms": {stage: _percentiles(values) for stage, values in results.items() if values},
+    }
+    print(json.dumps(report, indent=2))
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    print("=" * 60)
+
+    if synthetic:
+        shutil.rmtree(root)
@@ -0,0 +1,76 @@
+"""
+Throughput benchmark for the local intent router.
+Run this to see how many utterances per second try_local_logic can route,
+and that adding more fast-path intents does not slow every command down.
+"""
+
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.intents import INTENTS, IntentRouter
+
+CORPUS = [
+    "who are you",
+    "tell me about yourself",
+    "who created you",
+    "what version are you running",
+    "what can you do",
+    "open chrome and search for python tutorials",
+    "search for the best laptops 2024",
+    "search",
+    "what's the weather in London",
+    "what is the temperature outside",
+    "open calculator",
+    "launch visual studio code",
+    "start whatsapp",
+    "open the",
+    "what time is it",
+    "what's today's date",
+    "what day is it today",
+    "how far away is the moon",
+    "explain how photosynthesis works in simple terms",
+    "can you recommend a good book about history",
+    "tell me a joke about programmers",
+    "why is the sky blue",
+    "what is the capital of australia",
+    "how many ounces are in a pound",
+]
+
+
+def _synthetic_intents(count):
+    """Extra intents with unique trigger phrases, as if the table had grown."""
+    return [
+        {"name": f"extra_{i}", "any": [f"custom command {i}", f"shortcut number {i}"]}
+        for i in range(count)
+    ]
+
+
+def run_benchmark(router, rounds=2000):
+    """Return utterances routed per second over the corpus."""
+    match = router.match
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for utterance in CORPUS:
+            match(utterance)
+    elapsed = time.perf_counter() - start
+    return rounds * len(CORPUS) / elapsed
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("NOVA INTENT ROUTER BENCHMARK")
+    print("=" * 60)
+
+    for extra in (0, 100, 1000):
+        router = IntentRouter(INTENTS + _synthetic_intents(extra))
+        rate = run_benchmark(router)
+        print(
+            f"{len(router.intents):>5} intents: {rate:>12,.0f} utterances/s "
+            f"({1e6 / rate:.2f} us each)"
+        )
+
+    print("=" * 60)
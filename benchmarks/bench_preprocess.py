@@ -0,0 +1,59 @@
+"""
+Throughput benchmark for the pre-recognition audio stage (src.preprocess).
+Streams noisy synthetic speech through Preprocessor in microphone-sized
+chunks (1024 frames) at common device rates, and reports:
+    throughput  - seconds of audio processed per CPU-second
+    payload     - bytes out / bytes in (what STT receives vs. the raw capture)
+Run: python benchmarks/bench_preprocess.py [seconds_of_audio]
+"""
+
+import sys
+import os
+import time
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.preprocess import Preprocessor
+
+RATES = (16000, 44100, 48000)
+CHUNK = 1024  # frames per microphone read, as in src.audio_capture
+SAMPLE_WIDTH = 2
+
+
+def _speech(rate, seconds, rng):
+    """Harmonic bursts over room noise with a DC offset, as a cheap mic would capture."""
+    t = np.arange(int(seconds * rate)) / rate
+    voice = sum(np.sin(2 * np.pi * 150 * h * t) / h for h in range(1, 12))
+    envelope = np.clip(np.sin(np.pi * 4.5 * t), 0, None) ** 0.5
+    clip = voice * envelope * 4000 + 200 * rng.standard_normal(len(t)) + 300
+    return np.clip(clip, -32768, 32767).astype("<i2").tobytes()
+
+
+def measure(rate, seconds, rng):
+    """Return (audio seconds per CPU-second, output bytes / input bytes)."""
+    pcm = _speech(rate, seconds, rng)
+    step = CHUNK * SAMPLE_WIDTH
+    chunks = [pcm[i:i + step] for i in range(0, len(pcm), step)]
+    preprocessor = Preprocessor(rate)
+    out = 0
+    start = time.process_time()
+    for chunk in chunks:
+        out += len(preprocessor.process(chunk))
+    used = time.process_time() - start
+    return seconds / used, out / len(pcm)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("NOVA AUDIO PREPROCESSING THROUGHPUT BENCHMARK")
+    print("=" * 60)
+
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 60.0
+    rng = np.random.default_rng(3)
+    print(f"Audio per rate: {seconds:.0f} s in {CHUNK}-frame chunks")
+    for rate in RATES:
+        throughput, payload = measure(rate, seconds, rng)
+        print(f"{rate:>6} Hz -> 16 kHz: {throughput:8.0f} s audio / CPU-s   payload x{payload:.2f}")
+    print("=" * 60)
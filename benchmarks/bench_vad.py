@@ -0,0 +1,151 @@
+"""
+End-of-utterance latency benchmark for the voice activity detector.
+For each WAV fixture (one spoken command followed by a few seconds of
+room noise), measures how long after speech ends each endpointer hands
+the audio to speech-to-text:
+    VAD     - src.vad.record_utterance (adaptive floor + hangover)
+    legacy  - speech_recognition's listen() with pause_threshold = 2.0
+Speech end is taken from <name>.json ({"speech_end": seconds}) when present,
+otherwise estimated from the clip's energy envelope.
+Run: python benchmarks/bench_vad.py [fixtures_dir]
+Without a directory, synthetic noisy fixtures are generated.
+"""
+
+import sys
+import os
+import glob
+import json
+import shutil
+import tempfile
+import time
+import wave
+import numpy as np
+import speech_recognition as sr
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.vad import VoiceActivityDetector, record_utterance
+
+RATE = 16000
+
+
+class _CountingStream:
+    """Wraps an AudioSource stream to record how much audio the endpointer consumed."""
+
+    def __init__(self, stream, sample_width):
+        self.stream = stream
+        self.sample_width = sample_width
+        self.frames = 0
+
+    def read(self, size):
+        data = self.stream.read(size)
+        self.frames += len(data) // self.sample_width
+        return data
+
+
+def _syllables(seconds, rng):
+    """Voiced bursts with short gaps, roughly the rhythm of a spoken command."""
+    t = np.arange(int(seconds * RATE)) / RATE
+    pitch = rng.uniform(100, 220)
+    voice = sum(np.sin(2 * np.pi * pitch * h * t) / h for h in range(1, 12))
+    rate = rng.uniform(3.5, 5.5)
+    envelope = np.clip(np.sin(np.pi * rate * t), 0, None) ** 0.5
+    return voice * envelope
+
+
+def make_synthetic_fixtures(root, rng, count=12):
+    os.makedirs(root, exist_ok=True)
+    for i in range(count):
+        noise_level = rng.uniform(30, 400)
+        lead, speech, tail = rng.uniform(0.3, 1.0), rng.uniform(0.8, 2.5), 3.0
+        clip = np.concatenate([np.zeros(int(lead * RATE)), _syllables(speech, rng) * 6000, np.zeros(int(tail * RATE))])
+        clip += noise_level * rng.standard_normal(len(clip))
+        path = os.path.join(root, f"command_{i}.wav")
+        with wave.open(path, "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(RATE)
+            f.writeframes(np.clip(clip, -32768, 32767).astype("<i2").tobytes())
+        with open(path[:-4] + ".json", "w", encoding="utf-8") as f:
+            json.dump({"speech_end": lead + speech}, f)
+
+
+def _speech_end(path):
+    label = path[:-4] + ".json"
+    if os.path.exists(label):
+        with open(label, "r", encoding="utf-8") as f:
+            return json.load(f)["speech_end"]
+    with wave.open(path, "rb") as f:
+        rate = f.getframerate()
+        samples = np.frombuffer(f.readframes(f.getnframes()), dtype="<i2").astype(np.float32)
+    hop = rate // 100
+    frames = samples[:len(samples) // hop * hop].reshape(-1, hop)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    loud = np.flatnonzero(rms > rms.max() * 0.1)
+    return (loud[-1] + 1) * hop / rate
+
+
+def _endpoint(path, listen):
+    """Return (seconds of audio consumed when the endpointer returned, CPU seconds used)."""
+    with sr.AudioFile(path) as source:
+        counter = _CountingStream(source.stream, source.SAMPLE_WIDTH)
+        source.stream = counter
+        start = time.process_time()
+        try:
+            listen(source)
+        except sr.WaitTimeoutError:
+            pass
+        return counter.frames / source.SAMPLE_RATE, time.process_time() - start
+
+
+def _vad_listen(vad):
+    return lambda source: record_utterance(source, vad, phrase_time_limit=12)
+
+
+def _legacy_listen(path):
+    recognizer = sr.Recognizer()
+    with sr.AudioFile(path) as source:
+        recognizer.adjust_for_ambient_noise(source, duration=0.3)
+    recognizer.pause_threshold = 2.0
+    return lambda source: recognizer.listen(source, phrase_time_limit=12)
+
+
+def _summary(latencies):
+    values = np.array(latencies) * 1000
+    return f"p50 {np.percentile(values, 50):7.0f} ms   max {values.max():7.0f} ms"
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("NOVA END-OF-UTTERANCE LATENCY BENCHMARK")
+    print("=" * 60)
+
+    synthetic = len(sys.argv) < 2
+    root = tempfile.mkdtemp(prefix="nova_vad_") if synthetic else sys.argv[1]
+    if synthetic:
+        make_synthetic_fixtures(root, np.random.default_rng(11))
+        print("Using synthetic fixtures")
+
+    paths = sorted(glob.glob(os.path.join(root, "*.wav")))
+    results = {"VAD": [], "legacy": []}
+    cpu = audio = 0.0
+    for path in paths:
+        end = _speech_end(path)
+        with sr.AudioFile(path) as source:
+            vad = VoiceActivityDetector(source.SAMPLE_RATE)
+        consumed, used = _endpoint(path, _vad_listen(vad))
+        results["VAD"].append(consumed - end)
+        cpu += used
+        audio += consumed
+        consumed, _ = _endpoint(path, _legacy_listen(path))
+        results["legacy"].append(consumed - end)
+
+    print(f"Fixtures: {len(paths)}")
+    for name, latencies in results.items():
+        print(f"{name:>8}: {_summary(latencies)}")
+    print(f"VAD CPU per second of audio: {cpu / audio * 1000:.2f} ms")
+    print("=" * 60)
+
+    if synthetic:
+        shutil.rmtree(root)
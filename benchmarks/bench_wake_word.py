@@ -0,0 +1,149 @@
+"""
+Benchmark for the offline wake-word spotter.
+Measures CPU seconds spent per second of audio while scanning a stream,
+and the false-accept / false-reject rates at a range of thresholds.
+
+Fixtures are 16-bit mono WAV files laid out as:
+    <dir>/enroll/*.wav    recordings of "Nova" used as templates
+    <dir>/positive/*.wav  clips that contain the wake word
+    <dir>/negative/*.wav  clips that do not
+Run: python benchmarks/bench_wake_word.py [fixtures_dir]
+Without a directory, synthetic voiced fixtures are generated so the
+script still measures CPU cost (the accuracy numbers are then only a
+smoke test).
+"""
+
+import sys
+import os
+import glob
+import time
+import wave
+import shutil
+import tempfile
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.wake_word import WakeWordDetector, template_from_audio
+
+RATE = 16000
+CHUNK = 1024
+THRESHOLDS = (0.1, 0.15, 0.2, 0.25, 0.3)
+
+
+def _voiced(formants, seconds, pitch, rng):
+    """A crude vowel sequence: harmonics shaped by moving formant peaks, plus breath noise."""
+    t = np.arange(int(seconds * RATE)) / RATE
+    f0 = pitch * (1 + 0.05 * np.sin(2 * np.pi * 3 * t))
+    phase = 2 * np.pi * np.cumsum(f0) / RATE
+    track = np.interp(t, np.linspace(0, seconds, len(formants)), np.arange(len(formants)))
+    signal = np.zeros_like(t)
+    for h in range(1, 30):
+        freq = h * f0
+        gain = np.zeros_like(t)
+        for column in np.array(formants).T:
+            centre = np.interp(track, np.arange(len(column)), column)
+            gain += np.exp(-((freq - centre) / 120.0) ** 2)
+        signal += gain * np.sin(h * phase)
+    signal += 0.05 * rng.standard_normal(len(t))
+    envelope = np.minimum(1, np.minimum(t, seconds - t) / 0.05)
+    return signal * envelope
+
+
+def _to_pcm(signal, level=8000):
+    signal = signal / (np.abs(signal).max() or 1.0) * level
+    return signal.astype("<i2").tobytes()
+
+
+def _write_wav(path, pcm):
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(RATE)
+        f.writeframes(pcm)
+
+
+def make_synthetic_fixtures(root, rng):
+    nova = [(300, 900), (500, 1000), (700, 1200), (650, 1100)]
+    others = [
+        [(300, 2300), (400, 2000), (700, 1200)],
+        [(700, 1200), (300, 800), (300, 2300)],
+        [(500, 1500), (600, 1800), (400, 2000), (300, 900)],
+    ]
+    silence = np.zeros(int(0.5 * RATE))
+    for kind in ("enroll", "positive", "negative"):
+        os.makedirs(os.path.join(root, kind), exist_ok=True)
+    for i in range(3):
+        word = _voiced(nova, rng.uniform(0.45, 0.6), rng.uniform(100, 130), rng)
+        _write_wav(os.path.join(root, "enroll", f"{i}.wav"), _to_pcm(np.concatenate([silence, word, silence])))
+    for i in range(10):
+        word = _voiced(nova, rng.uniform(0.4, 0.7), rng.uniform(95, 140), rng)
+        clip = np.concatenate([silence, 0.02 * rng.standard_normal(RATE), word, silence])
+        _write_wav(os.path.join(root, "positive", f"{i}.wav"), _to_pcm(clip))
+    for i in range(10):
+        words = [_voiced(others[(i + k) % len(others)], rng.uniform(0.3, 0.6), rng.uniform(95, 140), rng) for k in range(3)]
+        clip = np.concatenate([silence] + [np.concatenate([w, silence * 0.2]) for w in words])
+        _write_wav(os.path.join(root, "negative", f"{i}.wav"), _to_pcm(clip))
+
+
+def _read_wav(path):
+    with wave.open(path, "rb") as f:
+        if f.getnchannels() != 1 or f.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit mono")
+        return f.readframes(f.getnframes()), f.getframerate()
+
+
+def _scan(detector, pcm):
+    """Feed a clip chunk by chunk; return the lowest DTW score seen and the CPU time used."""
+    detector.reset()
+    best = float("inf")
+    start = time.process_time()
+    for offset in range(0, len(pcm), CHUNK * 2):
+        detector.process(pcm[offset:offset + CHUNK * 2])
+        if detector.last_score is not None:
+            best = min(best, detector.last_score)
+    return best, time.process_time() - start
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("NOVA WAKE WORD BENCHMARK")
+    print("=" * 60)
+
+    synthetic = len(sys.argv) < 2
+    if not synthetic:
+        root = sys.argv[1]
+    else:
+        root = tempfile.mkdtemp(prefix="nova_wake_")
+        make_synthetic_fixtures(root, np.random.default_rng(7))
+        print("Using synthetic fixtures")
+
+    enroll = [_read_wav(p) for p in sorted(glob.glob(os.path.join(root, "enroll", "*.wav")))]
+    rate = enroll[0][1]
+    templates = [template_from_audio(pcm, r) for pcm, r in enroll]
+    detector = WakeWordDetector(templates, sample_rate=rate, threshold=-1.0)
+
+    scores = {}
+    cpu = audio = 0.0
+    for kind in ("positive", "negative"):
+        scores[kind] = []
+        for path in sorted(glob.glob(os.path.join(root, kind, "*.wav"))):
+            pcm, _ = _read_wav(path)
+            best, used = _scan(detector, pcm)
+            scores[kind].append(best)
+            cpu += used
+            audio += len(pcm) / 2 / rate
+
+    print(f"Templates: {len(templates)}, audio scanned: {audio:.1f}s")
+    print(f"CPU per second of audio: {cpu / audio * 1000:.2f} ms ({audio / cpu:,.0f}x real time)")
+    print("-" * 60)
+    print(f"{'threshold':>10} {'false accept':>14} {'false reject':>14}")
+    for threshold in THRESHOLDS:
+        fa = np.mean([s <= threshold for s in scores["negative"]])
+        fr = np.mean([s > threshold for s in scores["positive"]])
+        print(f"{threshold:>10.2f} {fa:>13.0%} {fr:>14.0%}")
+    print("=" * 60)
+
+    if synthetic:
+        shutil.rmtree(root)
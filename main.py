@@ -9,12 +9,19 @@ if sys.platform == 'win32':
     sys.stderr = io.StringIO()
 
 import json
+import queue
 import threading
 import webview
 from src.auth import login_user, signup_user
-from src.ai_engine import generate_response
-from src.voice_engine import listen, speak, listen_for_wake_word
-from src.database import ensure_db
+from src.ai_engine import (
+    generate_response_stream, cancel_generation, warm_up, is_model_ready, semantic_memory, STOCK_REPLIES
+)
+from src.voice_engine import (
+    listen, say, say_stream, listen_for_wake_and_command, interrupt_speech, precache_phrases
+)
+from src.speech_queue import PRIORITY_GREETING
+from src.database import ensure_db, close_db_pool
+from src.memory import load_user_memory, evict_user_memory, flush_memory
 
 SESSION_FILE = os.path.join(os.path.dirname(__file__), "session.json")
 
@@ -27,6 +34,7 @@ class API:
         self.email = None
         self.name = None
         self.is_scanning = False
+        self._speech = None  # Future of the answer currently being spoken
         self.window = None
         self._load_session()
 
@@ -61,9 +69,15 @@ class API:
         except Exception:
             pass
 
+    def _load_user_context(self):
+        """Warm the user's recent-memory buffer and semantic index."""
+        load_user_memory(self.user_id)
+        semantic_memory.prime(self.user_id)
+
     def get_session(self):
         """Return current session for auto-login."""
         if self.user_id and self.email:
+            self._load_user_context()
             return {
                 "success": True,
                 "user_id": self.user_id,
@@ -81,16 +95,16 @@ class API:
                 self.email = res["email"]
                 self.name = res.get("name")
                 self._save_session()
+                self._load_user_context()
 
                 # Choose a friendly display name (prefer stored name, otherwise email without digits)
                 raw_id = self.name or self.email.split("@")[0]
                 clean_id = "".join(ch for ch in raw_id if not ch.isdigit())
                 clean_id = clean_id or raw_id
 
-                threading.Thread(
-                    target=speak,
-                    args=(f"Authorization confirmed. Welcome back, {clean_id}",),
-                ).start()
+                # Dropped if an answer is ready before the greeting gets its turn
+                say(f"Authorization confirmed. Welcome back, {clean_id}", priority=PRIORITY_GREETING)
+                threading.Thread(target=self.warm_up_engine, daemon=True).start()
             return res
         except (ValueError, TypeError, KeyError) as e:
             return {"success": False, "message": f"Encryption Error: {str(e)}"}
@@ -104,6 +118,8 @@ class API:
 
     def logout(self):
         """Handle user logout and clear session."""
+        if self.user_id:
+            evict_user_memory(self.user_id)
         self.user_id = None
         self.email = None
         self._clear_session()
@@ -122,6 +138,7 @@ class API:
             if user:
                 self.user_id = user["id"]
                 self.email = user["email"]
+                self._load_user_context()
                 return {"success": True}
             return {"success": False}
         except (ValueError, TypeError, KeyError) as e:
@@ -133,64 +150,111 @@ class API:
             if not self.user_id:
                 return {"status": "error", "message": "Not authenticated"}
 
-            user_input = listen(skip_wake_word=True)
+            user_input = listen(skip_wake_word=True, on_partial=self._show_partial)
 
             if user_input == "READY_STATUS":
                 return {"status": "calibrating"}
 
             if user_input:
-                if self.window:
-                    self.window.evaluate_js(
-                        f'window.updateStatus("processing", {json.dumps(user_input)})'
-                    )
-
-                ai_result = generate_response(self.user_id, user_input)
-                ai_response = ai_result["text"]
-                action = ai_result["action"]
-
-                threading.Thread(
-                    target=self._speak_with_stream, args=(ai_response,)
-                ).start()
-
-                return {
-                    "status": "responding",
-                    "user_input": user_input,
-                    "ai_response": ai_response,
-                    "action": action,
-                }
+                return self._respond(user_input)
 
             return {"status": "idle"}
         except Exception as e:
             print(f"Voice Session Error: {e}")
             return {"status": "error", "message": str(e)}
     
+    def _respond(self, user_input):
+        """Generate and speak the reply to a recognized command."""
+        # A new command supersedes whatever NOVA is still saying
+        self._speech = None
+        interrupt_speech()
+        if self.window:
+            self.window.evaluate_js(
+                f'window.updateStatus("processing", {json.dumps(user_input)})'
+            )
+
+        # Sentences are spoken as soon as the model finishes them
+        sentences = queue.Queue()
+        speech = say_stream(
+            iter(sentences.get, None), word_callback=self._stream_words, barge_in=True
+        )
+        self._speech = speech
+        speech.add_done_callback(self._finish_speaking)
+        try:
+            ai_result = generate_response_stream(
+                self.user_id, user_input, sentences.put
+            )
+        finally:
+            sentences.put(None)
+        ai_response = ai_result["text"]
+        action = ai_result["action"]
+
+        return {
+            "status": "responding",
+            "user_input": user_input,
+            "ai_response": ai_response,
+            "action": action,
+        }
+
     def start_wake_word_listener(self):
-        """Start listening for wake word 'Nova'."""
+        """Start listening for wake word 'Nova', plus a command in the same phrase."""
         try:
             if not self.user_id:
                 return {"status": "error", "message": "Not authenticated"}
-            
-            if listen_for_wake_word():
+
+            detected, command = listen_for_wake_and_command(on_partial=self._show_partial)
+            if command:
+                # "Nova, open chrome": answer straight away, no second round trip or capture
+                return self._respond(command)
+            if detected:
                 return {"status": "wake_word_detected"}
             return {"status": "no_wake_word"}
         except Exception as e:
             print(f"Wake word error: {e}")
             return {"status": "error", "message": str(e)}
 
-    def _speak_with_stream(self, text):
-        """Speak text and stream words to UI."""
-
-        def stream_callback(word, index, total):
-            if self.window:
-                if index == 0:
-                    self.window.evaluate_js("window.startResponding()")
-                if index == total - 1:
-                    self.window.evaluate_js("window.finishResponding()")
-                self.window.evaluate_js(
-                    f"window.streamWord({json.dumps(word)}, {index}, {total})"
-                )
+    def get_engine_status(self):
+        """Return whether the AI model has been warmed up."""
+        return {"ready": is_model_ready()}
+
+    def warm_up_engine(self):
+        """Load the AI model in the background and report readiness to the UI."""
+        ready = warm_up()
+        if self.window:
+            try:
+                self.window.evaluate_js(f"window.setEngineStatus({json.dumps(ready)})")
+            except Exception:
+                pass
 
-        speak(text, word_callback=stream_callback)
+    def _show_partial(self, text):
+        """Show the live transcript while the user is still speaking."""
+        if self.window:
+            self.window.evaluate_js(f"window.showPartial({json.dumps(text)})")
+
+    def _stream_words(self, batch):
+        """Push a batch of spoken words to the UI, in sync with the audio."""
+        if self.window:
+            # One evaluate_js per batch; the first batch also switches the UI to responding
+            script = f"window.streamWords({json.dumps(batch)})"
+            if batch[0][1] == 0:
+                script = "window.startResponding(); " + script
+            self.window.evaluate_js(script)
+
+    def _finish_speaking(self, speech):
+        """Wrap up the UI once an answer has been spoken, cut off, or dropped."""
+        if speech is not self._speech:
+            return  # superseded by a newer command, which now owns the UI
+        outcome = speech.result()
+        if outcome != "done":
+            # Nobody is listening to the rest of this answer
+            cancel_generation(self.user_id)
+
+        if self.window:
+            if outcome == "barge_in":
+                # The user talked over NOVA: go straight to capturing their command
+                self.window.evaluate_js("window.bargeIn()")
+            else:
+                self.window.evaluate_js("window.finishResponding()")
 
 
 def start_reloader():
@@ -242,7 +306,12 @@ def start_app():
         resizable=True,
     )
     api.window = window
+    threading.Thread(target=api.warm_up_engine, daemon=True).start()
+    threading.Thread(target=precache_phrases, args=(STOCK_REPLIES,), daemon=True).start()
     webview.start(debug=False)
+    flush_memory()
+    semantic_memory.flush()
+    close_db_pool()
 
 
 if __name__ == "__main__":
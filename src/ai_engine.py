@@ -2,8 +2,14 @@
 
 import re
 import datetime
-from src.database import get_db
+from threading import Event, Lock
+from src.memory import get_memory, save_memory
 from src.actions import execute_system_command
+from src.intents import match_intent
+from src.response_cache import response_cache, context_hash
+from src.llm_context import ContextStore
+from src.semantic_memory import SemanticMemory, OllamaEmbedder
+from src.scheduler import GenerationScheduler, GenerationCancelled, PRIORITY_VOICE, PRIORITY_TEXT
 from src.logger import logger
 
 # --- NOVA Identity ---
@@ -16,6 +22,16 @@ NOVA_INFO = {
     "tech": "Python, Ollama (llama3.2:1b), Edge-TTS, SQLite"
 }
 
+_NOVA_REPLIES = {
+    "identity": f"I am {NOVA_INFO['name']}, an AI voice assistant created by {NOVA_INFO['developer']} that runs completely offline.",
+    "creator": f"I was created by {NOVA_INFO['developer']}.",
+    "version": f"I am running version {NOVA_INFO['version']}.",
+    "features": "I can open apps, search the web, and answer questions, all running locally on your computer.",
+}
+
+# Fixed replies worth pre-synthesizing for instant playback
+STOCK_REPLIES = list(_NOVA_REPLIES.values()) + ["Search failed.", "Weather lookup failed."]
+
 SYSTEM_PROMPT = (
     "You are NOVA, an AI voice assistant created by Usman Bajwa. "
     "Respond in ONE concise sentence. Be helpful and direct. "
@@ -26,34 +42,22 @@ SYSTEM_PROMPT = (
     "Do NOT make up information. Do NOT use ACTION tags for questions."
 )
 
-_ACTION_RE = re.compile(r"\[ACTION:([a-zA-Z0-9_]+):([^\]]+)\]")
-_STOP_WORDS = {"for", "about", "this", "that", "the", "a", "an"}
+MODEL_NAME = "llama3.2:1b"
+_OLLAMA_OPTIONS = {"temperature": 0.4, "num_predict": 60, "top_p": 0.9, "repeat_penalty": 1.2}
+KEEP_ALIVE = "30m"
+_FALLBACK_TEXT = "I cannot respond right now. Please try again."
+_CACHE_CONTEXT = context_hash(MODEL_NAME, sorted(_OLLAMA_OPTIONS.items()), SYSTEM_PROMPT)
+_CONTEXTS = ContextStore(context_hash(MODEL_NAME, SYSTEM_PROMPT))
 
+_CLIENT = None
+_CLIENT_LOCK = Lock()
+_MODEL_READY = Event()
+_SCHEDULER = GenerationScheduler()
 
-# --- Memory Logic ---
-def get_memory(user_id, limit=3):
-    try:
-        with get_db() as conn:
-            rows = conn.execute(
-                "SELECT role, content FROM memory WHERE user_id = ? ORDER BY timestamp DESC LIMIT ?",
-                (user_id, limit),
-            ).fetchall()
-        return [{"role": r["role"], "content": r["content"]} for r in reversed(rows)]
-    except Exception as e:
-        logger.error(f"Memory fetch failed: {e}")
-        return []
-
-
-def save_memory(user_id, role, content):
-    try:
-        with get_db() as conn:
-            conn.execute(
-                "INSERT INTO memory (user_id, role, content) VALUES (?, ?, ?)",
-                (user_id, role, content),
-            )
-            conn.commit()
-    except Exception as e:
-        logger.error(f"Memory save failed: {e}")
+_ACTION_RE = re.compile(r"\[ACTION:([a-zA-Z0-9_]+):([^\]]+)\]")
+_SENTENCE_END_RE = re.compile(r"[.!?]\s+")
+_ROLE_MARKERS = ("user:", "assistant:", "nova:", "human:")
+_STOP_WORDS = {"for", "about", "this", "that", "the", "a", "an"}
 
 
 def _clean_search_query(query):
@@ -63,78 +67,42 @@ def _clean_search_query(query):
     return " ".join(cleaned) if cleaned else query
 
 
-def _handle_nova_questions(cmd):
-    """Handle questions about NOVA without using AI."""
-    if any(q in cmd for q in ["who are you", "what are you", "about yourself", "who is nova", "what is nova"]):
-        return True, f"I am {NOVA_INFO['name']}, an AI voice assistant created by {NOVA_INFO['developer']} that runs completely offline.", None
-    
-    if any(q in cmd for q in ["who made you", "who created you", "who developed you", "your developer", "your creator"]):
-        return True, f"I was created by {NOVA_INFO['developer']}.", None
-    
-    if "your version" in cmd or "what version" in cmd:
-        return True, f"I am running version {NOVA_INFO['version']}.", None
-    
-    if "what can you do" in cmd or "your features" in cmd or "your capabilities" in cmd:
-        return True, f"I can open apps, search the web, and answer questions, all running locally on your computer.", None
-    
-    return False, None, None
-
-
 def try_local_logic(user_input):
     """Fast path for common commands without AI."""
-    raw = user_input.strip()
-    cmd = raw.lower()
+    intent, slots = match_intent(user_input)
 
-    # Check NOVA identity questions first
-    handled, text, action = _handle_nova_questions(cmd)
-    if handled:
-        return True, text, action
-
-    # Combined: open chrome and search
-    if "open chrome" in cmd and "search" in cmd:
-        try:
-            after_search = cmd.split("search", 1)[1].strip()
-            search_query = _clean_search_query(after_search)
-            success, msg = execute_system_command("search", search_query)
-            text = f"Searching for {search_query}." if success else "Search failed."
-            return True, text, {"type": "search", "target": search_query, "success": success}
-        except Exception as e:
-            logger.error(f"Chrome+search failed: {e}")
-
-    # General search
-    search_match = re.search(r"\bsearch(?: for)?\s+(.+)", cmd)
-    if search_match:
-        raw_query = search_match.group(1).strip()
-        search_query = _clean_search_query(raw_query)
+    # NOVA identity questions
+    if intent in _NOVA_REPLIES:
+        return True, _NOVA_REPLIES[intent], None
+
+    # Combined "open chrome and search", or a general search
+    if intent in ("chrome_search", "search"):
+        search_query = _clean_search_query(slots["query"])
         success, msg = execute_system_command("search", search_query)
         text = f"Searching for {search_query}." if success else "Search failed."
         return True, text, {"type": "search", "target": search_query, "success": success}
 
     # Weather queries
-    if any(word in cmd for word in ["weather", "temperature"]):
-        location = user_input.split(" in ", 1)[1].strip() if " in " in cmd else "your location"
+    if intent == "weather":
+        location = slots["location"]
         query = f"weather in {location}"
         success, msg = execute_system_command("search", query)
         text = f"Showing weather for {location}." if success else "Weather lookup failed."
         return True, text, {"type": "search", "target": query, "success": success}
 
-    # App launching - with validation to prevent false positives
-    open_matches = list(re.finditer(r"\b(?:open|launch|start)\s+([a-zA-Z0-9 ._-]+)", cmd))
-    if open_matches:
-        app_name = open_matches[-1].group(1).strip().split(" and ")[0].strip()
-        # Filter out common false positives
-        invalid_apps = {"name", "the", "a", "an", "it", "that", "this", "from", "to", "of", "in", "on", "at"}
-        if app_name not in invalid_apps and len(app_name) > 2:
-            success, msg = execute_system_command("open_app", app_name)
-            return True, msg, {"type": "open_app", "target": app_name, "success": success}
+    # App launching (false positives are rejected by the router)
+    if intent == "open_app":
+        app_name = slots["app"]
+        success, msg = execute_system_command("open_app", app_name)
+        return True, msg, {"type": "open_app", "target": app_name, "success": success}
 
     # Time/date queries
-    if any(word in cmd for word in ["what time", "current time", "time is it", "what date", "today's date", "what day"]):
+    if intent == "time":
         now = datetime.datetime.now()
         parts = []
-        if "time" in cmd:
+        if slots["time"]:
             parts.append(f"the time is {now.strftime('%I:%M %p')}")
-        if "date" in cmd or "day" in cmd or "today" in cmd:
+        if slots["date"]:
             parts.append(f"today is {now.strftime('%A, %B %d, %Y')}")
         text = " and ".join(parts).capitalize() + "."
         return True, text, None
@@ -142,49 +110,202 @@ def try_local_logic(user_input):
     return False, None, None
 
 
-def _call_ollama(prompt):
-    """Call Ollama AI model for response generation."""
+# --- Ollama Client ---
+def get_client():
+    """Return the shared Ollama client, creating it on first use.
+
+    The client keeps its HTTP connection pool open, so every request after the
+    first skips the import and connection setup.
+    """
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            import ollama
+            _CLIENT = ollama.Client()
+        return _CLIENT
+
+
+def warm_up():
+    """Load the model with a tiny priming request so the first real query runs at steady-state speed."""
     try:
-        import ollama
-        logger.info("Calling Ollama...")
-        resp = ollama.generate(
-            model="llama3.2:1b",
-            prompt=prompt,
-            options={"temperature": 0.4, "num_predict": 60, "top_p": 0.9, "repeat_penalty": 1.2},
+        logger.info(f"Warming up {MODEL_NAME}...")
+        get_client().generate(
+            model=MODEL_NAME,
+            prompt="hi",
+            options={"num_predict": 1},
+            keep_alive=KEEP_ALIVE,
         )
-        return resp["response"].strip()
+        _MODEL_READY.set()
+        logger.info("Model ready.")
+    except Exception as e:
+        logger.error(f"Model warm-up failed: {e}")
+        return False
+    # Recall embeds every model turn's input, so load the embedding model too
+    if semantic_memory.warm_up():
+        logger.info("Embedding model ready.")
+    return True
+
+
+def is_model_ready():
+    """True once a warm-up request has completed."""
+    return _MODEL_READY.is_set()
+
+
+# Past turns are recalled by meaning; tests can swap in HashingEmbedder via set_embedder
+semantic_memory = SemanticMemory(OllamaEmbedder(get_client, keep_alive=KEEP_ALIVE))
+
+
+def _stream_ollama(user_id, prompt_args):
+    """Yield response tokens from Ollama as they are generated."""
+    logger.info("Streaming from Ollama...")
+    for chunk in get_client().generate(
+        model=MODEL_NAME,
+        stream=True,
+        options=_OLLAMA_OPTIONS,
+        keep_alive=KEEP_ALIVE,
+        **prompt_args,
+    ):
+        if chunk.get("done"):
+            _CONTEXTS.put(user_id, chunk.get("context"))
+        yield chunk["response"]
+
+
+def _submit_generation(user_id, prompt_args, priority):
+    """Queue a streamed generation on the scheduler; identical prompts share one job."""
+    key = context_hash(MODEL_NAME, prompt_args["prompt"], prompt_args.get("context"))
+    return _SCHEDULER.submit(
+        key,
+        lambda: _stream_ollama(user_id, prompt_args),
+        owner=user_id,
+        priority=priority,
+    )
+
+
+def _call_ollama(user_id, prompt_args, priority=PRIORITY_TEXT):
+    """Call Ollama AI model for response generation; returns (text, completed)."""
+    job = _submit_generation(user_id, prompt_args, priority)
+    try:
+        return "".join(job.stream()).strip(), True
+    except GenerationCancelled:
+        raise
     except Exception as e:
         logger.error(f"Ollama error: {e}")
-        return "I cannot respond right now. Please try again."
+        return _FALLBACK_TEXT, False
 
 
-def generate_response(user_id, user_input):
-    """Generate AI response with local bypass optimization."""
-    if not user_id:
-        return {"text": "Authentication error.", "action": None}
+def cancel_generation(user_id):
+    """Stop the user's in-flight generation (e.g. when they start speaking again)."""
+    _SCHEDULER.cancel(user_id)
 
-    # Fast path: local logic bypass
-    handled, local_text, local_action = try_local_logic(user_input)
-    if handled:
-        save_memory(user_id, "user", user_input)
-        save_memory(user_id, "assistant", local_text)
-        return {"text": local_text, "action": local_action}
 
-    # AI path: build context and call Ollama
+def _iter_sentences(tokens):
+    """Group streamed tokens into complete sentences.
+
+    Stops at the first role marker (e.g. "User:") so hallucinated dialogue
+    turns are never emitted, and never splits inside an [ACTION:...] tag.
+    """
+    buffer = ""
+    for token in tokens:
+        buffer += token
+
+        lowered = buffer.lower()
+        hits = [i for i in (lowered.find(m) for m in _ROLE_MARKERS) if i >= 0]
+        if hits:
+            buffer = buffer[: buffer.rfind("\n", 0, min(hits)) + 1]
+            break
+
+        start = 0
+        for match in _SENTENCE_END_RE.finditer(buffer):
+            if buffer.count("[", start, match.end()) > buffer.count("]", start, match.end()):
+                continue
+            sentence = buffer[start : match.start() + 1].strip()
+            start = match.end()
+            if sentence:
+                yield sentence
+        buffer = buffer[start:]
+
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def _recall_block(user_id, user_input):
+    """Older turns relevant to the input, formatted for the prompt."""
+    recalled = semantic_memory.recall(user_id, user_input)
+    if not recalled:
+        return ""
+    return "Relevant past conversation:\n" + "\n".join(recalled) + "\n\n"
+
+
+def _build_prompt(user_id, user_input):
+    """Build the full Ollama prompt from the system prompt, recalled and recent memory."""
     history = get_memory(user_id, limit=2)
     context = "\n".join([f"{h['role']}: {h['content']}" for h in history])
-    full_prompt = f"{SYSTEM_PROMPT}\n\nRecent context:\n{context}\n\nUser: {user_input}\nNOVA:"
-    
-    ai_text = _call_ollama(full_prompt)
-    
+    recall = _recall_block(user_id, user_input)
+    return f"{SYSTEM_PROMPT}\n\n{recall}Recent context:\n{context}\n\nUser: {user_input}\nNOVA:"
+
+
+def _prompt_args(user_id, user_input):
+    """Prompt arguments for ollama.generate, continuing the user's KV context if one exists.
+
+    With a stored context the model has already evaluated the system prompt and
+    earlier turns, so only the new input is sent.
+    """
+    context = _CONTEXTS.get(user_id)
+    if context:
+        recall = _recall_block(user_id, user_input)
+        return {"prompt": f"{recall}User: {user_input}\nNOVA:", "context": context}
+    return {"prompt": _build_prompt(user_id, user_input)}
+
+
+def _cache_context(user_id):
+    """Everything besides the input that shapes an answer: model settings and the user.
+
+    The conversation is deliberately left out, so a repeated question hits;
+    follow-ups that depend on it bypass the cache instead (see response_cache).
+    """
+    return context_hash(_CACHE_CONTEXT, user_id)
+
+
+def _drop_context(user_id):
+    """Forget the user's KV context; the next prompt is rebuilt from memory."""
+    if _CONTEXTS.get(user_id):
+        _CONTEXTS.reset(user_id)
+
+
+def _remember_bypassed_turn(user_id, user_input, reply):
+    """Persist a turn answered without the model (fast path or cache).
+
+    The model's KV context does not contain this turn, so it is dropped;
+    the next prompt is rebuilt with recent context, which includes it.
+    """
+    _drop_context(user_id)
+    _remember_turn(user_id, user_input, reply)
+
+
+def _remember_turn(user_id, user_input, reply):
+    """Persist a completed turn to memory and the semantic index."""
+    save_memory(user_id, "user", user_input)
+    save_memory(user_id, "assistant", reply)
+    semantic_memory.add_turn(user_id, user_input, reply)
+
+
+def _finalize_response(user_id, user_input, ai_text, cache_context, completed=True, cut_short=False):
+    """Clean the raw model text, run any action tag and persist the turn.
+
+    A reply cut short by a failed stream is returned but neither cached nor
+    remembered. Whenever the reply was cut short or cleaned, the stored KV
+    context no longer matches the turn as remembered, so it is dropped.
+    """
     # Clean response
     lines = ai_text.split("\n")
     clean_lines = []
     for line in lines:
-        if any(x in line.lower() for x in ["user:", "assistant:", "nova:", "human:"]):
+        if any(x in line.lower() for x in _ROLE_MARKERS):
             break
         clean_lines.append(line)
     ai_text = " ".join(clean_lines).strip()
+    if cut_short or not completed or len(clean_lines) < len(lines):
+        _drop_context(user_id)
 
     # Parse and execute actions
     action_result = None
@@ -197,6 +318,106 @@ def generate_response(user_id, user_input):
         if not success:
             ai_text = f"I tried to {act_type} {act_target}, but it's not available."
 
-    save_memory(user_id, "user", user_input)
-    save_memory(user_id, "assistant", ai_text)
+    if not completed:
+        return {"text": ai_text, "action": action_result}
+
+    # Only plain answers are reusable; actions must run every time
+    if action_result is None and ai_text and ai_text != _FALLBACK_TEXT:
+        response_cache.put(user_input, cache_context, ai_text)
+
+    _remember_turn(user_id, user_input, ai_text)
     return {"text": ai_text, "action": action_result}
+
+
+def generate_response(user_id, user_input):
+    """Generate AI response with local bypass optimization."""
+    if not user_id:
+        return {"text": "Authentication error.", "action": None}
+
+    # A newer utterance supersedes whatever this user asked before
+    cancel_generation(user_id)
+
+    # Fast path: local logic bypass
+    handled, local_text, local_action = try_local_logic(user_input)
+    if handled:
+        _remember_bypassed_turn(user_id, user_input, local_text)
+        return {"text": local_text, "action": local_action}
+
+    # Cached answer to the same standalone question from this user
+    cache_context = _cache_context(user_id)
+    cached = response_cache.get(user_input, cache_context)
+    if cached is not None:
+        _remember_bypassed_turn(user_id, user_input, cached)
+        return {"text": cached, "action": None}
+
+    # AI path: call Ollama
+    prompt_args = _prompt_args(user_id, user_input)
+    try:
+        ai_text, completed = _call_ollama(user_id, prompt_args)
+    except GenerationCancelled:
+        _drop_context(user_id)
+        return {"text": "", "action": None}
+    return _finalize_response(user_id, user_input, ai_text, cache_context, completed)
+
+
+def generate_response_stream(user_id, user_input, on_sentence):
+    """Generate an AI response, handing each sentence to on_sentence as soon as it is complete.
+
+    Action tags are stripped from the streamed sentences and executed on the
+    assembled text once generation finishes. Returns the same result dict as
+    generate_response.
+    """
+    if not user_id:
+        on_sentence("Authentication error.")
+        return {"text": "Authentication error.", "action": None}
+
+    cancel_generation(user_id)
+
+    # Fast path: local logic bypass
+    handled, local_text, local_action = try_local_logic(user_input)
+    if handled:
+        on_sentence(local_text)
+        _remember_bypassed_turn(user_id, user_input, local_text)
+        return {"text": local_text, "action": local_action}
+
+    # Cached answer to the same standalone question from this user
+    cache_context = _cache_context(user_id)
+    cached = response_cache.get(user_input, cache_context)
+    if cached is not None:
+        on_sentence(cached)
+        _remember_bypassed_turn(user_id, user_input, cached)
+        return {"text": cached, "action": None}
+
+    # AI path: stream tokens and emit sentences as they complete
+    prompt_args = _prompt_args(user_id, user_input)
+    job = _submit_generation(user_id, prompt_args, PRIORITY_VOICE)
+    sentences = []
+    raw = []
+    completed = False
+    try:
+        for sentence in _iter_sentences(raw.append(t) or t for t in job.stream()):
+            sentences.append(sentence)
+            spoken = _ACTION_RE.sub("", sentence).strip()
+            if spoken:
+                on_sentence(spoken)
+        completed = True
+    except GenerationCancelled:
+        logger.info("Generation superseded by a newer request.")
+        _drop_context(user_id)
+        return {"text": " ".join(sentences), "action": None}
+    except Exception as e:
+        logger.error(f"Ollama error: {e}")
+        if not sentences:
+            sentences.append(_FALLBACK_TEXT)
+            on_sentence(_FALLBACK_TEXT)
+    finally:
+        # Stops the job if we stopped reading early (e.g. at a role marker)
+        _SCHEDULER.release(job, user_id)
+
+    # _iter_sentences stops reading at a hallucinated role marker, which cancels the job
+    cut_short = any(m in "".join(raw).lower() for m in _ROLE_MARKERS)
+    result = _finalize_response(user_id, user_input, " ".join(sentences), cache_context, completed, cut_short)
+    action = result["action"]
+    if action and not action["success"]:
+        on_sentence(result["text"])
+    return result
@@ -0,0 +1,220 @@
+"""Persistent microphone capture for NOVA.
+
+A single background thread reads the microphone into a fixed-size ring
+buffer for as long as the app runs. Recognizers read from the ring through
+``RingSource``, a ``speech_recognition`` audio source. Back-to-back
+wake-word and command listens therefore never reopen the device, and each
+listen can start a short pre-roll before the moment it was called, so the
+first syllable is not lost.
+"""
+
+from threading import Condition, Thread
+import pyaudio
+import speech_recognition as sr
+from src.logger import logger
+
+SAMPLE_WIDTH = 2
+CHUNK = 1024
+BUFFER_SECONDS = 30
+PREROLL_SECONDS = 0.5
+
+
+class AudioRing:
+    """Preallocated byte ring addressed by absolute position; one writer, many readers."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self.written = 0  # total bytes ever written
+        self.error = None
+        self.closed = False
+        self._cond = Condition()
+
+    @property
+    def oldest(self):
+        """Absolute position of the oldest byte still held."""
+        return max(0, self.written - self.capacity)
+
+    def write(self, data):
+        data = memoryview(data)
+        with self._cond:
+            skipped = max(0, len(data) - self.capacity)
+            data = data[skipped:]
+            start = (self.written + skipped) % self.capacity
+            first = min(len(data), self.capacity - start)
+            self._view[start:start + first] = data[:first]
+            self._view[:len(data) - first] = data[first:]
+            self.written += skipped + len(data)
+            self._cond.notify_all()
+
+    def close(self, error=None):
+        with self._cond:
+            self.closed = True
+            self.error = error
+            self._cond.notify_all()
+
+    def read(self, pos, size):
+        """Return (data, next_pos) with up to size bytes from pos, waiting for new audio.
+
+        A reader that fell more than a buffer behind skips ahead to the oldest
+        byte still held. Returns empty data once the ring is closed.
+        """
+        with self._cond:
+            while pos >= self.written and not self.closed:
+                self._cond.wait()
+            if self.error is not None:
+                raise self.error
+            pos = max(pos, self.oldest)
+            size = min(size, self.written - pos)
+            start = pos % self.capacity
+            first = min(size, self.capacity - start)
+            data = bytes(self._view[start:start + first]) + bytes(self._view[:size - first])
+        return data, pos + size
+
+
+class _RingStream:
+    """File-like view of the ring for speech_recognition (reads whole chunks, in frames).
+
+    skip is an optional (start, end) span of ring positions that reads jump over.
+    """
+
+    def __init__(self, ring, pos, skip=None):
+        self.ring = ring
+        self.pos = pos
+        self.skip = skip
+
+    def read(self, frames):
+        wanted = frames * SAMPLE_WIDTH
+        parts = []
+        while wanted > 0:
+            size = wanted
+            if self.skip is not None:
+                skip_start, skip_end = self.skip
+                if skip_start <= self.pos < skip_end:
+                    self.pos = skip_end
+                elif self.pos < skip_start:
+                    size = min(size, skip_start - self.pos)
+            data, self.pos = self.ring.read(self.pos, size)
+            if not data:
+                break
+            parts.append(data)
+            wanted -= len(data)
+        return b"".join(parts)
+
+
+class RingSource(sr.AudioSource):
+    """speech_recognition audio source that reads the shared capture ring from a given position."""
+
+    def __init__(self, capture, pos, consume=True, skip=None):
+        self.capture = capture
+        self.pos = pos
+        self.consume = consume
+        self.skip = skip  # (start, end) ring positions left out of the audio, e.g. a beep
+        self.SAMPLE_RATE = capture.sample_rate
+        self.SAMPLE_WIDTH = SAMPLE_WIDTH
+        self.CHUNK = capture.chunk
+        self.stream = None
+
+    def __enter__(self):
+        self.stream = _RingStream(self.capture.ring, self.pos, self.skip)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Later listens start after what this one consumed, so a phrase is never heard twice
+        if self.consume:
+            self.capture.consumed = max(self.capture.consumed, self.stream.pos)
+        self.stream = None
+
+
+class MicrophoneCapture:
+    """Keeps one PyAudio input stream open and feeds it into an AudioRing.
+
+    Pass audio to open the stream on a shared PyAudio instance (it is then
+    left running on stop); otherwise the capture creates and owns its own.
+    With a preprocess.Preprocessor, chunks are converted before they enter
+    the ring, and sample_rate is the preprocessor's output rate rather
+    than the device's.
+    """
+
+    def __init__(self, device_index, sample_rate, chunk=CHUNK, seconds=BUFFER_SECONDS, audio=None,
+                 preprocessor=None):
+        self.device_index = device_index
+        self.device_rate = sample_rate
+        self.preprocessor = preprocessor
+        self.sample_rate = preprocessor.output_rate if preprocessor else sample_rate
+        self.chunk = chunk
+        self.ring = AudioRing(int(self.sample_rate * seconds) * SAMPLE_WIDTH)
+        self.consumed = 0
+        self._shared_audio = audio
+        self._audio = None
+        self._stream = None
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Open the device (raising OSError on failure) and start the capture thread."""
+        self._audio = self._shared_audio or pyaudio.PyAudio()
+        try:
+            self._stream = self._audio.open(
+                format=pyaudio.paInt16,
+                channels=1,
+                rate=self.device_rate,
+                input=True,
+                input_device_index=self.device_index,
+                frames_per_buffer=self.chunk,
+            )
+        except Exception:
+            if self._shared_audio is None:
+                self._audio.terminate()
+            self._audio = None
+            raise
+        self._running = True
+        self._thread = Thread(target=self._run, name="mic-capture", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        error = None
+        try:
+            while self._running:
+                data = self._stream.read(self.chunk, exception_on_overflow=False)
+                if self.preprocessor is not None:
+                    data = self.preprocessor.process(data)
+                self.ring.write(data)
+        except (OSError, IOError) as e:
+            logger.error(f"Microphone capture stopped: {e}")
+            error = e
+        finally:
+            self.ring.close(error)
+
+    @property
+    def alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self):
+        """Stop capturing and release the device."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        try:
+            if self._stream is not None:
+                self._stream.stop_stream()
+                self._stream.close()
+        except (OSError, IOError):
+            pass
+        if self._audio is not None and self._shared_audio is None:
+            self._audio.terminate()
+        self._stream = self._audio = None
+        self.ring.close()
+
+    def source(self, preroll=PREROLL_SECONDS, start=None, consume=True):
+        """Return an audio source starting preroll seconds back, but never before unconsumed audio.
+
+        start overrides that with an explicit ring position (e.g. where a
+        barge-in began). Sources opened with consume=False only observe,
+        so later listens still hear what they read.
+        """
+        if start is None:
+            preroll_bytes = int(preroll * self.sample_rate) * SAMPLE_WIDTH
+            start = max(self.consumed, self.ring.written - preroll_bytes)
+        return RingSource(self, max(start, self.ring.oldest), consume)
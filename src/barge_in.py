@@ -0,0 +1,98 @@
+"""Barge-in detection for NOVA.
+
+While NOVA speaks, ``BargeInMonitor`` watches the shared microphone
+capture and calls back once the user has talked over it for BARGE_IN_MS.
+The speakers leak into the microphone, so a frame only counts as the user
+when it is louder than both thresholds below:
+
+- the VAD's noise floor plus its margin;
+- the echo expected from the audio just played, plus ECHO_MARGIN_DB.
+
+The echo path's gain (mic level minus playback level) starts at a
+conservative 0 dB. It is learned from frames where NOVA is audible and
+the user is not.
+"""
+
+import time
+from collections import deque
+from threading import Lock, Thread
+import numpy as np
+from src.vad import MIN_FLOOR_DB
+
+BARGE_IN_MS = 200
+ECHO_MARGIN_DB = 10.0
+REFERENCE_SECONDS = 0.3  # playback this recent may still be reaching the mic
+COUPLING_RATE = 0.05
+MIN_COUPLING_DB = -60.0
+PREROLL_SECONDS = 0.3
+
+
+def _level_db(pcm):
+    samples = np.frombuffer(pcm, dtype="<i2").astype(np.float32)
+    return 10.0 * np.log10(np.mean(samples * samples) + 1e-9) if len(samples) else -90.0
+
+
+class BargeInMonitor(Thread):
+    """Watches the mic during playback; on_barge_in() fires once when the user talks over NOVA."""
+
+    def __init__(self, capture, vad, on_barge_in, coupling_db=0.0):
+        super().__init__(name="barge-in", daemon=True)
+        self.capture = capture
+        self.vad = vad
+        self.on_barge_in = on_barge_in
+        self.coupling_db = coupling_db
+        self.onset_pos = None  # ring position just before the user started talking
+        self._onset_frames = max(1, BARGE_IN_MS * vad.sample_rate // 1000 // vad.frame_length)
+        self._reference = deque()
+        self._lock = Lock()
+        self._running = True
+
+    def played(self, pcm):
+        """Record the level of audio just sent to the speakers (called by the player)."""
+        now = time.monotonic()
+        with self._lock:
+            self._reference.append((now, _level_db(pcm)))
+            while self._reference and self._reference[0][0] < now - REFERENCE_SECONDS:
+                self._reference.popleft()
+
+    def _reference_db(self):
+        with self._lock:
+            return max((db for _, db in self._reference), default=None)
+
+    def stop(self):
+        self._running = False
+
+    def run(self):
+        frame_bytes = self.vad.frame_length * 2
+        run = 0
+        with self.capture.source(preroll=0, consume=False) as source:
+            while self._running:
+                start = source.stream.pos
+                chunk = source.stream.read(source.CHUNK)
+                if not chunk or not self._running:
+                    return
+                samples = np.frombuffer(chunk, dtype="<i2").astype(np.float32)
+                energies = self.vad.frame_energies(samples)
+
+                floor = (self.vad.noise_floor or MIN_FLOOR_DB) + self.vad.margin_db
+                reference = self._reference_db()
+                threshold = floor
+                if reference is not None:
+                    threshold = max(floor, reference + self.coupling_db + ECHO_MARGIN_DB)
+
+                for i, energy in enumerate(energies):
+                    if energy > threshold:
+                        run += 1
+                    else:
+                        run = 0
+                        if reference is not None and energy > floor:
+                            # NOVA audible, user silent: learn how loud the echo is
+                            self.coupling_db += (energy - reference - self.coupling_db) * COUPLING_RATE
+                            self.coupling_db = min(max(self.coupling_db, MIN_COUPLING_DB), 0.0)
+                    if run >= self._onset_frames:
+                        onset = start + (i + 1 - run) * frame_bytes
+                        preroll = int(PREROLL_SECONDS * self.vad.sample_rate) * 2
+                        self.onset_pos = max(0, onset - preroll)
+                        self._running = False
+                        self.on_barge_in()
+                        return
@@ -3,18 +3,69 @@
 import os
 import sqlite3
 from contextlib import contextmanager
+from threading import Lock
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "..", "voice_ai.db")
 
+POOL_SIZE = 8
+STATEMENT_CACHE_SIZE = 256
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA mmap_size=67108864",
+    "PRAGMA temp_store=MEMORY",
+)
+
+_POOL = {}
+_POOL_LOCK = Lock()
+
+
+def _connect(path):
+    """Open a tuned connection: WAL lets readers run alongside the memory writer."""
+    conn = sqlite3.connect(
+        path,
+        timeout=10.0,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
+    conn.row_factory = sqlite3.Row
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
 
 @contextmanager
 def get_db():
-    """Get a database connection with row factory."""
-    conn = sqlite3.connect(DB_PATH, timeout=10.0)
-    conn.row_factory = sqlite3.Row
+    """Borrow a pooled database connection with row factory."""
+    path = DB_PATH
+    with _POOL_LOCK:
+        idle = _POOL.setdefault(path, [])
+        conn = idle.pop() if idle else None
+    if conn is None:
+        conn = _connect(path)
+
     try:
         yield conn
     finally:
+        # Match the old close-per-call behaviour: uncommitted work is discarded
+        if conn.in_transaction:
+            conn.rollback()
+        with _POOL_LOCK:
+            idle = _POOL.setdefault(path, [])
+            if len(idle) < POOL_SIZE:
+                idle.append(conn)
+                conn = None
+        if conn is not None:
+            conn.close()
+
+
+def close_db_pool():
+    """Close every idle pooled connection (called on shutdown)."""
+    with _POOL_LOCK:
+        connections = [conn for idle in _POOL.values() for conn in idle]
+        _POOL.clear()
+    for conn in connections:
         conn.close()
 
 
@@ -53,11 +104,49 @@ def init_db():
         """
         )
 
+        # Covers the recent-memory query including its id tie-break, so it needs no sort
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_memory_user_recent
+            ON memory(user_id, timestamp DESC, id DESC)
+        """
+        )
+
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """
+        )
+
+        conn.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_response_cache_last_used
+            ON response_cache(last_used)
+        """
+        )
+
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_context (
+                user_id INTEGER PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                context BLOB NOT NULL,
+                updated_at REAL NOT NULL,
+                FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+            )
+        """
+        )
+
         conn.commit()
 
 
 def ensure_db():
     """Ensure database exists and is properly initialized."""
-    if not os.path.exists(DB_PATH):
-        init_db()
+    # Every statement is idempotent, so existing databases pick up new tables too
+    init_db()
     return True
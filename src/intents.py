@@ -0,0 +1,150 @@
+"""Intent routing module for NOVA's local fast path.
+
+Intents are declared in a table and compiled once at import into a
+word-level Aho-Corasick automaton. A single pass over the utterance finds
+every trigger phrase; the highest-priority intent whose triggers are all
+present then extracts its slots with its own pre-compiled pattern.
+"""
+
+import re
+from collections import deque
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_SEARCH_RE = re.compile(r"\bsearch(?: for)?\s+(.+)")
+_OPEN_RE = re.compile(r"\b(?:open|launch|start)\s+([a-zA-Z0-9 ._-]+)")
+_INVALID_APPS = {"name", "the", "a", "an", "it", "that", "this", "from", "to", "of", "in", "on", "at"}
+
+
+# --- Slot extractors: (cmd, raw) -> dict of slots, or None to reject ---
+def _chrome_search_slots(cmd, raw):
+    return {"query": cmd.split("search", 1)[1].strip()}
+
+
+def _search_slots(cmd, raw):
+    match = _SEARCH_RE.search(cmd)
+    if not match:
+        return None
+    return {"query": match.group(1).strip()}
+
+
+def _weather_slots(cmd, raw):
+    if " in " not in cmd:
+        return {"location": "your location"}
+    return {"location": raw[cmd.index(" in ") + 4 :].strip()}
+
+
+def _open_app_slots(cmd, raw):
+    matches = _OPEN_RE.findall(cmd)
+    if not matches:
+        return None
+    app_name = matches[-1].strip().split(" and ")[0].strip()
+    if app_name in _INVALID_APPS or len(app_name) <= 2:
+        return None
+    return {"app": app_name}
+
+
+def _time_slots(cmd, raw):
+    return {
+        "time": "time" in cmd,
+        "date": "date" in cmd or "day" in cmd or "today" in cmd,
+    }
+
+
+# Ordered by priority: the first intent whose triggers match (and whose slot
+# extractor accepts the input) wins. "any" lists alternative phrases; every
+# entry in "all" must also be present.
+INTENTS = [
+    {"name": "identity", "any": ["who are you", "what are you", "about yourself", "who is nova", "what is nova"]},
+    {"name": "creator", "any": ["who made you", "who created you", "who developed you", "your developer", "your creator"]},
+    {"name": "version", "any": ["your version", "what version"]},
+    {"name": "features", "any": ["what can you do", "your features", "your capabilities"]},
+    {"name": "chrome_search", "any": ["open chrome"], "all": ["search"], "slots": _chrome_search_slots},
+    {"name": "search", "any": ["search"], "slots": _search_slots},
+    {"name": "weather", "any": ["weather", "temperature"], "slots": _weather_slots},
+    {"name": "open_app", "any": ["open", "launch", "start"], "slots": _open_app_slots},
+    {"name": "time", "any": ["what time", "current time", "time is it", "what date", "today's date", "what day"], "slots": _time_slots},
+]
+
+
+def _tokenize(text):
+    return _TOKEN_RE.findall(text)
+
+
+class IntentRouter:
+    """Single-pass matcher compiled from a declarative intent table."""
+
+    def __init__(self, intents):
+        self.intents = intents
+        self._full_masks = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        # Each trigger group ("any" plus one per "all" phrase) is one bit of the intent's mask
+        for priority, intent in enumerate(intents):
+            groups = [intent["any"]] + [[phrase] for phrase in intent.get("all", [])]
+            for bit, phrases in enumerate(groups):
+                for phrase in phrases:
+                    self._add_phrase(_tokenize(phrase), (priority, 1 << bit))
+            self._full_masks.append((1 << len(groups)) - 1)
+
+        self._build_failure_links()
+
+    def _add_phrase(self, tokens, output):
+        node = 0
+        for token in tokens:
+            if token not in self._goto[node]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[node][token] = len(self._goto) - 1
+            node = self._goto[node][token]
+        self._out[node].append(output)
+
+    def _build_failure_links(self):
+        pending = deque(self._goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for token, child in self._goto[node].items():
+                pending.append(child)
+                fallback = self._fail[node]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def _scan(self, cmd):
+        """Return {priority: trigger bitmask} for every trigger found in cmd."""
+        goto, fail, out = self._goto, self._fail, self._out
+        masks = {}
+        node = 0
+        for token in _tokenize(cmd):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            for priority, bit in out[node]:
+                masks[priority] = masks.get(priority, 0) | bit
+        return masks
+
+    def match(self, text):
+        """Return (intent_name, slots) for text, or (None, {}) if nothing matches."""
+        raw = text.strip()
+        cmd = raw.lower()
+        masks = self._scan(cmd)
+        for priority in sorted(masks):
+            if masks[priority] != self._full_masks[priority]:
+                continue
+            intent = self.intents[priority]
+            extract = intent.get("slots")
+            slots = extract(cmd, raw) if extract else {}
+            if slots is not None:
+                return intent["name"], slots
+        return None, {}
+
+
+ROUTER = IntentRouter(INTENTS)
+
+
+def match_intent(text):
+    """Route an utterance to a local intent in one pass."""
+    return ROUTER.match(text)
@@ -0,0 +1,84 @@
+"""Conversation context store for Ollama KV-cache reuse.
+
+``ollama.generate`` returns a ``context`` token vector describing everything
+the model has evaluated so far. Passing it back on the next turn means only
+the new input is processed instead of the system prompt and history again.
+Contexts are kept per user in memory, persisted to SQLite, and discarded
+when the model or system prompt fingerprint changes.
+"""
+
+import time
+from array import array
+from threading import Lock
+from src.database import get_db
+from src.logger import logger
+
+MAX_CONTEXT_TOKENS = 1536
+
+
+class ContextStore:
+    """Per-user Ollama context vectors tied to a model/prompt fingerprint."""
+
+    def __init__(self, fingerprint, max_tokens=MAX_CONTEXT_TOKENS):
+        self.fingerprint = fingerprint
+        self.max_tokens = max_tokens
+        self._contexts = {}
+        self._lock = Lock()
+
+    def get(self, user_id):
+        """Return the stored context for user_id, or None to start fresh."""
+        with self._lock:
+            if user_id in self._contexts:
+                return self._contexts[user_id]
+
+        context = None
+        try:
+            with get_db() as conn:
+                row = conn.execute(
+                    "SELECT fingerprint, context FROM llm_context WHERE user_id = ?",
+                    (user_id,),
+                ).fetchone()
+                if row and row["fingerprint"] == self.fingerprint:
+                    context = array("i", row["context"]).tolist()
+                elif row:
+                    conn.execute("DELETE FROM llm_context WHERE user_id = ?", (user_id,))
+                    conn.commit()
+                    logger.info(f"Discarded stale model context for user {user_id}")
+        except Exception as e:
+            logger.error(f"Context load failed: {e}")
+
+        with self._lock:
+            self._contexts[user_id] = context
+        return context
+
+    def put(self, user_id, context):
+        """Remember the context returned by the latest generation."""
+        if not context:
+            return
+        if len(context) > self.max_tokens:
+            # Near the model's window: start the next turn from a fresh prompt
+            self.reset(user_id)
+            return
+
+        with self._lock:
+            self._contexts[user_id] = list(context)
+        try:
+            with get_db() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_context (user_id, fingerprint, context, updated_at) VALUES (?, ?, ?, ?)",
+                    (user_id, self.fingerprint, array("i", context).tobytes(), time.time()),
+                )
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Context save failed: {e}")
+
+    def reset(self, user_id):
+        """Forget the user's context so the next turn rebuilds the full prompt."""
+        with self._lock:
+            self._contexts[user_id] = None
+        try:
+            with get_db() as conn:
+                conn.execute("DELETE FROM llm_context WHERE user_id = ?", (user_id,))
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Context reset failed: {e}")
@@ -0,0 +1,161 @@
+"""Conversation memory module for NOVA.
+
+Recent turns for each active user live in a bounded in-memory ring buffer,
+filled from SQLite on login, so building a prompt never waits on a read.
+Writes update the buffer immediately and are persisted to the ``memory``
+table by a single background writer that group-commits them in batches.
+"""
+
+import atexit
+from collections import OrderedDict, deque
+from queue import Queue, Empty, Full
+from threading import Event, Lock, Thread
+from src.database import get_db
+from src.logger import logger
+
+BUFFER_TURNS = 20
+MAX_ACTIVE_USERS = 32
+WRITE_QUEUE_SIZE = 1000
+WRITE_BATCH_SIZE = 64
+ENQUEUE_TIMEOUT = 2.0
+
+_BUFFERS = OrderedDict()
+_LOCK = Lock()
+
+
+class _MemoryWriter(Thread):
+    """Background thread that drains queued memory rows in batched transactions."""
+
+    def __init__(self):
+        super().__init__(name="memory-writer", daemon=True)
+        self.queue = Queue(maxsize=WRITE_QUEUE_SIZE)
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except Empty:
+                    break
+
+            rows = [item for item in batch if not isinstance(item, Event)]
+            if rows:
+                _insert_rows(rows)
+            for item in batch:
+                if isinstance(item, Event):
+                    item.set()
+
+    def enqueue(self, row):
+        """Queue a row, blocking while the queue is full (backpressure).
+
+        Rows are only ever written by the writer thread, in queue order, so
+        a user turn is never committed after the reply that followed it.
+        """
+        try:
+            self.queue.put(row, timeout=ENQUEUE_TIMEOUT)
+        except Full:
+            logger.warning("Memory write queue full; waiting for the writer.")
+            self.queue.put(row)
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far has been committed."""
+        done = Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+
+_WRITER = None
+_WRITER_LOCK = Lock()
+
+
+def _get_writer():
+    global _WRITER
+    with _WRITER_LOCK:
+        if _WRITER is None:
+            _WRITER = _MemoryWriter()
+            _WRITER.start()
+        return _WRITER
+
+
+def _insert_rows(rows):
+    try:
+        with get_db() as conn:
+            conn.executemany(
+                "INSERT INTO memory (user_id, role, content) VALUES (?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+    except Exception as e:
+        logger.error(f"Memory save failed ({len(rows)} rows): {e}")
+
+
+def flush_memory(timeout=10.0):
+    """Wait for queued memory writes to reach SQLite (called on shutdown)."""
+    if _WRITER is None:
+        return True
+    return _WRITER.flush(timeout)
+
+
+atexit.register(flush_memory)
+
+
+def _fetch_recent(user_id, limit):
+    # Make sure queued turns are visible to the read
+    flush_memory()
+    with get_db() as conn:
+        rows = conn.execute(
+            "SELECT role, content FROM memory WHERE user_id = ? ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (user_id, limit),
+        ).fetchall()
+    return [{"role": r["role"], "content": r["content"]} for r in reversed(rows)]
+
+
+def load_user_memory(user_id):
+    """Fill the user's ring buffer from SQLite, evicting the least recently active user if full."""
+    try:
+        recent = _fetch_recent(user_id, BUFFER_TURNS)
+    except Exception as e:
+        logger.error(f"Memory load failed: {e}")
+        return []
+
+    with _LOCK:
+        _BUFFERS[user_id] = deque(recent, maxlen=BUFFER_TURNS)
+        _BUFFERS.move_to_end(user_id)
+        while len(_BUFFERS) > MAX_ACTIVE_USERS:
+            _BUFFERS.popitem(last=False)
+    return recent
+
+
+def evict_user_memory(user_id):
+    """Drop the user's ring buffer (e.g. on logout)."""
+    with _LOCK:
+        _BUFFERS.pop(user_id, None)
+
+
+def get_memory(user_id, limit=3):
+    """Return the user's last `limit` messages, oldest first."""
+    if limit > BUFFER_TURNS:
+        try:
+            return _fetch_recent(user_id, limit)
+        except Exception as e:
+            logger.error(f"Memory fetch failed: {e}")
+            return []
+
+    with _LOCK:
+        buffer = _BUFFERS.get(user_id)
+        if buffer is not None:
+            _BUFFERS.move_to_end(user_id)
+            return list(buffer)[-limit:]
+
+    # Not loaded yet (e.g. evicted): fill the buffer once from SQLite
+    return load_user_memory(user_id)[-limit:]
+
+
+def save_memory(user_id, role, content):
+    with _LOCK:
+        buffer = _BUFFERS.get(user_id)
+        if buffer is not None:
+            buffer.append({"role": role, "content": content})
+
+    _get_writer().enqueue((user_id, role, content))
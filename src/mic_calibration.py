@@ -0,0 +1,119 @@
+"""Microphone discovery and calibration for NOVA.
+
+``scan`` samples the ambient noise on every input device at once, one
+thread per device, so a full calibration takes about one probe rather
+than one probe per device and rate. Each working device gets a profile
+keyed by a fingerprint of its name, channel count and default rate.
+Fingerprints, unlike PortAudio indices, stay stable when devices are
+plugged in or removed. ``revalidate`` checks a known profile with a
+100 ms read, so a transient device error does not force a full rescan.
+
+PortAudio's stream open and close are not thread-safe on a shared
+PyAudio instance, so those calls are serialized; only the reads overlap.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+import numpy as np
+import pyaudio
+from src.logger import logger
+
+PROBE_RATES = (16000, 44100)
+PROBE_SECONDS = 1.0
+REVALIDATE_SECONDS = 0.1
+CHUNK = 1024
+ENERGY_RATIO = 1.5  # same ratio speech_recognition uses for its dynamic energy threshold
+MIN_THRESHOLD = 35
+MAX_THRESHOLD = 2000
+FALLBACK_INDICES = (1, 5, 11, 0)
+
+_PORTAUDIO_LOCK = Lock()
+
+
+def fingerprint(info):
+    """Stable identity for a device across index changes."""
+    return f"{info.get('name', '')}|{int(info.get('maxInputChannels', 0))}|{int(info.get('defaultSampleRate', 0))}"
+
+
+def input_devices(audio):
+    """Return [(index, info)] for every input device, most likely microphones first."""
+    priority, secondary = [], []
+    try:
+        for i in range(audio.get_device_count()):
+            info = audio.get_device_info_by_index(i)
+            if info.get("maxInputChannels", 0) <= 0:
+                continue
+            name = info.get("name", "").lower()
+            if "sound mapper" in name or "primary" in name:
+                secondary.append((i, info))
+            else:
+                priority.append((i, info))
+    except Exception as e:
+        logger.error(f"Device search error: {e}")
+        return [(i, {}) for i in FALLBACK_INDICES]
+    return priority + secondary
+
+
+def _measure(audio, index, rate, seconds):
+    """Record from the device and return the RMS level of the ambient noise."""
+    with _PORTAUDIO_LOCK:
+        stream = audio.open(
+            format=pyaudio.paInt16, channels=1, rate=rate, input=True,
+            input_device_index=index, frames_per_buffer=CHUNK,
+        )
+    try:
+        data = stream.read(int(rate * seconds), exception_on_overflow=False)
+    finally:
+        with _PORTAUDIO_LOCK:
+            stream.close()
+    samples = np.frombuffer(data, dtype="<i2").astype(np.float32)
+    return float(np.sqrt(np.mean(samples * samples))) if len(samples) else 0.0
+
+
+def probe_device(audio, index, info, rates=PROBE_RATES, seconds=PROBE_SECONDS):
+    """Return a profile for the first rate the device records plausible ambient noise at, or None."""
+    for rate in rates:
+        try:
+            threshold = _measure(audio, index, rate, seconds) * ENERGY_RATIO
+        except (OSError, IOError):
+            continue
+        if MIN_THRESHOLD < threshold < MAX_THRESHOLD:
+            return {
+                "fingerprint": fingerprint(info),
+                "name": info.get("name", ""),
+                "device_index": index,
+                "sample_rate": rate,
+                "threshold": min(int(threshold) + 100, 400),
+            }
+    return None
+
+
+def scan(audio):
+    """Probe all input devices concurrently; return working profiles, best candidate first."""
+    devices = input_devices(audio)
+    if not devices:
+        return []
+    with ThreadPoolExecutor(max_workers=len(devices), thread_name_prefix="mic-probe") as pool:
+        results = list(pool.map(lambda d: probe_device(audio, *d), devices))
+    return [profile for profile in results if profile is not None]
+
+
+def revalidate(audio, profiles, preferred=None):
+    """Return the first known profile whose device is present and still records, or None.
+
+    The preferred fingerprint is tried first. A profile whose device moved
+    to a new index is returned with the index updated.
+    """
+    present = {fingerprint(info): index for index, info in input_devices(audio)}
+    order = sorted(profiles, key=lambda fp: fp != preferred)
+    for fp in order:
+        index = present.get(fp)
+        if index is None:
+            continue
+        profile = dict(profiles[fp], device_index=index)
+        try:
+            if _measure(audio, index, profile["sample_rate"], REVALIDATE_SECONDS) > 0:
+                return profile
+        except (OSError, IOError) as e:
+            logger.warning(f"Microphone {profile.get('name')} failed re-validation: {e}")
+    return None
@@ -0,0 +1,169 @@
+"""Audio preprocessing before recognition.
+
+Microphone chunks pass through three stateful stages before they reach
+the capture ring:
+1. polyphase resampling to 16 kHz, so 44.1/48 kHz devices don't send
+   oversized payloads to STT;
+2. DC and rumble removal with a Butterworth high-pass at 80 Hz;
+3. slow automatic gain control, which brings quiet and hot microphones
+   to a common speech level.
+
+Every stage works on whole chunks with NumPy; nothing loops per sample
+in Python. The PCM is converted to float32 once, then filtered and
+scaled in place where possible. Resampler windows come from a strided
+view rather than copied slices. State carries across chunks as a few
+arrays, so a stream of chunks gives the same result as one long buffer.
+"""
+
+import math
+import numpy as np
+
+TARGET_RATE = 16000
+KAISER_BETA = 5.0
+HALF_LENGTH_PER_RATE = 10  # filter half-length in multiples of max(up, down), as scipy's resample_poly
+HIGHPASS_HZ = 80
+TARGET_RMS = 3000.0  # about -21 dBFS
+MIN_GAIN = 0.5
+MAX_GAIN = 4.0
+GAIN_SECONDS = 2.0  # time constant of the gain control
+GATE_RMS = 100.0  # quieter chunks are room noise and leave the gain alone
+SPEECH_RATIO = 4.0  # so are chunks less than 12 dB above the tracked noise floor
+FLOOR_SECONDS = 5.0  # how slowly the noise floor creeps up after dropping
+
+
+class Resampler:
+    """Streaming polyphase resampler from rate to target_rate (rational ratio up/down)."""
+
+    def __init__(self, rate, target_rate=TARGET_RATE):
+        common = math.gcd(rate, target_rate)
+        self.up, self.down = target_rate // common, rate // common
+        self.rate, self.target_rate = rate, target_rate
+
+        # Windowed-sinc low-pass at the narrower of the two Nyquist rates, at the upsampled rate
+        half = HALF_LENGTH_PER_RATE * max(self.up, self.down)
+        t = np.arange(-half, half + 1)
+        h = np.sinc(t / max(self.up, self.down)) * np.kaiser(len(t), KAISER_BETA)
+        h *= self.up / h.sum()
+
+        # Split into phases: output n uses taps h[phase + k*up] on inputs base - k
+        self.taps = -(-len(h) // self.up)
+        padded = np.zeros(self.taps * self.up)
+        padded[:len(h)] = h
+        # Reversed so a phase's taps line up with an ascending window of inputs
+        self._phases = padded.reshape(self.taps, self.up).T[:, ::-1].astype(np.float32)
+
+        self._history = np.zeros(self.taps - 1, np.float32)
+        self._consumed = 0  # absolute index of the next input sample
+        self._next_output = 0
+
+    def process(self, samples):
+        """Resample a float32 chunk; returns the output samples it completes."""
+        if self.up == self.down:
+            return samples
+        extended = np.concatenate([self._history, samples])
+        last = self._consumed + len(samples) - 1
+        end = ((last + 1) * self.up - 1) // self.down  # last output whose newest input has arrived
+        n = np.arange(self._next_output, end + 1, dtype=np.int64)
+
+        products = n * self.down
+        phases = products % self.up
+        # Index in extended of each output's newest input, and of its window start
+        starts = products // self.up - self._consumed
+        windows = np.lib.stride_tricks.sliding_window_view(extended, self.taps)[starts]
+        out = np.einsum("nk,nk->n", windows, self._phases[phases])
+
+        self._history = extended[len(extended) - (self.taps - 1):]
+        self._consumed += len(samples)
+        self._next_output = end + 1
+        return out
+
+
+class HighPass:
+    """Removes DC and rumble: 2nd-order Butterworth high-pass (12 dB/octave below cutoff).
+
+    The biquad is split into a direct term plus a complex-conjugate pair of
+    one-pole sections. Each recursion w[n] = p*w[n-1] + r*x[n] is solved in
+    closed form over a block, w[n] = p**(n+1) * (w[-1] + r*cumsum(x[k] / p**(k+1))),
+    so no Python loop runs per sample. Blocks are kept short enough that
+    the powers of 1/p stay well inside float64 range.
+    """
+
+    BLOCK = 512
+
+    def __init__(self, rate, cutoff=HIGHPASS_HZ):
+        # RBJ cookbook high-pass with Q = 1/sqrt(2)
+        w0 = 2 * math.pi * cutoff / rate
+        alpha = math.sin(w0) / math.sqrt(2)
+        cos = math.cos(w0)
+        a0 = 1 + alpha
+        b0, b1, b2 = (1 + cos) / 2 / a0, -(1 + cos) / a0, (1 + cos) / 2 / a0
+        a1, a2 = -2 * cos / a0, (1 - alpha) / a0
+
+        pole = complex(np.roots([1.0, a1, a2])[0])
+        self.direct = b2 / a2
+        self.residue = (b0 + b1 / pole + b2 / pole ** 2) / (1 - pole.conjugate() / pole)
+        steps = np.arange(1, self.BLOCK + 1)
+        self._powers = pole ** steps
+        self._inverse_powers = pole ** -steps
+        self._state = 0j  # w[-1] of the pole's section; its conjugate's state is the conjugate
+
+    def process(self, samples):
+        out = np.empty(len(samples), np.float32)
+        for start in range(0, len(samples), self.BLOCK):
+            x = samples[start:start + self.BLOCK].astype(np.float64)
+            n = len(x)
+            w = self._powers[:n] * (self._state + self.residue * np.cumsum(x * self._inverse_powers[:n]))
+            out[start:start + n] = self.direct * x + 2 * w.real
+            self._state = w[-1]
+        return out
+
+
+class GainControl:
+    """Slow AGC: moves the gain toward TARGET_RMS / speech level, ramping it across each chunk.
+
+    Only chunks well above the noise floor count as speech, so silence
+    never pumps the room noise up.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.gain = 1.0
+        self.noise_floor = None
+
+    def process(self, samples):
+        if not len(samples):
+            return samples
+        level = float(np.sqrt(np.mean(samples * samples)))
+        seconds = len(samples) / self.rate
+        if self.noise_floor is None or level < self.noise_floor:
+            self.noise_floor = level
+        else:
+            self.noise_floor += (level - self.noise_floor) * min(1.0, seconds / FLOOR_SECONDS)
+
+        gain = self.gain
+        if level > max(GATE_RMS, self.noise_floor * SPEECH_RATIO):
+            wanted = min(max(TARGET_RMS / level, MIN_GAIN), MAX_GAIN)
+            gain += (wanted - gain) * min(1.0, seconds / GAIN_SECONDS)
+        # A linear ramp avoids zipper noise when the gain moves
+        samples *= np.linspace(self.gain, gain, len(samples), dtype=samples.dtype)
+        self.gain = gain
+        return samples
+
+
+class Preprocessor:
+    """16-bit PCM at rate in, 16-bit PCM at target_rate out: resample, high-pass, gain control."""
+
+    def __init__(self, rate, target_rate=TARGET_RATE, normalize=True):
+        self.input_rate = rate
+        self.output_rate = target_rate
+        self.resampler = Resampler(rate, target_rate)
+        self.highpass = HighPass(target_rate)
+        self.gain = GainControl(target_rate) if normalize else None
+
+    def process(self, pcm):
+        samples = np.frombuffer(pcm, dtype="<i2").astype(np.float32)
+        samples = self.highpass.process(self.resampler.process(samples))
+        if self.gain is not None:
+            samples = self.gain.process(samples)
+        np.clip(samples, -32768, 32767, out=samples)
+        return samples.astype("<i2").tobytes()
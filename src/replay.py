@@ -0,0 +1,177 @@
+"""Record/replay audio harness for NOVA.
+
+Runs the voice loop without a microphone or speakers:
+- ``FileCapture`` stands in for ``MicrophoneCapture``. It plays WAV
+  fixtures into the same kind of ring buffer, in real time, with
+  digital silence between them. Install it with
+  ``voice_engine.set_capture``.
+- ``FileSink`` stands in for the PyAudio output stream. It paces writes
+  like a sound card, keeps what was played, and timestamps the first
+  audio of each answer. Install it with ``voice_engine.set_audio_sink``.
+- ``ScriptedResponder`` stands in for ``ai_engine.generate_response_stream``.
+
+Together with ``stt.ScriptedTranscriber`` and ``tts.FakeSynthesizer``
+they cover every stage, so end-to-end latency can be benchmarked
+(benchmarks/bench_e2e.py). ``record`` saves live microphone audio as a
+new fixture.
+"""
+
+import bisect
+import collections
+import time
+import wave
+from threading import Lock, Thread
+from src.audio_capture import AudioRing, RingSource, SAMPLE_WIDTH, CHUNK, BUFFER_SECONDS, PREROLL_SECONDS
+
+
+def read_wav(path):
+    """Return (pcm, sample_rate) for a mono 16-bit WAV file."""
+    with wave.open(path, "rb") as f:
+        if f.getnchannels() != 1 or f.getsampwidth() != SAMPLE_WIDTH:
+            raise ValueError(f"{path}: fixtures must be mono 16-bit PCM")
+        return f.readframes(f.getnframes()), f.getframerate()
+
+
+def write_wav(path, pcm, sample_rate):
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(SAMPLE_WIDTH)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm)
+
+
+class FileCapture:
+    """Drop-in for MicrophoneCapture that replays queued WAV files in real time."""
+
+    def __init__(self, sample_rate=16000, chunk=CHUNK, seconds=BUFFER_SECONDS):
+        self.device_index = "replay"
+        self.sample_rate = sample_rate
+        self.chunk = chunk
+        self.ring = AudioRing(int(sample_rate * seconds) * SAMPLE_WIDTH)
+        self.consumed = 0
+        self._queue = collections.deque()
+        self._lock = Lock()
+        self._times = []  # (ring position after a chunk, monotonic time it was written)
+        self._running = False
+        self._thread = None
+
+    def queue(self, path):
+        """Play path after anything already queued; returns the ring position where it will start."""
+        pcm, rate = read_wav(path)
+        if rate != self.sample_rate:
+            raise ValueError(f"{path}: {rate} Hz fixture for a {self.sample_rate} Hz capture")
+        with self._lock:
+            start = self.ring.written + sum(len(p) for p in self._queue)
+            self._queue.append(memoryview(pcm))
+        return start
+
+    def start(self):
+        self._running = True
+        self._thread = Thread(target=self._run, name="replay-capture", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        chunk_bytes = self.chunk * SAMPLE_WIDTH
+        silence = bytes(chunk_bytes)
+        next_write = time.monotonic()
+        while self._running:
+            with self._lock:
+                data = bytearray()
+                while self._queue and len(data) < chunk_bytes:
+                    pcm = self._queue.popleft()
+                    take = chunk_bytes - len(data)
+                    data += pcm[:take]
+                    if len(pcm) > take:
+                        self._queue.appendleft(pcm[take:])
+            data += silence[len(data):]
+            # Like a sound card, a chunk only becomes available once it has been "recorded"
+            next_write += self.chunk / self.sample_rate
+            time.sleep(max(0.0, next_write - time.monotonic()))
+            self.ring.write(data)
+            self._times.append((self.ring.written, time.monotonic()))
+
+    def time_of(self, pos):
+        """Monotonic time at which the byte at ring position pos was captured."""
+        i = bisect.bisect_right(self._times, (pos, float("inf")))
+        if i >= len(self._times):
+            raise ValueError("position has not been captured yet")
+        return self._times[i][1]
+
+    @property
+    def alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self.ring.close()
+
+    def source(self, preroll=PREROLL_SECONDS, start=None, consume=True):
+        """Same contract as MicrophoneCapture.source."""
+        if start is None:
+            preroll_bytes = int(preroll * self.sample_rate) * SAMPLE_WIDTH
+            start = max(self.consumed, self.ring.written - preroll_bytes)
+        return RingSource(self, max(start, self.ring.oldest), consume)
+
+
+class FileSink:
+    """Drop-in for the PyAudio output stream: paced like a sound card, keeps the PCM it played."""
+
+    def __init__(self, realtime=True):
+        self.realtime = realtime
+        self.rate = None
+        self.pcm = bytearray()
+        self.first_audio = None
+        self._next_free = 0.0
+
+    def open(self, rate):
+        """Called by voice_engine when playback starts at rate; returns the stream to write to."""
+        if rate != self.rate:
+            self.rate = rate
+            self.pcm = bytearray()
+        return self
+
+    def mark(self):
+        """Start timing a new answer: first_audio is reset until the next write."""
+        self.first_audio = None
+
+    def write(self, pcm):
+        now = time.monotonic()
+        if self.first_audio is None:
+            self.first_audio = now
+        self.pcm += pcm
+        if self.realtime:
+            # A blocking write returns once the device has room; model a buffer of one write
+            start = max(now, self._next_free)
+            self._next_free = start + len(pcm) / SAMPLE_WIDTH / self.rate
+            time.sleep(max(0.0, start - now))
+
+    def get_output_latency(self):
+        return 0.0
+
+    def save(self, path):
+        """Write everything played so far to a WAV file."""
+        write_wav(path, bytes(self.pcm), self.rate)
+
+
+class ScriptedResponder:
+    """Stand-in for ai_engine.generate_response_stream with canned sentences and model-like delays."""
+
+    def __init__(self, sentences, first_sentence_delay=0.3, sentence_delay=0.15):
+        self.sentences = list(sentences)
+        self.first_sentence_delay = first_sentence_delay
+        self.sentence_delay = sentence_delay
+
+    def __call__(self, user_id, user_input, on_sentence):
+        for i, sentence in enumerate(self.sentences):
+            time.sleep(self.first_sentence_delay if i == 0 else self.sentence_delay)
+            on_sentence(sentence)
+        return {"text": " ".join(self.sentences), "action": None}
+
+
+def record(capture, path, seconds):
+    """Save the next seconds of a running capture (e.g. the live microphone) as a WAV fixture."""
+    with capture.source(preroll=0, consume=False) as source:
+        pcm = source.stream.read(int(seconds * capture.sample_rate))
+    write_wav(path, pcm, capture.sample_rate)
@@ -0,0 +1,182 @@
+"""Response cache module for repeated LLM answers.
+
+Answers are keyed on the normalized user input plus a hash of everything
+else that shapes the reply: model, options, system prompt and the user.
+The conversation is not part of the key. Inputs whose answer depends on
+it (follow-ups, pronouns, personal facts) or on the clock bypass the
+cache instead. Lookups hit an in-process LRU first and fall back to the
+SQLite ``response_cache`` table, which survives restarts.
+"""
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from threading import Lock
+from src.database import get_db
+from src.logger import logger
+
+MEMORY_MAX_ENTRIES = 256
+DISK_MAX_ENTRIES = 5000
+TTL_SECONDS = 7 * 24 * 3600
+_PRUNE_EVERY = 50
+
+_NORMALIZE_RE = re.compile(r"[^a-z0-9' ]+")
+_TIME_SENSITIVE_RE = re.compile(
+    r"\b(today|tonight|tomorrow|yesterday|now|current|currently|latest|recent|news|"
+    r"weather|temperature|forecast|time|date|score|price|stock)\b"
+)
+# Follow-ups and references only make sense against the conversation so far
+_CONTEXT_DEPENDENT_RE = re.compile(
+    r"^(and|but|so|also|then|what about|how about|why|really)\b|"
+    r"\b(more|again|continue|it|its|that|this|those|these|he|she|they|him|her|them|his|hers|their|"
+    r"there|same|else|previous|last|earlier|before|i|i'm|my|mine|we|our|us)\b"
+)
+
+
+def normalize_input(text):
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(_NORMALIZE_RE.sub(" ", text.lower()).split())
+
+
+def context_hash(*parts):
+    """Stable short hash of everything besides the input that shapes an answer."""
+    return hashlib.sha256("\0".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:16]
+
+
+def is_time_sensitive(text):
+    """True for inputs whose answer can change between identical questions."""
+    return _TIME_SENSITIVE_RE.search(text.lower()) is not None
+
+
+def is_context_dependent(text):
+    """True for follow-ups ("tell me more", "why is it") whose answer depends on earlier turns."""
+    return _CONTEXT_DEPENDENT_RE.search(normalize_input(text)) is not None
+
+
+def is_cacheable(text):
+    return not is_time_sensitive(text) and not is_context_dependent(text)
+
+
+class ResponseCache:
+    """Two-tier (LRU + SQLite) cache of final assistant responses."""
+
+    def __init__(self, memory_max=MEMORY_MAX_ENTRIES, disk_max=DISK_MAX_ENTRIES, ttl=TTL_SECONDS):
+        self.memory_max = memory_max
+        self.disk_max = disk_max
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self._puts = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bypassed": 0}
+
+    def _key(self, user_input, context):
+        return hashlib.sha256(f"{context}\0{normalize_input(user_input)}".encode("utf-8")).hexdigest()
+
+    def get(self, user_input, context):
+        """Return the cached response, or None on a miss or a bypassed input."""
+        if not is_cacheable(user_input):
+            with self._lock:
+                self.stats["bypassed"] += 1
+            return None
+
+        key = self._key(user_input, context)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry[0]
+            if entry:
+                del self._entries[key]
+
+        try:
+            with get_db() as conn:
+                row = conn.execute(
+                    "SELECT response, created_at FROM response_cache WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row and now - row["created_at"] >= self.ttl:
+                    conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                    row = None
+                elif row:
+                    conn.execute(
+                        "UPDATE response_cache SET last_used = ? WHERE key = ?", (now, key)
+                    )
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Response cache read failed: {e}")
+            row = None
+
+        with self._lock:
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["disk_hits"] += 1
+            self._remember(key, row["response"], row["created_at"])
+        return row["response"]
+
+    def put(self, user_input, context, response):
+        """Store a response in both tiers (bypassed inputs are skipped)."""
+        if not response or not is_cacheable(user_input):
+            return
+
+        key = self._key(user_input, context)
+        now = time.time()
+
+        with self._lock:
+            self._remember(key, response, now)
+            self._puts += 1
+            prune = self._puts % _PRUNE_EVERY == 0
+
+        try:
+            with get_db() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO response_cache (key, response, created_at, last_used) VALUES (?, ?, ?, ?)",
+                    (key, response, now, now),
+                )
+                if prune:
+                    self._prune(conn, now)
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Response cache write failed: {e}")
+
+    def _remember(self, key, response, created_at):
+        self._entries[key] = (response, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.memory_max:
+            self._entries.popitem(last=False)
+
+    def _prune(self, conn, now):
+        """Evict expired rows, then the least recently used beyond disk_max."""
+        conn.execute("DELETE FROM response_cache WHERE created_at < ?", (now - self.ttl,))
+        conn.execute(
+            "DELETE FROM response_cache WHERE key NOT IN "
+            "(SELECT key FROM response_cache ORDER BY last_used DESC LIMIT ?)",
+            (self.disk_max,),
+        )
+
+    def clear(self):
+        """Drop every cached response from both tiers."""
+        with self._lock:
+            self._entries.clear()
+        try:
+            with get_db() as conn:
+                conn.execute("DELETE FROM response_cache")
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Response cache clear failed: {e}")
+
+    def get_stats(self):
+        """Return hit/miss counters and the overall hit rate."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._entries)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,172 @@
+"""Generation scheduler module for LLM requests.
+
+All model generations run on one worker thread, taken from a priority
+queue. Identical in-flight prompts share a single job, and a newer request
+from the same user cancels that user's previous job, stopping a running
+stream between tokens so stale generations stop burning CPU.
+"""
+
+import heapq
+import itertools
+from threading import Condition, Event, Lock, Thread
+from src.logger import logger
+
+PRIORITY_VOICE = 0
+PRIORITY_TEXT = 1
+PRIORITY_BACKGROUND = 5
+
+
+class GenerationCancelled(Exception):
+    """Raised to consumers of a job that was cancelled before finishing."""
+
+
+class GenerationJob:
+    """A queued generation whose tokens can be streamed by any number of consumers."""
+
+    def __init__(self, key, priority, run):
+        self.key = key
+        self.priority = priority
+        self.run = run
+        self.owners = set()
+        self.started = False
+        self.cancelled = Event()
+        self._tokens = []
+        self._done = False
+        self._error = None
+        self._cond = Condition()
+
+    def emit(self, token):
+        with self._cond:
+            self._tokens.append(token)
+            self._cond.notify_all()
+
+    def finish(self, error=None):
+        with self._cond:
+            if not self._done:
+                self._done = True
+                self._error = error
+                self._cond.notify_all()
+
+    @property
+    def finished(self):
+        return self._done
+
+    def cancel(self):
+        # Finish first: once the worker sees cancelled, its own finish() must not end the stream cleanly
+        self.finish(GenerationCancelled())
+        self.cancelled.set()
+
+    def stream(self):
+        """Yield every token generated so far, then new ones as they arrive."""
+        index = 0
+        while True:
+            with self._cond:
+                while index >= len(self._tokens) and not self._done:
+                    self._cond.wait()
+                if index < len(self._tokens):
+                    token = self._tokens[index]
+                    index += 1
+                elif self._error is not None:
+                    raise self._error
+                else:
+                    return
+            yield token
+
+
+class GenerationScheduler:
+    """Priority queue of generation jobs served by a single worker thread."""
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._lock = Lock()
+        self._has_work = Condition(self._lock)
+        self._inflight = {}
+        self._latest = {}
+        self._worker = None
+
+    def submit(self, key, run, owner=None, priority=PRIORITY_TEXT):
+        """Queue run (a callable returning a token iterator) unless key is already in flight.
+
+        Submitting for an owner supersedes that owner's previous job.
+        """
+        with self._lock:
+            previous = self._latest.get(owner)
+            if owner is not None and previous is not None and previous.key != key:
+                self._release(previous, owner)
+
+            job = self._inflight.get(key)
+            if job is None or job.cancelled.is_set():
+                job = GenerationJob(key, priority, run)
+                self._inflight[key] = job
+                heapq.heappush(self._heap, (priority, next(self._seq), job))
+            elif priority < job.priority and not job.started:
+                # Re-queue at the higher priority; the stale heap entry is skipped
+                job.priority = priority
+                heapq.heappush(self._heap, (priority, next(self._seq), job))
+
+            if owner is not None:
+                job.owners.add(owner)
+                self._latest[owner] = job
+            self._ensure_worker()
+            self._has_work.notify()
+            return job
+
+    def release(self, job, owner):
+        """Drop owner's interest in job, cancelling it if nobody else is waiting."""
+        with self._lock:
+            self._release(job, owner)
+
+    def cancel(self, owner):
+        """Cancel the owner's latest job, if any."""
+        with self._lock:
+            job = self._latest.get(owner)
+            if job is not None:
+                self._release(job, owner)
+
+    def _release(self, job, owner):
+        job.owners.discard(owner)
+        if self._latest.get(owner) is job:
+            del self._latest[owner]
+        if not job.owners and not job.finished:
+            job.cancel()
+            if self._inflight.get(job.key) is job:
+                del self._inflight[job.key]
+            logger.info("Cancelled superseded generation.")
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = Thread(target=self._run, name="llm-scheduler", daemon=True)
+            self._worker.start()
+
+    def _next_job(self):
+        with self._lock:
+            while True:
+                while not self._heap:
+                    self._has_work.wait()
+                priority, _, job = heapq.heappop(self._heap)
+                if job.started or job.cancelled.is_set() or priority != job.priority:
+                    continue
+                job.started = True
+                return job
+
+    def _run(self):
+        while True:
+            job = self._next_job()
+            tokens = None
+            try:
+                tokens = job.run()
+                for token in tokens:
+                    if job.cancelled.is_set():
+                        break
+                    job.emit(token)
+                job.finish()
+            except Exception as e:
+                job.finish(e)
+            finally:
+                if tokens is not None and hasattr(tokens, "close"):
+                    # Closing the stream drops the HTTP response, which stops Ollama generating
+                    tokens.close()
+                with self._lock:
+                    if self._inflight.get(job.key) is job:
+                        del self._inflight[job.key]
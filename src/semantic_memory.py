@@ -0,0 +1,362 @@
+"""Semantic recall over conversation memory.
+
+Each completed turn is embedded and stored per user as a float32 matrix of
+unit vectors in ``memory_vectors/user_<id>.npz`` next to ``voice_ai.db``.
+Recall embeds the new input and returns the most similar past turns using a
+single matrix-vector product, so the prompt stays short while still
+surfacing relevant facts from long histories.
+
+The ``memory`` table stays the source of truth. Index files are saved every
+SAVE_EVERY_TURNS turns or SAVE_INTERVAL seconds, and at exit. A loaded
+index catches up on any turns it is missing. If the embedder fails (e.g.
+the embedding model is not pulled), semantic recall is paused for
+EMBED_BACKOFF_SECONDS instead of failing on every turn.
+
+Recall sits on the path to the first token, so it is held to a budget:
+until the embedder has been warmed up (``warm_up``, run at startup), or
+when a query embedding takes longer than RECALL_BUDGET_SECONDS, the turn
+simply goes without recalled memory.
+
+The embedder is pluggable: any callable mapping a list of strings to an
+(n, dim) array works. ``OllamaEmbedder`` is used by the app;
+``HashingEmbedder`` is a deterministic local stand-in for tests.
+"""
+
+import atexit
+import os
+import re
+import time
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from threading import Event, Lock
+import numpy as np
+from src import database
+from src.logger import logger
+
+EMBED_MODEL = "nomic-embed-text"
+TOP_K = 2
+MIN_SIMILARITY = 0.35
+MAX_TURNS_PER_USER = 5000
+MAX_LOADED_USERS = 32
+SAVE_EVERY_TURNS = 10
+SAVE_INTERVAL = 60.0
+EMBED_BACKOFF_SECONDS = 300.0
+EMBED_KEEP_ALIVE = "30m"  # keep the model loaded between turns, like the chat model
+RECALL_BUDGET_SECONDS = 0.15  # a turn never waits longer than this for its query embedding
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def _vector_dir():
+    return os.path.join(os.path.dirname(database.DB_PATH), "memory_vectors")
+
+
+def _normalize_rows(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-words embedder using feature hashing (no model needed)."""
+
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _bucket(self, feature):
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        return value % self.dim, 1.0 if value >> 63 else -1.0
+
+    def __call__(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _WORD_RE.findall(text.lower())
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                col, sign = self._bucket(feature)
+                vectors[row, col] += sign
+        return vectors
+
+
+class OllamaEmbedder:
+    """Embeds text with an Ollama embedding model through a shared client."""
+
+    def __init__(self, client_factory, model=EMBED_MODEL, keep_alive=EMBED_KEEP_ALIVE):
+        self.client_factory = client_factory
+        self.model = model
+        self.keep_alive = keep_alive
+        self.name = f"ollama-{model}"
+
+    def __call__(self, texts):
+        resp = self.client_factory().embed(model=self.model, input=list(texts), keep_alive=self.keep_alive)
+        return np.asarray(resp["embeddings"], dtype=np.float32)
+
+
+class EmbeddingUnavailable(Exception):
+    """Raised while embeddings are paused after a failure."""
+
+
+class SemanticIndex:
+    """One user's turn texts and their unit-length embeddings."""
+
+    def __init__(self, path, embedder_name):
+        self.path = path
+        self.embedder_name = embedder_name
+        self.vectors = None
+        self.texts = []
+        self.unsaved = 0
+        self.saved_at = time.monotonic()
+
+    def load(self):
+        """Load the saved matrix; returns False if missing or built by another embedder."""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with np.load(self.path) as data:
+                if str(data["embedder"]) != self.embedder_name:
+                    return False
+                self.vectors = data["vectors"].astype(np.float32, copy=False)
+                self.texts = data["texts"].tolist()
+            return True
+        except Exception as e:
+            logger.error(f"Vector index load failed: {e}")
+            return False
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp.npz"
+        np.savez(
+            tmp_path,
+            vectors=self.vectors,
+            texts=np.array(self.texts, dtype=str),
+            embedder=np.array(self.embedder_name),
+        )
+        os.replace(tmp_path, self.path)
+        self.unsaved = 0
+        self.saved_at = time.monotonic()
+
+    def save_if_due(self):
+        """Save after SAVE_EVERY_TURNS new turns or SAVE_INTERVAL seconds, whichever comes first."""
+        if self.unsaved >= SAVE_EVERY_TURNS or (
+            self.unsaved and time.monotonic() - self.saved_at >= SAVE_INTERVAL
+        ):
+            self.save()
+
+    def add(self, texts, vectors):
+        vectors = _normalize_rows(vectors)
+        if self.vectors is None or self.vectors.shape[1] != vectors.shape[1]:
+            self.vectors, self.texts = vectors, list(texts)
+        else:
+            # Build a new array and swap it in, so concurrent searches see a consistent snapshot
+            self.vectors = np.concatenate([self.vectors, vectors])[-MAX_TURNS_PER_USER:]
+            self.texts = (self.texts + list(texts))[-MAX_TURNS_PER_USER:]
+        self.unsaved += len(texts)
+
+    def search(self, query_vector, k, exclude_recent=0):
+        """Return up to k (similarity, text) pairs, ignoring the newest exclude_recent turns."""
+        vectors, texts = self.vectors, self.texts
+        if vectors is None:
+            return []
+        count = len(texts) - exclude_recent
+        if count <= 0:
+            return []
+
+        sims = vectors[:count] @ _normalize_rows(query_vector[None, :])[0]
+        k = min(k, count)
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        return [(float(sims[i]), texts[i]) for i in top]
+
+
+class SemanticMemory:
+    """Per-user semantic indexes with background, serialized updates."""
+
+    def __init__(self, embedder):
+        self.embedder = embedder
+        self._indexes = OrderedDict()
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="semantic-memory")
+        # Query embeddings get their own thread, so they never queue behind a backfill
+        self._recall_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="semantic-recall")
+        self._pending_query = None
+        self._retry_at = 0.0  # embeddings are paused until this monotonic time
+        self._warm = Event()  # set once an embedding has succeeded (the model is loaded)
+        atexit.register(self.flush)
+
+    def set_embedder(self, embedder):
+        """Swap the embedder; indexes built by the old one are rebuilt on next use."""
+        with self._lock:
+            self.embedder = embedder
+            self._indexes.clear()
+            self._retry_at = 0.0
+            self._warm.clear()
+
+    def warm_up(self):
+        """Load the embedding model with a tiny request (run in the background at startup)."""
+        try:
+            self._embed(["warm up"])
+            return True
+        except EmbeddingUnavailable:
+            return False
+
+    def _index_path(self, user_id):
+        return os.path.join(_vector_dir(), f"user_{user_id}.npz")
+
+    def _get_index(self, user_id):
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is not None:
+                self._indexes.move_to_end(user_id)
+            return index
+
+    @property
+    def available(self):
+        """False while embeddings are paused after a failure."""
+        return time.monotonic() >= self._retry_at
+
+    def _embed(self, texts):
+        if not self.available:
+            raise EmbeddingUnavailable()
+        try:
+            vectors = self.embedder(texts)
+            self._warm.set()
+            return vectors
+        except Exception as e:
+            self._retry_at = time.monotonic() + EMBED_BACKOFF_SECONDS
+            logger.error(f"Embedding failed; semantic recall paused for {EMBED_BACKOFF_SECONDS:.0f}s: {e}")
+            raise EmbeddingUnavailable() from e
+
+    def _load_or_build(self, user_id):
+        """Load the user's saved index and catch it up, or backfill it, from the memory table."""
+        index = SemanticIndex(self._index_path(user_id), self.embedder.name)
+        turns = _turns_from_db(user_id)
+        if index.load():
+            turns = _missing_turns(index.texts, turns)
+        turns = turns[-MAX_TURNS_PER_USER:]
+        if turns:
+            index.add(turns, self._embed(turns))
+            index.save()
+
+        evicted = []
+        with self._lock:
+            self._indexes[user_id] = index
+            while len(self._indexes) > MAX_LOADED_USERS:
+                evicted.append(self._indexes.popitem(last=False)[1])
+        for old in evicted:
+            if old.unsaved:
+                old.save()
+        return index
+
+    def prime(self, user_id):
+        """Load (or backfill) the user's index in the background, e.g. on login."""
+        if self._get_index(user_id) is None and self.available:
+            self._executor.submit(self._safe, self._load_or_build, user_id)
+
+    def add_turn(self, user_id, user_text, assistant_text):
+        """Embed and store a completed turn in the background."""
+        self._executor.submit(self._safe, self._add_turn, user_id, user_text, assistant_text)
+
+    def _add_turn(self, user_id, user_text, assistant_text):
+        if not self.available:
+            return  # the turn is in the memory table; the index catches up once embeddings work
+        index = self._get_index(user_id) or self._load_or_build(user_id)
+        turn = _format_turn(user_text, assistant_text)
+        if turn in index.texts:
+            return  # already caught up from the memory table, and a duplicate adds nothing to recall
+        try:
+            vectors = self._embed([turn])
+        except EmbeddingUnavailable:
+            # Reload, and so catch up from the memory table, once embeddings work again
+            with self._lock:
+                self._indexes.pop(user_id, None)
+            raise
+        index.add([turn], vectors)
+        index.save_if_due()
+
+    def flush(self, timeout=10.0):
+        """Save every index with unsaved turns (called on shutdown)."""
+        try:
+            future = self._executor.submit(self._safe, self._save_all)
+        except RuntimeError:
+            # The worker has already been stopped at interpreter exit
+            self._safe(self._save_all)
+            return
+        future.result(timeout)
+
+    def _save_all(self):
+        with self._lock:
+            indexes = list(self._indexes.values())
+        for index in indexes:
+            if index.unsaved:
+                index.save()
+
+    def recall(self, user_id, query, k=TOP_K, exclude_recent=1, min_similarity=MIN_SIMILARITY):
+        """Return the texts of the k past turns most similar to query."""
+        index = self._get_index(user_id)
+        if index is None:
+            # Never block the turn on a backfill; it will be ready next time
+            self.prime(user_id)
+            return []
+        if index.vectors is None or not self.available:
+            return []
+        if not self._warm.is_set():
+            # Loading the model would stall this turn; warm it up for the next one
+            self._executor.submit(self.warm_up)
+            return []
+        pending = self._pending_query
+        if pending is not None and not pending.done():
+            return []  # the embedder is still busy with a query that ran over budget
+        future = self._pending_query = self._recall_executor.submit(self._embed, [query])
+        try:
+            query_vector = future.result(timeout=RECALL_BUDGET_SECONDS)[0]
+        except TimeoutError:
+            logger.info("Semantic recall skipped: embedding over budget.")
+            return []
+        except EmbeddingUnavailable:
+            return []
+        hits = index.search(query_vector, k, exclude_recent)
+        return [text for sim, text in hits if sim >= min_similarity]
+
+    @staticmethod
+    def _safe(fn, *args):
+        try:
+            fn(*args)
+        except EmbeddingUnavailable:
+            pass  # already logged once when embeddings were paused
+        except Exception as e:
+            logger.error(f"Semantic memory update failed: {e}")
+
+
+def _format_turn(user_text, assistant_text):
+    return f"User: {user_text}\nNOVA: {assistant_text}"
+
+
+def _missing_turns(indexed, turns):
+    """Turns from the memory table newer than the last one the index holds."""
+    if not indexed:
+        return turns
+    for i in range(len(turns) - 1, -1, -1):
+        if turns[i] == indexed[-1]:
+            return turns[i + 1:]
+    return []
+
+
+def _turns_from_db(user_id):
+    """Pair each stored user message with the assistant reply that follows it."""
+    with database.get_db() as conn:
+        rows = conn.execute(
+            "SELECT role, content FROM memory WHERE user_id = ? ORDER BY timestamp, id",
+            (user_id,),
+        ).fetchall()
+    turns = []
+    pending = None
+    for row in rows:
+        if row["role"] == "user":
+            pending = row["content"]
+        elif pending is not None:
+            turns.append(_format_turn(pending, row["content"]))
+            pending = None
+    return turns
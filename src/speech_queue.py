@@ -0,0 +1,126 @@
+"""Speech queue for NOVA.
+
+One worker thread takes every utterance from a priority queue and plays
+it. Callers therefore don't start a thread per phrase or compete for the
+output device. ``submit`` returns a ``concurrent.futures.Future`` that
+resolves to the outcome of the utterance: "done", "interrupted",
+"barge_in" or "dropped".
+
+Stale speech is coalesced:
+- queued utterances with the same key share one future;
+- a new utterance drops everything still queued at a lower priority,
+  since a pending greeting is not worth saying once an answer is ready;
+- a greeting (or anything less urgent) that is already playing is
+  interrupted; prompts and answers in progress are allowed to finish.
+"""
+
+import heapq
+import itertools
+from concurrent.futures import Future
+from threading import Condition, Event, Lock, Thread
+from src.logger import logger
+
+PRIORITY_RESPONSE = 0
+PRIORITY_PROMPT = 1
+PRIORITY_GREETING = 5
+INTERRUPTIBLE_PRIORITY = PRIORITY_GREETING  # playing speech this unimportant yields to newer speech
+
+
+class Utterance:
+    """A queued piece of speech; play(utterance) speaks it and returns the outcome."""
+
+    def __init__(self, key, priority, play):
+        self.key = key
+        self.priority = priority
+        self.play = play
+        self.future = Future()
+        self.interrupted = Event()
+        self.wake = None  # set by the player: unblocks it when it is waiting for audio
+
+    def interrupt(self):
+        """Ask the player to stop this utterance (or skip it, if it has not started)."""
+        self.interrupted.set()
+        wake = self.wake
+        if wake is not None:
+            wake()
+
+
+class SpeechQueue:
+    """Priority queue of utterances served by a single playback thread."""
+
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._lock = Lock()
+        self._has_work = Condition(self._lock)
+        self._pending = {}  # key -> queued Utterance
+        self.current = None
+        self._worker = None
+
+    def submit(self, play, priority=PRIORITY_PROMPT, key=None):
+        """Queue play and return its Future; an identical queued key returns the existing one."""
+        with self._lock:
+            queued = self._pending.get(key) if key is not None else None
+            if queued is not None and not queued.future.done():
+                if priority < queued.priority:
+                    # Re-queue at the higher priority; the stale heap entry is skipped
+                    queued.priority = priority
+                    heapq.heappush(self._heap, (priority, next(self._seq), queued))
+                return queued.future
+
+            self._drop_below(priority)
+            utterance = Utterance(key, priority, play)
+            heapq.heappush(self._heap, (priority, next(self._seq), utterance))
+            if key is not None:
+                self._pending[key] = utterance
+
+            current = self.current
+            if current is not None and current.priority > priority and current.priority >= INTERRUPTIBLE_PRIORITY:
+                current.interrupt()
+            self._ensure_worker()
+            self._has_work.notify()
+            return utterance.future
+
+    def _drop_below(self, priority):
+        for _, _, utterance in self._heap:
+            if utterance.priority > priority and not utterance.future.done():
+                utterance.future.set_result("dropped")
+                if self._pending.get(utterance.key) is utterance:
+                    del self._pending[utterance.key]
+                logger.info("Dropped superseded utterance.")
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = Thread(target=self._run, name="tts-worker", daemon=True)
+            self._worker.start()
+
+    def _next(self):
+        with self._lock:
+            while True:
+                while not self._heap:
+                    self._has_work.wait()
+                priority, _, utterance = heapq.heappop(self._heap)
+                if priority != utterance.priority or utterance.future.done():
+                    continue  # stale heap entry, dropped, or cancelled by its caller
+                if not utterance.future.set_running_or_notify_cancel():
+                    continue  # cancelled since the check above
+                if self._pending.get(utterance.key) is utterance:
+                    del self._pending[utterance.key]
+                self.current = utterance
+                return utterance
+
+    def _run(self):
+        while True:
+            utterance = self._next()
+            try:
+                outcome = utterance.play(utterance)
+            except Exception as e:
+                outcome, error = None, e
+            else:
+                error = None
+            with self._lock:
+                self.current = None
+            if error is not None:
+                utterance.future.set_exception(error)
+            else:
+                utterance.future.set_result(outcome)
@@ -0,0 +1,156 @@
+"""Speech-to-text backends for NOVA.
+
+A transcriber takes a ``speech_recognition`` audio source, such as the
+shared microphone capture or an ``sr.AudioFile`` for WAV files, and
+returns the text of the next utterance. Like ``Recognizer.listen``, it
+raises ``sr.WaitTimeoutError`` if no speech starts in time, and raises
+``sr.UnknownValueError`` if nothing intelligible was said.
+
+``VoskTranscriber`` runs offline and reports partial hypotheses through
+``on_partial`` while the user is still speaking. ``GoogleTranscriber``
+wraps the cloud recognizer and only reports the final text.
+"""
+
+import json
+import os
+import time
+import speech_recognition as sr
+from src.logger import logger
+from src.vad import VoiceActivityDetector, record_utterance
+
+VOSK_MODEL_DIR = os.path.join(os.path.dirname(__file__), "..", "models", "vosk-model-small-en-us-0.15")
+
+
+class Transcriber:
+    """Base class for speech-to-text backends."""
+
+    name = "base"
+
+    def transcribe(self, source, on_partial=None, timeout=None, phrase_time_limit=None, vad=None):
+        """Return the text of the next utterance from source.
+
+        With a vad.VoiceActivityDetector the utterance is endpointed by it;
+        otherwise the backend's own endpointing is used.
+        """
+        raise NotImplementedError
+
+
+class GoogleTranscriber(Transcriber):
+    """Endpoints the phrase locally, then sends it to Google in one request."""
+
+    name = "google"
+
+    def __init__(self, recognizer, language="en-US"):
+        self.recognizer = recognizer
+        self.language = language
+
+    def transcribe(self, source, on_partial=None, timeout=None, phrase_time_limit=None, vad=None):
+        if vad is not None:
+            audio = record_utterance(source, vad, timeout, phrase_time_limit)
+        else:
+            audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+        return self.recognizer.recognize_google(audio, language=self.language)
+
+
+class _VoskStream:
+    """One Vosk recognition session; feed() returns True once Vosk has a final result."""
+
+    def __init__(self, model, sample_rate, on_partial):
+        from vosk import KaldiRecognizer
+
+        self.recognizer = KaldiRecognizer(model, sample_rate)
+        self.on_partial = on_partial
+        self.partial = ""
+        self.text = ""
+
+    def feed(self, chunk):
+        if self.recognizer.AcceptWaveform(chunk):
+            # Vosk detected the end of an utterance
+            self.text = json.loads(self.recognizer.Result())["text"]
+            self.partial = ""
+            return bool(self.text)
+
+        hypothesis = json.loads(self.recognizer.PartialResult())["partial"]
+        if hypothesis != self.partial:
+            self.partial = hypothesis
+            if self.on_partial and hypothesis:
+                self.on_partial(hypothesis)
+        return False
+
+    def final(self):
+        return self.text or json.loads(self.recognizer.FinalResult())["text"]
+
+
+class VoskTranscriber(Transcriber):
+    """Offline streaming recognition with Vosk; the model is loaded once and shared."""
+
+    name = "vosk"
+
+    def __init__(self, model_dir=VOSK_MODEL_DIR):
+        from vosk import Model, SetLogLevel
+
+        SetLogLevel(-1)
+        self.model = Model(model_dir)
+
+    def transcribe(self, source, on_partial=None, timeout=None, phrase_time_limit=None, vad=None):
+        stream = _VoskStream(self.model, source.SAMPLE_RATE, on_partial)
+        if vad is not None:
+            # The VAD usually endpoints sooner than Vosk's own silence rules
+            record_utterance(source, vad, timeout, phrase_time_limit, on_chunk=stream.feed)
+        else:
+            self._read_until_endpoint(source, stream, timeout, phrase_time_limit)
+
+        text = stream.final()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    @staticmethod
+    def _read_until_endpoint(source, stream, timeout, phrase_time_limit):
+        seconds_per_chunk = source.CHUNK / source.SAMPLE_RATE
+        elapsed = speech_started = 0.0
+        while True:
+            chunk = source.stream.read(source.CHUNK)
+            if not chunk:
+                return
+            elapsed += seconds_per_chunk
+            had_speech = bool(stream.partial)
+            if stream.feed(chunk):
+                return
+            if stream.partial and not had_speech:
+                speech_started = elapsed
+            if not stream.partial and timeout is not None and elapsed > timeout:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+            if stream.partial and phrase_time_limit is not None and elapsed - speech_started > phrase_time_limit:
+                return
+
+
+class ScriptedTranscriber(Transcriber):
+    """Stand-in backend for benchmarks: endpoints the audio for real, then returns a set transcript."""
+
+    name = "scripted"
+
+    def __init__(self, text="what time is it", delay=0.0):
+        self.text = text
+        self.delay = delay  # simulated recognition time after the endpoint
+
+    def transcribe(self, source, on_partial=None, timeout=None, phrase_time_limit=None, vad=None):
+        record_utterance(source, vad or VoiceActivityDetector(source.SAMPLE_RATE), timeout, phrase_time_limit)
+        time.sleep(self.delay)
+        return self.text
+
+
+def create_transcriber(backend, recognizer):
+    """Build the configured backend: "vosk", "google", or "auto" (Vosk when its model is installed)."""
+    if backend == "vosk" or (backend == "auto" and os.path.isdir(VOSK_MODEL_DIR)):
+        try:
+            return VoskTranscriber()
+        except Exception as e:
+            logger.warning(f"Offline STT unavailable, using Google: {e}")
+    return GoogleTranscriber(recognizer)
+
+
+def transcribe_file(path, transcriber, on_partial=None, vad=None):
+    """Transcribe a WAV/AIFF/FLAC file (e.g. a recorded fixture) without a microphone."""
+    with sr.AudioFile(path) as source:
+        return transcriber.transcribe(source, on_partial=on_partial, vad=vad)
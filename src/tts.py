@@ -0,0 +1,225 @@
+"""Speech synthesis backends for NOVA.
+
+A synthesizer turns text into a stream of events: raw 16-bit mono PCM
+chunks (``bytes``) at ``sample_rate``, interleaved with ``WordBoundary``
+timing events. ``EdgeTTSSynthesizer`` runs edge-tts in-process and decodes
+its MP3 chunks as they arrive, so playback can start on the first chunk
+without temp files. ``FakeSynthesizer`` is a local stand-in for tests.
+"""
+
+import asyncio
+import math
+import queue
+from array import array
+from threading import Lock, Thread
+from typing import NamedTuple
+from src.logger import logger
+
+SAMPLE_RATE = 24000
+SAMPLE_WIDTH = 2
+_TICKS_PER_SECOND = 10_000_000  # edge-tts offsets are in 100 ns units
+
+_LOOP = None
+_LOOP_LOCK = Lock()
+
+
+class WordBoundary(NamedTuple):
+    """A spoken word and when it starts, in seconds from the start of the utterance."""
+
+    offset: float
+    duration: float
+    text: str
+
+
+def _get_loop():
+    """Return the background asyncio loop that runs edge-tts sessions."""
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            _LOOP = asyncio.new_event_loop()
+            Thread(target=_LOOP.run_forever, name="tts-loop", daemon=True).start()
+        return _LOOP
+
+
+class Synthesizer:
+    """Base class for speech synthesis backends."""
+
+    sample_rate = SAMPLE_RATE
+
+    def stream(self, text):
+        """Yield PCM byte chunks and WordBoundary events for text."""
+        raise NotImplementedError
+
+    def prefetch(self, text):
+        """Prepare text for instant playback later (no-op unless the backend caches)."""
+
+
+class _MP3Source:
+    """Blocking byte source for the miniaudio decoder, fed by the edge-tts event queue."""
+
+    def __init__(self, events, boundaries, collect=False):
+        self.events = events
+        self.boundaries = boundaries
+        self.data = bytearray() if collect else None
+        self.timings = []
+        self.error = None
+        self._pending = memoryview(b"")
+        self._eof = False
+
+    def read(self, num_bytes):
+        # Short reads are fine: return whatever has arrived so decoding starts immediately
+        while not self._pending and not self._eof:
+            kind, payload = self.events.get()
+            if kind == "audio":
+                self._pending = memoryview(payload)
+                if self.data is not None:
+                    self.data += payload
+            elif kind == "boundary":
+                self.boundaries.append(payload)
+                self.timings.append(payload)
+            else:
+                self._eof = True
+                self.error = payload
+        chunk, self._pending = self._pending[:num_bytes], self._pending[num_bytes:]
+        return chunk
+
+
+class EdgeTTSSynthesizer(Synthesizer):
+    """In-process edge-tts with streaming MP3 decoding and an optional disk cache."""
+
+    def __init__(self, voice, cache=None, frames_per_chunk=1024):
+        self.voice = voice
+        self.cache = cache
+        self.frames_per_chunk = frames_per_chunk
+
+    async def _pump(self, text, events):
+        try:
+            import edge_tts
+
+            communicate = edge_tts.Communicate(text, self.voice, boundary="WordBoundary")
+            async for chunk in communicate.stream():
+                if chunk["type"] == "audio":
+                    events.put(("audio", chunk["data"]))
+                elif chunk["type"] == "WordBoundary":
+                    events.put((
+                        "boundary",
+                        WordBoundary(
+                            chunk["offset"] / _TICKS_PER_SECOND,
+                            chunk["duration"] / _TICKS_PER_SECOND,
+                            chunk["text"],
+                        ),
+                    ))
+            events.put(("end", None))
+        except Exception as e:
+            events.put(("end", e))
+
+    def _decode(self, source):
+        import miniaudio
+
+        class _Source(miniaudio.StreamableSource):
+            def read(self, num_bytes):
+                return source.read(num_bytes)
+
+        return miniaudio.stream_any(
+            _Source(),
+            source_format=miniaudio.FileFormat.MP3,
+            output_format=miniaudio.SampleFormat.SIGNED16,
+            nchannels=1,
+            sample_rate=self.sample_rate,
+            frames_to_read=self.frames_per_chunk,
+        )
+
+    def _cached_events(self, path):
+        events = queue.Queue()
+        # Word timings are stored beside the audio; replaying them keeps the UI in sync on hits
+        for offset, duration, word in self.cache.load_metadata(path) or ():
+            events.put(("boundary", WordBoundary(offset, duration, word)))
+        with open(path, "rb") as f:
+            events.put(("audio", f.read()))
+        events.put(("end", None))
+        return events
+
+    def stream(self, text):
+        cached = self.cache.lookup(text, self.voice) if self.cache else None
+        if cached:
+            events, future = self._cached_events(cached), None
+        else:
+            events = queue.Queue()
+            future = asyncio.run_coroutine_threadsafe(self._pump(text, events), _get_loop())
+
+        # Only repeated sentences are worth a disk write; stock phrases come in through prefetch
+        collect = future is not None and self.cache is not None and self.cache.seen_before(text, self.voice)
+        boundaries = []
+        source = _MP3Source(events, boundaries, collect=collect)
+        try:
+            for pcm in self._decode(source):
+                while boundaries:
+                    yield boundaries.pop(0)
+                yield pcm.tobytes()
+            while boundaries:
+                yield boundaries.pop(0)
+        except Exception:
+            # A failed synthesis surfaces as a decode error; report the real cause
+            if source.error is not None:
+                raise source.error from None
+            raise
+        finally:
+            if future is not None:
+                future.cancel()
+
+        if source.error is not None:
+            raise source.error
+        if source.data:
+            # Written by the cache's own thread, so the next sentence is not held up
+            self._store(text, bytes(source.data), source.timings, background=True)
+
+    def _store(self, text, mp3_bytes, timings, background=False):
+        def write(path):
+            with open(path, "wb") as f:
+                f.write(mp3_bytes)
+
+        metadata = [list(b) for b in timings]
+        if background:
+            self.cache.store_later(text, self.voice, write, metadata=metadata)
+            return
+        try:
+            self.cache.store(text, self.voice, write, metadata=metadata)
+        except OSError as e:
+            logger.error(f"TTS cache write failed: {e}")
+
+    def prefetch(self, text):
+        """Synthesize text into the cache without decoding or playing it."""
+        if not self.cache or self.cache.lookup(text, self.voice):
+            return
+        events = queue.Queue()
+        asyncio.run_coroutine_threadsafe(self._pump(text, events), _get_loop())
+        data = bytearray()
+        timings = []
+        while True:
+            kind, payload = events.get()
+            if kind == "audio":
+                data += payload
+            elif kind == "boundary":
+                timings.append(payload)
+            elif kind == "end":
+                if payload is not None:
+                    raise payload
+                break
+        self._store(text, bytes(data), timings)
+
+
+class FakeSynthesizer(Synthesizer):
+    """Deterministic local synthesizer: a short quiet tone per word, with word boundaries."""
+
+    def __init__(self, sample_rate=16000, seconds_per_word=0.05, frequency=440.0):
+        self.sample_rate = sample_rate
+        self.seconds_per_word = seconds_per_word
+        self.frequency = frequency
+
+    def stream(self, text):
+        frames = int(self.sample_rate * self.seconds_per_word)
+        step = 2 * math.pi * self.frequency / self.sample_rate
+        tone = array("h", (int(3000 * math.sin(step * i)) for i in range(frames))).tobytes()
+        for index, word in enumerate(text.split()):
+            yield WordBoundary(index * self.seconds_per_word, self.seconds_per_word, word)
+            yield tone
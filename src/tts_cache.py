@@ -0,0 +1,158 @@
+"""Content-addressed disk cache for synthesized speech.
+
+Audio files are named by a hash of the voice and text, so repeated phrases
+are synthesized once and replayed straight from disk. The cache is capped
+by total size and evicts the least recently used files first. Optional
+metadata (e.g. word timings) is kept in a ``.json`` sidecar next to the
+audio file and evicted with it.
+
+Only audio worth replaying is kept: stock phrases prefetched ahead of time,
+and texts spoken more than once (``seen_before``). One-off LLM sentences
+would otherwise churn the cache and evict the stock phrases. Background
+stores (``store_later``) run on a single writer thread, and the directory
+is only rescanned for eviction once the running total exceeds the limit.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from src.logger import logger
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", "tts_cache")
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+SEEN_MAX_ENTRIES = 1024
+
+
+class TTSCache:
+    """LRU-by-size cache of synthesized audio files."""
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, extension=".mp3"):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self._lock = Lock()
+        self._seen = OrderedDict()
+        self._total = None  # bytes on disk, unknown until the first scan
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-cache")
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def _key(self, text, voice):
+        return hashlib.sha256(f"{voice}\0{text}".encode("utf-8")).hexdigest()
+
+    def path_for(self, text, voice):
+        return os.path.join(self.cache_dir, self._key(text, voice) + self.extension)
+
+    def seen_before(self, text, voice):
+        """Record that text is being spoken; True if it was spoken recently before."""
+        key = self._key(text, voice)
+        with self._lock:
+            seen = key in self._seen
+            self._seen[key] = True
+            self._seen.move_to_end(key)
+            while len(self._seen) > SEEN_MAX_ENTRIES:
+                self._seen.popitem(last=False)
+        return seen
+
+    def metadata_path(self, path):
+        return os.path.splitext(path)[0] + ".json"
+
+    def load_metadata(self, path):
+        """Return the sidecar metadata stored with a cached file, or None."""
+        try:
+            with open(self.metadata_path(path), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def lookup(self, text, voice):
+        """Return the cached file for text/voice, or None. Hits refresh the file's LRU position."""
+        path = self.path_for(text, voice)
+        try:
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        with self._lock:
+            self.stats["hits"] += 1
+        return path
+
+    def store(self, text, voice, synthesize, metadata=None):
+        """Run synthesize(tmp_path) and atomically publish the result under the cache key."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path_for(text, voice)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            if metadata is not None:
+                # Written first, so a published audio file never lacks its sidecar
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(metadata, f)
+                os.replace(tmp_path, self.metadata_path(path))
+            synthesize(tmp_path)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        with self._lock:
+            if self._total is not None:
+                self._total += size
+            over = self._total is None or self._total > self.max_bytes
+        if over:
+            self._enforce_limit()
+        return path
+
+    def store_later(self, text, voice, synthesize, metadata=None):
+        """Queue store() on the cache's writer thread; failures are logged."""
+        def run():
+            try:
+                return self.store(text, voice, synthesize, metadata)
+            except OSError as e:
+                logger.error(f"TTS cache write failed: {e}")
+        return self._writer.submit(run)
+
+    def _enforce_limit(self):
+        with self._lock:
+            try:
+                entries = []
+                for name in os.listdir(self.cache_dir):
+                    if not name.endswith(self.extension):
+                        continue
+                    st = os.stat(os.path.join(self.cache_dir, name))
+                    entries.append((st.st_mtime, st.st_size, name))
+            except OSError as e:
+                logger.error(f"TTS cache scan failed: {e}")
+                return
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    os.remove(path)
+                    total -= size
+                    self.stats["evictions"] += 1
+                except OSError:
+                    continue
+                try:
+                    os.remove(self.metadata_path(path))
+                except OSError:
+                    pass
+            self._total = total
+
+    def get_stats(self):
+        """Return hit/miss/eviction counters and the hit rate."""
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+tts_cache = TTSCache()
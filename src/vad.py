@@ -0,0 +1,129 @@
+"""Voice activity detection for NOVA.
+
+Audio is split into 20 ms frames and each frame's energy is compared, in
+one NumPy operation per chunk, against an adaptive noise floor. The floor
+drops quickly when the room gets quieter, and it creeps up slowly when the
+room gets louder. It is updated from every chunk the detector sees, so it
+keeps tuning itself between listens rather than being recalibrated per
+call. A small state machine turns the per-frame decisions into utterances:
+an utterance starts after a short run of speech frames and ends after
+HANGOVER_MS of silence.
+"""
+
+from collections import deque
+import numpy as np
+import speech_recognition as sr
+
+FRAME_MS = 20
+ONSET_MS = 60
+HANGOVER_MS = 300
+PREROLL_MS = 300
+MARGIN_DB = 9.0
+MIN_FLOOR_DB = 20.0  # int16 RMS of about 10; keeps digital silence from pinning the floor
+FLOOR_FALL = 0.5
+FLOOR_RISE = 0.05
+FLOOR_RISE_IN_SPEECH = 0.005  # lets the floor recover if the noise level jumps mid-utterance
+
+
+class VoiceActivityDetector:
+    """Frame-energy VAD with an adaptive noise floor and onset/hangover state machine."""
+
+    def __init__(self, sample_rate, frame_ms=FRAME_MS, onset_ms=ONSET_MS,
+                 hangover_ms=HANGOVER_MS, margin_db=MARGIN_DB):
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.onset_frames = max(1, onset_ms // frame_ms)
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.margin_db = margin_db
+        self.noise_floor = None
+        self._leftover = np.zeros(0, np.float32)
+        self.reset()
+
+    def reset(self):
+        """Start a new utterance search; the learned noise floor is kept."""
+        self.speaking = False
+        self._run = 0
+        self._silence = 0
+
+    def frame_energies(self, samples):
+        """Return the energy in dB of every full frame (vectorized)."""
+        count = len(samples) // self.frame_length
+        frames = samples[:count * self.frame_length].reshape(count, self.frame_length)
+        return 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-9)
+
+    def _update_floor(self, energies, decisions):
+        quiet = energies[~decisions]
+        if len(quiet):
+            level, rise = float(quiet.mean()), FLOOR_RISE
+        else:
+            level, rise = float(energies.min()), FLOOR_RISE_IN_SPEECH
+        rate = FLOOR_FALL if level < self.noise_floor else rise
+        self.noise_floor = max(MIN_FLOOR_DB, self.noise_floor + (level - self.noise_floor) * rate)
+
+    def process(self, pcm):
+        """Feed a chunk of 16-bit PCM; return "start", "end" or None for the transition it contains."""
+        samples = np.concatenate([self._leftover, np.frombuffer(pcm, dtype="<i2").astype(np.float32)])
+        usable = len(samples) - len(samples) % self.frame_length
+        self._leftover = samples[usable:]
+        if not usable:
+            return None
+
+        energies = self.frame_energies(samples[:usable])
+        if self.noise_floor is None:
+            self.noise_floor = max(MIN_FLOOR_DB, float(energies.min()))
+        decisions = energies > self.noise_floor + self.margin_db
+
+        event = None
+        for is_speech in decisions:
+            if not self.speaking:
+                self._run = self._run + 1 if is_speech else 0
+                if self._run >= self.onset_frames:
+                    self.speaking, self._silence, event = True, 0, "start"
+            else:
+                self._silence = 0 if is_speech else self._silence + 1
+                if self._silence >= self.hangover_frames:
+                    self.speaking, self._run, event = False, 0, "end"
+        self._update_floor(energies, decisions)
+        return event
+
+
+def record_utterance(source, vad, timeout=None, phrase_time_limit=None, on_chunk=None, preroll_ms=PREROLL_MS):
+    """Read one utterance from an sr.AudioSource, ending HANGOVER_MS after speech stops.
+
+    Behaves like Recognizer.listen: raises sr.WaitTimeoutError if speech
+    does not start within timeout seconds, and returns sr.AudioData that
+    includes a short pre-roll before the detected onset. on_chunk(chunk)
+    sees every chunk read; returning True from it ends the utterance early.
+    """
+    vad.reset()
+    seconds_per_chunk = source.CHUNK / source.SAMPLE_RATE
+    preroll = deque(maxlen=max(1, int(preroll_ms / 1000 / seconds_per_chunk)))
+    frames = []
+    elapsed = speech_started = 0.0
+
+    while True:
+        chunk = source.stream.read(source.CHUNK)
+        if not chunk:
+            break
+        elapsed += seconds_per_chunk
+        event = vad.process(chunk)
+        stop = on_chunk(chunk) if on_chunk else False
+
+        if not frames:
+            preroll.append(chunk)
+            if event == "start" or vad.speaking:
+                frames.extend(preroll)
+                speech_started = elapsed
+            elif timeout is not None and elapsed > timeout:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+            continue
+
+        frames.append(chunk)
+        if stop or event == "end":
+            break
+        if phrase_time_limit is not None and elapsed - speech_started > phrase_time_limit:
+            break
+
+    if not frames:
+        raise sr.WaitTimeoutError("audio ended before a phrase started")
+    return sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
@@ -1,26 +1,127 @@
 """Voice engine module for speech recognition and synthesis."""
 
 import os
+import re
 import json
 import time
-import subprocess
-from threading import Lock
+import heapq
+import queue
+from threading import Condition, Event, Lock, RLock, Thread
+import numpy as np
 import speech_recognition as sr
-import pygame
 import pyaudio
+from src.tts import EdgeTTSSynthesizer, WordBoundary
+from src.tts_cache import tts_cache
+from src.audio_capture import MicrophoneCapture, SAMPLE_WIDTH
+from src import mic_calibration, wake_word
+from src.stt import GoogleTranscriber, create_transcriber
+from src.vad import VoiceActivityDetector
+from src.preprocess import Preprocessor
+from src.barge_in import BargeInMonitor
+from src.speech_queue import SpeechQueue, PRIORITY_PROMPT, PRIORITY_RESPONSE
 
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), "..", "config.json")
-_TTS_LOCK = Lock()
-_IS_SPEAKING = False
-
-
-def _play_beep():
-    """Play a short beep sound to indicate listening started."""
+VOICE = "en-US-GuyNeural"
+_TTS_LOCK = Lock()  # held while the output stream is in use
+_PYAUDIO_LOCK = Lock()
+_SPEECH = SpeechQueue()  # every utterance is played by its single worker thread
+_SYNTH = EdgeTTSSynthesizer(VOICE, cache=tts_cache)
+_PYAUDIO = None  # one PortAudio session shared by playback, capture and calibration
+_OUTPUT_STREAM = None
+_OUTPUT_RATE = None
+_SINK = None  # replaces the output device when set (replay.FileSink)
+_CAPTURE = None
+_CAPTURE_LOCK = RLock()  # calibration may run while it is held
+_RECOGNIZER = None
+_TRANSCRIBER = None
+_VAD = None
+_WAKE_DETECTOR = None
+_WAKE_END = None  # ring position where the last offline wake-word scan stopped
+WAKE_LISTEN_SECONDS = 5  # offline spotting hands control back to the UI loop this often
+SPEAKING_POLL_SECONDS = 0.2  # while NOVA speaks, wake listening just waits this long and returns
+COMMAND_WAIT_SECONDS = 1.0  # a command starting this soon after the wake word shares its phrase
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+_PIPELINE_DEPTH = 512  # queued PCM chunks/events between synthesis and playback
+_OUTPUT_BUFFER_FRAMES = 1024
+_ECHO_COUPLING_DB = 0.0  # learned speaker-to-mic gain, carried between utterances
+_RESUME_POS = None  # ring position where a barge-in started; the next listen begins there
+UI_FRAME_INTERVAL = 1 / 30  # at most one batch of words pushed to the UI per frame
+BEEP = ((800, 150),)  # (Hz, ms) notes
+TONE_VOLUME = 0.3
+TONE_FADE_MS = 5
+EARCON_WAIT = 1.0  # seconds a caller waits for its earcon behind other speech
+BEEP_ECHO_SECONDS = 0.15  # input buffering and room echo after the beep stops playing
+_EARCONS = {}  # (notes, rate) -> rendered PCM
+
+# Fixed prompts spoken by this module; synthesized ahead of time by precache_phrases
+STOCK_PHRASES = [
+    "Calibrating microphone. Please remain silent.",
+    "Microphone configured successfully.",
+    "No microphone detected.",
+]
+
+
+def _tone(notes, rate):
+    """Render [(frequency, ms)] as 16-bit PCM, with short fades so notes don't click."""
+    parts = []
+    for frequency, ms in notes:
+        t = np.arange(int(rate * ms / 1000)) / rate
+        wave = np.sin(2 * np.pi * frequency * t)
+        fade = min(len(t) // 2, int(rate * TONE_FADE_MS / 1000))
+        if fade:
+            ramp = np.linspace(0.0, 1.0, fade)
+            wave[:fade] *= ramp
+            wave[-fade:] *= ramp[::-1]
+        parts.append(wave)
+    return (np.concatenate(parts) * TONE_VOLUME * 32767).astype("<i2").tobytes()
+
+
+def _play_earcon(notes):
+    """Queue a tone on the speech worker and wait (briefly) until it has played.
+
+    Returns the monotonic time the tone stops being heard, or None if it did not play in time.
+    """
+    heard = []
+
+    def play(utterance):
+        with _TTS_LOCK:
+            rate = _SYNTH.sample_rate
+            key = (tuple(notes), rate)
+            if key not in _EARCONS:
+                _EARCONS[key] = _tone(notes, rate)
+            output = _get_output(rate, utterance.interrupted)
+            output.write(_EARCONS[key])
+            end = output.due_time(output.frames)
+            output.finish()
+        heard.append(max(end, time.monotonic()))
+        return "done"
+
+    future = _SPEECH.submit(play, priority=PRIORITY_RESPONSE, key=("earcon", tuple(notes)))
     try:
-        import winsound
-        winsound.Beep(800, 150)  # 800Hz for 150ms
+        future.result(timeout=EARCON_WAIT)
     except Exception:
-        pass  # Silently fail if beep doesn't work
+        # A missing beep must never hold up listening, and a late one would land in the
+        # listen that follows; one already playing is short, so wait for it to end
+        if not future.cancel():
+            try:
+                future.result(timeout=EARCON_WAIT)
+            except Exception:
+                pass
+    return heard[0] if heard else None
+
+
+def _play_beep(capture=None):
+    """Play a short beep sound to indicate listening started.
+
+    With a capture, returns the (start, end) ring positions that may hold
+    the beep, so a RingSource can skip them and the VAD never hears it.
+    """
+    start = capture.ring.written if capture is not None else 0
+    heard_until = _play_earcon(BEEP) or time.monotonic()
+    if capture is None:
+        return None
+    seconds = max(0.0, heard_until - time.monotonic()) + BEEP_ECHO_SECONDS
+    return start, capture.ring.written + int(seconds * capture.sample_rate) * SAMPLE_WIDTH
 
 
 def load_dna_config():
@@ -38,124 +139,644 @@ def save_dna_config(config):
         json.dump(config, f)
 
 
-def speak(text, word_callback=None):
-    """Text-to-speech with word streaming callback."""
-    global _IS_SPEAKING
-    temp_file = f"tts_{int(time.time() * 1000)}.mp3"
-    
+def set_synthesizer(synthesizer):
+    """Swap the TTS backend (e.g. tts.FakeSynthesizer in tests)."""
+    global _SYNTH
+    with _TTS_LOCK:
+        _SYNTH = synthesizer
+
+
+class _StreamOutput:
+    """Plays PCM through a PyAudio output stream that stays open between utterances."""
+
+    def __init__(self, stream, rate, cancel):
+        self.stream = stream
+        self.rate = rate
+        self.cancel = cancel
+        self.frames = 0
+        try:
+            self.latency = stream.get_output_latency()
+        except Exception:
+            self.latency = 0.0
+
+    def write(self, pcm):
+        # One device buffer at a time, so cancelling stops the audio within a buffer period
+        step = _OUTPUT_BUFFER_FRAMES * 2
+        for start in range(0, len(pcm), step):
+            if self.cancel.is_set():
+                return
+            piece = pcm[start:start + step]
+            self.stream.write(piece)
+            self.frames += len(piece) // 2
+
+    def due_time(self, frame):
+        """Monotonic time at which an already-written frame will be heard."""
+        # A blocking write returns once its data is queued, so the last frame written plays after the device latency
+        return time.monotonic() + self.latency - (self.frames - frame) / self.rate
+
+    def finish(self):
+        pass
+
+
+class _PygameOutput:
+    """Fallback when no PyAudio output stream can be opened: buffers PCM and plays it with pygame, if installed."""
+
+    def __init__(self, rate, cancel):
+        self.rate = rate
+        self.cancel = cancel
+        self.frames = 0
+        self.pcm = bytearray()
+
+    def write(self, pcm):
+        self.pcm += pcm
+        self.frames += len(pcm) // 2
+
+    def due_time(self, frame):
+        # Nothing plays until finish(), so there is no clock to follow
+        return time.monotonic()
+
+    def finish(self):
+        try:
+            import pygame  # optional; only loaded when the PyAudio output fails
+        except ImportError:
+            print(">>> No audio output available (PyAudio failed and pygame is not installed)")
+            return
+        if pygame.mixer.get_init() != (self.rate, -16, 1):
+            pygame.mixer.quit()
+            pygame.mixer.init(frequency=self.rate, size=-16, channels=1)
+        channel = pygame.mixer.Sound(buffer=bytes(self.pcm)).play()
+        while channel.get_busy():
+            if self.cancel.is_set():
+                channel.stop()
+                return
+            time.sleep(0.05)
+
+
+def _get_pyaudio():
+    """Return the shared PyAudio instance, initializing PortAudio on first use."""
+    global _PYAUDIO
+    with _PYAUDIO_LOCK:
+        if _PYAUDIO is None:
+            _PYAUDIO = pyaudio.PyAudio()
+        return _PYAUDIO
+
+
+def _reset_pyaudio():
+    """Re-initialize PortAudio so newly plugged devices are listed; returns the new instance.
+
+    The capture must already be stopped. The output stream is closed once
+    any speech in progress has finished, and reopened on next use.
+    """
+    global _PYAUDIO, _OUTPUT_STREAM, _OUTPUT_RATE
+    with _TTS_LOCK, _PYAUDIO_LOCK:
+        if _OUTPUT_STREAM is not None:
+            try:
+                _OUTPUT_STREAM.close()
+            except (OSError, IOError):
+                pass
+            _OUTPUT_STREAM = _OUTPUT_RATE = None
+        if _PYAUDIO is not None:
+            _PYAUDIO.terminate()
+        _PYAUDIO = pyaudio.PyAudio()
+        return _PYAUDIO
+
+
+def _get_output(rate, cancel):
+    """Return the persistent output stream for rate, opening it on first use."""
+    global _OUTPUT_STREAM, _OUTPUT_RATE
+    if _SINK is not None:
+        return _StreamOutput(_SINK.open(rate), rate, cancel)
+    if _OUTPUT_STREAM is not None and _OUTPUT_RATE == rate:
+        return _StreamOutput(_OUTPUT_STREAM, rate, cancel)
+
     try:
-        print(f">>> NOVA: {text}")
-        
-        with _TTS_LOCK:
-            subprocess.run(
-                ["edge-tts", "--voice", "en-US-GuyNeural", "--text", text, "--write-media", temp_file],
-                capture_output=True,
-                check=True,
-            )
+        if _OUTPUT_STREAM is not None:
+            _OUTPUT_STREAM.close()
+            _OUTPUT_STREAM = None
+        _OUTPUT_STREAM = _get_pyaudio().open(
+            format=pyaudio.paInt16, channels=1, rate=rate, output=True,
+            frames_per_buffer=_OUTPUT_BUFFER_FRAMES,
+        )
+        _OUTPUT_RATE = rate
+        return _StreamOutput(_OUTPUT_STREAM, rate, cancel)
+    except (OSError, IOError) as e:
+        print(f">>> Audio output error, falling back to pygame: {e}")
+        return _PygameOutput(rate, cancel)
 
-            if not pygame.mixer.get_init():
-                pygame.mixer.init()
 
-            _IS_SPEAKING = True
-            pygame.mixer.music.load(temp_file)
-            pygame.mixer.music.play()
+def set_audio_sink(sink):
+    """Send playback to sink instead of the speakers (e.g. replay.FileSink); None restores the device."""
+    global _SINK
+    with _TTS_LOCK:
+        _SINK = sink
 
-            if word_callback:
-                words = text.split()
-                for i, word in enumerate(words):
-                    word_callback(word, i, len(words))
-                    time.sleep(0.15)
 
-            while pygame.mixer.music.get_busy():
-                time.sleep(0.1)
-            pygame.mixer.music.unload()
-            
+def _split_sentences(text):
+    return [s for s in _SENTENCE_SPLIT_RE.split(text.strip()) if s]
+
+
+def precache_phrases(phrases=()):
+    """Synthesize stock phrases into the TTS cache (run in a background thread at startup).
+
+    Phrases are cached sentence by sentence, the same pieces say() speaks.
+    """
+    for text in list(STOCK_PHRASES) + list(phrases):
+        for sentence in _split_sentences(text):
+            try:
+                _SYNTH.prefetch(sentence)
+            except Exception as e:
+                print(f"TTS precache error: {e}")
+    print(f">>> TTS cache ready: {tts_cache.get_stats()}")
+
+
+def _put(events, item, stop):
+    """Queue item for the player unless playback has been abandoned."""
+    while not stop.is_set():
+        try:
+            events.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _synthesize_sentences(sentences, events, stop):
+    """Producer stage: synthesize each sentence in turn while earlier ones play."""
+    try:
+        for sentence in sentences:
+            print(f">>> NOVA: {sentence}")
+            if not _put(events, ("sentence", sentence.split()), stop):
+                return
+            for event in _SYNTH.stream(sentence):
+                if not _put(events, ("audio", event), stop):
+                    return
     except Exception as e:
-        print(f"TTS Error: {e}")
+        _put(events, ("error", e), stop)
     finally:
-        _IS_SPEAKING = False
-        if os.path.exists(temp_file):
+        _put(events, ("end", None), stop)
+
+
+class _WordClock(Thread):
+    """Delivers scheduled words at their playback time, coalesced into batches.
+
+    The callback receives a list of (word, index, total) tuples and is
+    called at most once per UI_FRAME_INTERVAL.
+    """
+
+    def __init__(self, callback, interval=UI_FRAME_INTERVAL):
+        super().__init__(name="word-clock", daemon=True)
+        self.callback = callback
+        self.interval = interval
+        self._pending = []
+        self._closed = False
+        self._cond = Condition()
+
+    def schedule(self, due, word, index, total):
+        with self._cond:
+            heapq.heappush(self._pending, (due, index, word, total))
+            self._cond.notify()
+
+    def close(self, discard=False):
+        """Deliver the remaining words on schedule (or drop them), then stop."""
+        with self._cond:
+            self._closed = True
+            if discard:
+                self._pending.clear()
+            self._cond.notify()
+        self.join()
+
+    def run(self):
+        last = float("-inf")
+        while True:
+            with self._cond:
+                while True:
+                    if not self._pending:
+                        if self._closed:
+                            return
+                        self._cond.wait()
+                        continue
+                    ready_at = max(self._pending[0][0], last + self.interval)
+                    now = time.monotonic()
+                    if ready_at <= now:
+                        break
+                    self._cond.wait(ready_at - now)
+                batch = []
+                while self._pending and self._pending[0][0] <= now:
+                    _, index, word, total = heapq.heappop(self._pending)
+                    batch.append((word, index, total))
+            last = now
             try:
-                os.remove(temp_file)
-            except Exception:
-                pass
+                self.callback(batch)
+            except Exception as e:
+                print(f"Word callback error: {e}")
 
 
-def listen_for_wake_word():
-    """Listen continuously for wake word 'Nova'."""
-    config = load_dna_config()
+def _start_barge_in_monitor(on_barge_in):
+    """Watch the mic for the user talking over NOVA; None if no capture is running."""
+    capture, vad = _CAPTURE, _VAD
+    if capture is None or not capture.alive or vad is None:
+        return None
+    if not load_dna_config().get("barge_in", True):
+        return None
+    monitor = BargeInMonitor(capture, vad, on_barge_in, coupling_db=_ECHO_COUPLING_DB)
+    monitor.start()
+    return monitor
+
+
+def _play(utterance, sentences, word_callback, total_words, barge_in):
+    """Speak an iterable of sentences as a two-stage pipeline (runs on the speech worker).
+
+    A producer thread synthesizes sentence N+1 while this thread plays
+    sentence N. Blocking queue reads and output writes drive the handoff,
+    so there is no polling and no gap between sentences.
+    """
+    global _ECHO_COUPLING_DB, _RESUME_POS
+    stop = Event()
+    interrupted = utterance.interrupted
+    events = queue.Queue(maxsize=_PIPELINE_DEPTH)
+    producer = Thread(target=_synthesize_sentences, args=(sentences, events, stop), daemon=True)
+    clock = _WordClock(word_callback) if word_callback else None
+    monitor = None
+
+    def wake():
+        try:
+            events.put_nowait(("end", None))  # unblock the player if it is waiting on synthesis
+        except queue.Full:
+            pass
+
+    with _TTS_LOCK:
+        try:
+            utterance.wake = wake
+            output = _get_output(_SYNTH.sample_rate, interrupted)
+            producer.start()
+            if clock:
+                clock.start()
+            if barge_in:
+                monitor = _start_barge_in_monitor(utterance.interrupt)
+            # Words whose start frame has not been written yet: (frame, word, index)
+            timed = []
+            words, shown, offset, sentence_start = [], 0, 0, 0
+
+            def release(upto):
+                while timed and timed[0][0] <= upto:
+                    frame, word, index = timed.pop(0)
+                    if clock:
+                        clock.schedule(output.due_time(frame), word, index, total_words)
+
+            def release_untimed():
+                # Words the synthesizer gave no boundary for appear once their sentence has played
+                nonlocal shown
+                for i in range(shown, len(words)):
+                    timed.append((output.frames, words[i], offset + i))
+                shown = len(words)
+                release(output.frames)
+
+            while not interrupted.is_set():
+                kind, payload = events.get()
+                if kind == "audio" and isinstance(payload, WordBoundary):
+                    if shown < len(words):
+                        frame = sentence_start + int(payload.offset * output.rate)
+                        timed.append((frame, words[shown], offset + shown))
+                        shown += 1
+                elif kind == "audio":
+                    output.write(payload)
+                    if monitor:
+                        monitor.played(payload)
+                    release(output.frames)
+                elif kind == "sentence":
+                    release_untimed()
+                    offset += len(words)
+                    words, shown, sentence_start = payload, 0, output.frames
+                elif kind == "error":
+                    print(f"TTS Error: {payload}")
+                else:
+                    break
+
+            if not interrupted.is_set():
+                release_untimed()
+                output.finish()
+
+        except Exception as e:
+            print(f"TTS Error: {e}")
+        finally:
+            stop.set()
+            utterance.wake = None
+            if monitor:
+                monitor.stop()
+                _ECHO_COUPLING_DB = monitor.coupling_db
+                if monitor.onset_pos is not None:
+                    _RESUME_POS = monitor.onset_pos
+            if clock and clock.is_alive():
+                clock.close(discard=interrupted.is_set())
+
+    if monitor and monitor.onset_pos is not None:
+        print(">>> Barge-in: user started talking.")
+        return "barge_in"
+    return "interrupted" if interrupted.is_set() else "done"
+
+
+def say_stream(sentences, word_callback=None, total_words=0, barge_in=False, priority=PRIORITY_RESPONSE):
+    """Queue sentences for speaking and return a Future of the outcome.
+
+    Words are timed by the synthesizer's word boundaries against the
+    playback clock and handed to word_callback in batches: a list of
+    (word, index, total) tuples, at most one call per UI_FRAME_INTERVAL.
+    index runs across sentences; total is total_words, or 0 when the
+    length is not known up front.
+
+    interrupt_speech() stops playback within one output buffer. With
+    barge_in, the microphone is watched while speaking and the user
+    talking over NOVA interrupts it too. The Future resolves to "done",
+    "interrupted", "barge_in", or "dropped" when a higher-priority
+    utterance superseded it before it started (see speech_queue).
+    """
+    return _SPEECH.submit(
+        lambda utterance: _play(utterance, sentences, word_callback, total_words, barge_in),
+        priority=priority,
+    )
+
+
+def say(text, word_callback=None, priority=PRIORITY_PROMPT):
+    """Queue text for speaking and return a Future of the outcome (see say_stream).
+
+    Long text is split into sentences so the first one starts playing while
+    the rest are still being synthesized. Identical text already waiting in
+    the queue is spoken once.
+    """
+    sentences = _split_sentences(text)
+    return _SPEECH.submit(
+        lambda utterance: _play(utterance, sentences, word_callback, len(text.split()), False),
+        priority=priority,
+        key=None if word_callback else text,
+    )
+
+
+def speak(text, word_callback=None):
+    """Speak text and wait until it has been played; returns the outcome."""
+    return say(text, word_callback).result()
+
+
+def interrupt_speech():
+    """Stop the current utterance within one output buffer; returns False if nothing was playing."""
+    utterance = _SPEECH.current
+    if utterance is None:
+        return False
+    utterance.interrupt()
+    return True
+
+
+def is_speaking():
+    """Return True while NOVA is playing speech."""
+    return _SPEECH.current is not None
 
-    if "device_index" not in config:
-        if scan_for_neural_links() != "READY_STATUS":
-            return False
-        config = load_dna_config()
 
-    recognizer = sr.Recognizer()
-    dev_idx = int(config.get("device_index"))
+def _new_capture(config):
+    """Build a capture for the configured device on the shared PyAudio instance.
+
+    Unless "preprocess" is off in config.json, audio is resampled to 16 kHz,
+    high-passed and gain-normalized before anything listens to it.
+    """
     rate = config.get("sample_rate", 16000)
+    preprocessor = Preprocessor(rate) if config.get("preprocess", True) else None
+    return MicrophoneCapture(
+        int(config.get("device_index")), rate, audio=_get_pyaudio(), preprocessor=preprocessor
+    )
 
-    if config.get("threshold"):
-        recognizer.energy_threshold = float(config["threshold"])
-        recognizer.dynamic_energy_threshold = False
 
-    try:
-        with sr.Microphone(device_index=dev_idx, sample_rate=rate) as source:
-            recognizer.adjust_for_ambient_noise(source, duration=0.05)
-            recognizer.pause_threshold = 1.0
-            recognizer.dynamic_energy_threshold = True
-
-            print(">>> 👂 Listening for wake word 'Nova'...")
-            audio = recognizer.listen(source, timeout=None, phrase_time_limit=3)
-            text = recognizer.recognize_google(audio, language="en-US").lower()
-            
-            if "nova" in text:
-                print(">>> Wake word detected!")
-                _play_beep()  # Play beep when wake word detected
-                return True
+def _get_capture():
+    """Return the running microphone capture and its recognizer, starting them on first use.
+
+    The device is opened once and kept open; config.json is only re-read
+    when there is no running capture (e.g. after a mic error or calibration).
+    """
+    global _CAPTURE, _RECOGNIZER, _VAD
+    with _CAPTURE_LOCK:
+        if _CAPTURE is not None and _CAPTURE.alive:
+            return _CAPTURE, _RECOGNIZER
+
+        config = load_dna_config()
+        if "device_index" not in config:
+            if scan_for_neural_links() != "READY_STATUS":
+                return None, None
+            config = load_dna_config()
+
+        if _CAPTURE is not None:
+            _CAPTURE.stop()
+        try:
+            capture = _new_capture(config)
+            capture.start()
+        except (OSError, IOError) as e:
+            print(f">>> Mic error: {e}")
+            if not _recover_microphone():
+                return None, None
+            config = load_dna_config()
+            capture = _new_capture(config)
+            capture.start()
+
+        recognizer = sr.Recognizer()
+        if config.get("threshold"):
+            recognizer.energy_threshold = float(config["threshold"])
+        else:
+            with capture.source(preroll=0) as source:
+                recognizer.adjust_for_ambient_noise(source, duration=0.5)
+        # The recognizer lives as long as the capture, so it keeps adapting across listens
+        recognizer.dynamic_energy_threshold = True
+
+        _CAPTURE, _RECOGNIZER = capture, recognizer
+        _VAD = VoiceActivityDetector(capture.sample_rate)
+        return capture, recognizer
+
+
+def set_capture(capture):
+    """Listen on an already started capture (e.g. replay.FileCapture) instead of the microphone."""
+    global _CAPTURE, _RECOGNIZER, _VAD
+    with _CAPTURE_LOCK:
+        if _CAPTURE is not None and _CAPTURE is not capture:
+            _CAPTURE.stop()
+        _CAPTURE, _RECOGNIZER = capture, sr.Recognizer()
+        _VAD = VoiceActivityDetector(capture.sample_rate)
+
+
+def _stop_capture():
+    """Release the microphone (before calibration or after a device error)."""
+    global _CAPTURE
+    with _CAPTURE_LOCK:
+        if _CAPTURE is not None:
+            _CAPTURE.stop()
+            _CAPTURE = None
+
+
+def _get_wake_detector(capture):
+    """Return the offline wake-word detector, or None until enough templates have been learned."""
+    global _WAKE_DETECTOR
+    if _WAKE_DETECTOR is None or _WAKE_DETECTOR.sample_rate != capture.sample_rate:
+        templates = wake_word.load_templates()
+        if len(templates) < wake_word.MIN_TEMPLATES:
+            return None
+        threshold = load_dna_config().get("wake_threshold", wake_word.DEFAULT_THRESHOLD)
+        _WAKE_DETECTOR = wake_word.WakeWordDetector(templates, capture.sample_rate, float(threshold))
+    return _WAKE_DETECTOR
+
+
+def _spot_wake_word(capture, recognizer, detector):
+    """Run the offline detector on the capture stream for up to WAKE_LISTEN_SECONDS."""
+    global _WAKE_END
+    with capture.source() as source:
+        if source.pos != _WAKE_END:
+            detector.reset()  # the audio is not continuous with the last call
+        detector.energy_floor = recognizer.energy_threshold
+        try:
+            for _ in range(int(WAKE_LISTEN_SECONDS * source.SAMPLE_RATE / source.CHUNK)):
+                chunk = source.stream.read(source.CHUNK)
+                if not chunk:
+                    break
+                _VAD.process(chunk)  # keeps the noise floor tracking the room between commands
+                if detector.process(chunk):
+                    return True
             return False
-            
-    except (sr.UnknownValueError, sr.WaitTimeoutError):
-        return False
+        finally:
+            _WAKE_END = source.stream.pos
+
+
+def _detect_wake_word(capture, recognizer, phrase_time_limit):
+    """Wait for the wake word; returns (detected, text spoken after it in the same phrase)."""
+    global _WAKE_DETECTOR
+    detector = _get_wake_detector(capture)
+    if detector is not None:
+        # The offline spotter fires as the word ends; any command is still ahead in the ring
+        return _spot_wake_word(capture, recognizer, detector), ""
+
+    with capture.source() as source:
+        recognizer.pause_threshold = 1.0
+        print(">>> 👂 Listening for wake word 'Nova'...")
+        audio = recognizer.listen(source, timeout=None, phrase_time_limit=phrase_time_limit)
+    text = recognizer.recognize_google(audio, language="en-US").lower()
+    if text.strip() == "nova":
+        count = wake_word.add_template(audio.get_raw_data(), audio.sample_rate)
+        print(f">>> Learned wake word sample {count}/{wake_word.MIN_TEMPLATES}")
+        _WAKE_DETECTOR = None
+    _, found, rest = text.partition("nova")
+    return bool(found), rest.strip(" ,.!?")
+
+
+def _listen_for_wake(with_command, on_partial=None):
+    try:
+        capture, recognizer = _get_capture()
+        if capture is None:
+            return False, None
+
+        if is_speaking():
+            # NOVA's own voice ("I am NOVA...") must not wake it; talking over it goes through barge-in
+            time.sleep(SPEAKING_POLL_SECONDS)
+            capture.consumed = max(capture.consumed, capture.ring.written)
+            return False, None
+
+        detected, command = _detect_wake_word(capture, recognizer, 12 if with_command else 3)
+        if not detected:
+            return False, None
+        if is_speaking():
+            print(">>> Wake word ignored while speaking.")
+            return False, None
+        print(">>> Wake word detected!")
+        if not with_command:
+            beep = _play_beep(capture)  # Play beep when wake word detected
+            # The next listen starts after the beep, so its VAD never hears it
+            capture.consumed = max(capture.consumed, beep[1])
+            return True, None
+        if command:
+            return True, command
+
+        # "Nova, open chrome": keep reading the same capture for a command that follows at once,
+        # from where the wake word ended. No beep here, it would land on the command; if the
+        # user pauses instead, the listen() that follows beeps first.
+        try:
+            with capture.source(start=capture.consumed) as source:
+                command = _get_transcriber(recognizer).transcribe(
+                    source, on_partial=on_partial, timeout=COMMAND_WAIT_SECONDS,
+                    phrase_time_limit=12, vad=_VAD,
+                )
+        except (sr.UnknownValueError, sr.WaitTimeoutError):
+            return True, None
+        print(f">>> USER: {command}")
+        return True, command
+
+    except (sr.UnknownValueError, sr.WaitTimeoutError, sr.RequestError):
+        return False, None
     except (OSError, IOError) as e:
         print(f">>> Mic error: {e}")
-        return False
+        _stop_capture()
+        return False, None
+
+
+def listen_for_wake_word():
+    """Listen continuously for wake word 'Nova'.
+
+    Once enough templates have been learned this runs fully offline;
+    until then each phrase goes to the cloud recognizer, and phrases it
+    hears as exactly "nova" become new templates.
+    """
+    return _listen_for_wake(with_command=False)[0]
+
 
+def listen_for_wake_and_command(on_partial=None):
+    """Listen for 'Nova' plus a command in the same phrase ("Nova, open chrome").
 
-def listen(skip_wake_word=False):
-    """Capture voice input and convert to text."""
+    Returns (detected, command). command is None when the user paused
+    after the wake word, in which case the caller listens for it separately.
+    """
+    return _listen_for_wake(with_command=True, on_partial=on_partial)
+
+
+def _get_transcriber(recognizer):
+    """Return the STT backend chosen by "stt_backend" in config.json (default "auto")."""
+    global _TRANSCRIBER
+    if _TRANSCRIBER is None:
+        _TRANSCRIBER = create_transcriber(load_dna_config().get("stt_backend", "auto"), recognizer)
+        print(f">>> Speech recognition: {_TRANSCRIBER.name}")
+    elif isinstance(_TRANSCRIBER, GoogleTranscriber):
+        _TRANSCRIBER.recognizer = recognizer  # follow the recognizer of the current capture
+    return _TRANSCRIBER
+
+
+def set_transcriber(transcriber):
+    """Swap the STT backend (e.g. a VoskTranscriber with another model)."""
+    global _TRANSCRIBER
+    _TRANSCRIBER = transcriber
+
+
+def listen(skip_wake_word=False, on_partial=None):
+    """Capture voice input and convert to text.
+
+    on_partial(text) receives interim hypotheses while the user is still
+    speaking, if the STT backend produces them.
+    """
+    global _RESUME_POS
     if not skip_wake_word:
         # Wait for wake word first
         if not listen_for_wake_word():
             return None
-    
-    config = load_dna_config()
 
-    if "device_index" not in config:
-        if scan_for_neural_links() != "READY_STATUS":
+    try:
+        capture, recognizer = _get_capture()
+        if capture is None:
             return None
-        config = load_dna_config()
 
-    recognizer = sr.Recognizer()
-    dev_idx = int(config.get("device_index"))
-    rate = config.get("sample_rate", 16000)
-
-    if config.get("threshold"):
-        recognizer.energy_threshold = float(config["threshold"])
-        recognizer.dynamic_energy_threshold = False
+        # The pre-roll keeps speech that started before this call;
+        # after a barge-in, start where the user began talking over NOVA
+        start, _RESUME_POS = _RESUME_POS, None
+        source = capture.source(start=start)
+        print(f">>> 🎤 Listening on device {capture.device_index}...")
+        if start is None:
+            source.skip = _play_beep(capture)  # the beep is left out, so the VAD can't trigger on it
+        # After a barge-in the user is already mid-sentence: no beep over them, nothing cut out
+        with source:
+            # The VAD ends the utterance HANGOVER_MS after speech stops, instead of a fixed 2 s pause
+            query = _get_transcriber(recognizer).transcribe(
+                source, on_partial=on_partial, timeout=8, phrase_time_limit=12, vad=_VAD
+            )
+        print(f">>> USER: {query}")
+        return query
 
-    try:
-        with sr.Microphone(device_index=dev_idx, sample_rate=rate) as source:
-            recognizer.adjust_for_ambient_noise(source, duration=0.05)
-            recognizer.pause_threshold = 2.0
-            recognizer.dynamic_energy_threshold = True
-
-            print(f">>> 🎤 Listening on device {dev_idx}...")
-            _play_beep()  # Play beep when starting to listen
-            audio = recognizer.listen(source, timeout=8, phrase_time_limit=12)
-            query = recognizer.recognize_google(audio, language="en-US")
-            print(f">>> USER: {query}")
-            return query
-            
     except sr.UnknownValueError:
         print(">>> No speech detected.")
         return None
@@ -164,66 +785,64 @@ def listen(skip_wake_word=False):
         return None
     except (OSError, IOError) as e:
         print(f">>> Mic error: {e}")
-        if os.path.exists(CONFIG_FILE):
-            os.remove(CONFIG_FILE)
-        scan_for_neural_links()
+        _stop_capture()
+        _recover_microphone()
         return None
 
 
+def _activate_profile(profile, profiles=None):
+    """Make profile the active microphone in config.json, merging in any newly probed profiles."""
+    config = load_dna_config()  # keep user settings such as wake_threshold
+    known = config.setdefault("profiles", {})
+    for p in profiles or [profile]:
+        known[p["fingerprint"]] = p
+    config.update({
+        "device_index": profile["device_index"],
+        "sample_rate": profile["sample_rate"],
+        "threshold": profile["threshold"],
+        "fingerprint": profile["fingerprint"],
+    })
+    save_dna_config(config)
+
+
+def _recover_microphone():
+    """After a device error, re-validate known microphones (~100 ms) before falling back to a full scan.
+
+    The current PortAudio session is tried first. Only if no known device
+    records there is PortAudio re-initialized (which waits for speech in
+    progress) so that devices plugged in since startup are listed.
+    """
+    config = load_dna_config()
+    profiles = config.get("profiles", {})
+    if profiles:
+        started = time.monotonic()
+        for get_audio in (_get_pyaudio, _reset_pyaudio):
+            profile = mic_calibration.revalidate(get_audio(), profiles, preferred=config.get("fingerprint"))
+            if profile is not None:
+                break
+        elapsed_ms = (time.monotonic() - started) * 1000
+        if profile is not None:
+            print(f">>> Microphone re-validated in {elapsed_ms:.0f} ms: {profile['name']} (device {profile['device_index']})")
+            _activate_profile(profile)
+            return True
+        print(f">>> No known microphone re-validated ({elapsed_ms:.0f} ms); rescanning.")
+    return scan_for_neural_links() == "READY_STATUS"
+
+
 def scan_for_neural_links():
-    """Auto-detect and configure best microphone."""
+    """Auto-detect and configure best microphone, probing all devices in parallel."""
     print(">>> Scanning audio devices...")
+    _stop_capture()
     speak("Calibrating microphone. Please remain silent.")
 
-    recognizer = sr.Recognizer()
-    priority_indices = []
-    secondary_indices = []
-
-    try:
-        p = pyaudio.PyAudio()
-        for i in range(p.get_device_count()):
-            info = p.get_device_info_by_index(i)
-            name = info.get("name", "").lower()
-            channels = info.get("maxInputChannels", 0)
-
-            if channels > 0:
-                if "microphone array" in name or "conexant" in name:
-                    priority_indices.append(i)
-                elif "sound mapper" in name or "primary" in name:
-                    secondary_indices.append(i)
-                else:
-                    priority_indices.append(i)
-        p.terminate()
-    except Exception as e:
-        print(f"Device search error: {e}")
-        priority_indices = [1, 5, 11]
-        secondary_indices = [0]
-
-    test_queue = priority_indices + secondary_indices
-    best_idx = None
-    best_rate = 16000
+    profiles = mic_calibration.scan(_reset_pyaudio())
 
-    for idx in test_queue:
-        for rate in (16000, 44100):
-            try:
-                with sr.Microphone(device_index=idx, sample_rate=rate) as source:
-                    recognizer.adjust_for_ambient_noise(source, duration=1.5)
-                    et = recognizer.energy_threshold
-                    if 35 < et < 2000:
-                        best_idx = idx
-                        best_rate = rate
-                        print(f">>> Device {idx} validated (threshold: {int(et)})")
-                        break
-            except (OSError, IOError):
-                continue
-        if best_idx is not None:
-            break
-
-    if best_idx is not None:
-        final_threshold = min(int(recognizer.energy_threshold) + 100, 400)
-        save_dna_config({"device_index": best_idx, "sample_rate": best_rate, "threshold": final_threshold})
-        speak("Microphone configured successfully.")
+    if profiles:
+        best = profiles[0]
+        print(f">>> Device {best['device_index']} validated (threshold: {best['threshold']})")
+        _activate_profile(best, profiles)
+        say("Microphone configured successfully.")
         return "READY_STATUS"
 
-    speak("No microphone detected.")
+    say("No microphone detected.")
     return None
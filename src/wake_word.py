@@ -0,0 +1,211 @@
+"""Offline wake-word spotting for NOVA.
+
+Audio is turned into MFCC frames (25 ms windows, 10 ms hop) with NumPy,
+and the most recent second or so is matched against enrolled templates of
+the user saying "Nova" using subsequence DTW. A detection fires when the
+best template's mean per-frame cosine distance drops below the threshold:
+lower thresholds mean fewer false accepts but more false rejects.
+
+Templates are learned from utterances that the cloud recognizer confirmed
+as exactly "nova", and are saved in ``wake_templates.npz`` next to
+``config.json``.
+"""
+
+import os
+import numpy as np
+from src.logger import logger
+
+TEMPLATES_FILE = os.path.join(os.path.dirname(__file__), "..", "wake_templates.npz")
+DEFAULT_THRESHOLD = 0.2
+MIN_TEMPLATES = 3
+MAX_TEMPLATES = 8
+
+FRAME_SECONDS = 0.025
+HOP_SECONDS = 0.010
+N_MELS = 40
+N_MFCC = 13
+MAX_FREQ = 8000  # features ignore content above 8 kHz, so 16 and 44.1 kHz audio compare equally
+CHECK_INTERVAL = 0.1
+VOICED_RATIO = 0.1  # frames within 20 dB of the loudest count as speech
+
+
+def _mel(hz):
+    return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+
+def _hz(mel):
+    return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+
+def _mel_filterbank(sample_rate, n_fft, n_mels):
+    top = min(MAX_FREQ, sample_rate / 2)
+    edges = _hz(np.linspace(_mel(0.0), _mel(top), n_mels + 2))
+    bins = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (bins - lower) / (center - lower)
+    falling = (upper - bins) / (upper - center)
+    return np.maximum(0.0, np.minimum(rising, falling)).astype(np.float32)
+
+
+def _dct_matrix(n_in, n_out):
+    """Orthonormal DCT-II basis, shape (n_out, n_in)."""
+    k = np.arange(n_out)[:, None]
+    n = np.arange(n_in)[None, :]
+    basis = np.cos(np.pi / n_in * (n + 0.5) * k) * np.sqrt(2.0 / n_in)
+    basis[0] /= np.sqrt(2.0)
+    return basis.astype(np.float32)
+
+
+class FeatureExtractor:
+    """Vectorized MFCC frames for 16-bit mono audio at a given sample rate."""
+
+    def __init__(self, sample_rate=16000):
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * FRAME_SECONDS)
+        self.hop = int(sample_rate * HOP_SECONDS)
+        self.n_fft = 1 << (self.frame_length - 1).bit_length()
+        self.window = np.hamming(self.frame_length).astype(np.float32)
+        self.filterbank = _mel_filterbank(sample_rate, self.n_fft, N_MELS)
+        self.dct = _dct_matrix(N_MELS, N_MFCC)
+
+    def frame_count(self, num_samples):
+        if num_samples < self.frame_length:
+            return 0
+        return 1 + (num_samples - self.frame_length) // self.hop
+
+    def __call__(self, samples):
+        """Return (mfcc, rms) for every full frame of float32 samples in int16 scale."""
+        count = self.frame_count(len(samples))
+        if count == 0:
+            return np.zeros((0, N_MFCC), np.float32), np.zeros(0, np.float32)
+        frames = np.lib.stride_tricks.sliding_window_view(samples, self.frame_length)[::self.hop][:count]
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        emphasized = frames[:, 1:] - 0.97 * frames[:, :-1]
+        windowed = np.pad(emphasized, ((0, 0), (1, 0))) * self.window
+        power = np.abs(np.fft.rfft(windowed, self.n_fft)) ** 2
+        log_mel = np.log(power @ self.filterbank.T + 1e-6)
+        return (log_mel @ self.dct.T).astype(np.float32), rms.astype(np.float32)
+
+
+def _pcm_to_samples(pcm):
+    return np.frombuffer(pcm, dtype="<i2").astype(np.float32)
+
+
+def _normalize(mfcc, voiced=None):
+    """Drop c0 (loudness), subtract the cepstral mean and scale frames to unit length.
+
+    The mean is taken over the voiced frames only, so a window that is
+    mostly silence normalizes like a trimmed template.
+    """
+    features = mfcc[:, 1:]
+    reference = features[voiced] if voiced is not None and voiced.any() else features
+    features = features - reference.mean(axis=0)
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return features / norms
+
+
+def dtw_distance(template, window):
+    """Mean per-frame cost of the best match of template anywhere inside window.
+
+    Both inputs are normalized feature matrices (see _normalize). Each
+    template frame advances 0, 1 or 2 window frames, so every row is one
+    whole-array NumPy update and slower or faster speech still aligns.
+    """
+    cost = 1.0 - template @ window.T
+    acc = cost[0].copy()
+    for row in cost[1:]:
+        best = acc.copy()
+        np.minimum(best[1:], acc[:-1], out=best[1:])
+        np.minimum(best[2:], acc[:-2], out=best[2:])
+        acc = row + best
+    return float(acc.min()) / len(template)
+
+
+def template_from_audio(pcm, sample_rate):
+    """Return the silence-trimmed MFCC frames of a recording of the wake word."""
+    mfcc, rms = FeatureExtractor(sample_rate)(_pcm_to_samples(pcm))
+    if not len(rms):
+        return None
+    voiced = np.flatnonzero(rms >= rms.max() * VOICED_RATIO)
+    return mfcc[voiced[0]:voiced[-1] + 1]
+
+
+def load_templates(path=TEMPLATES_FILE):
+    """Return the saved templates, oldest first."""
+    if not os.path.exists(path):
+        return []
+    try:
+        with np.load(path) as data:
+            return [data[name] for name in sorted(data.files, key=lambda n: int(n[1:]))]
+    except Exception as e:
+        logger.error(f"Wake word templates load failed: {e}")
+        return []
+
+
+def save_templates(templates, path=TEMPLATES_FILE):
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, **{f"t{i}": t for i, t in enumerate(templates)})
+    os.replace(tmp_path, path)
+
+
+def add_template(pcm, sample_rate, path=TEMPLATES_FILE):
+    """Learn one more template from a confirmed recording; returns the template count."""
+    template = template_from_audio(pcm, sample_rate)
+    templates = load_templates(path)
+    if template is None or len(template) < 10:
+        return len(templates)
+    templates = (templates + [template])[-MAX_TEMPLATES:]
+    save_templates(templates, path)
+    return len(templates)
+
+
+class WakeWordDetector:
+    """Streaming keyword spotter: feed it PCM chunks, it reports when the wake word ends."""
+
+    def __init__(self, templates, sample_rate=16000, threshold=DEFAULT_THRESHOLD, energy_floor=0.0):
+        self.sample_rate = sample_rate
+        self.extractor = FeatureExtractor(sample_rate)
+        self.templates = [_normalize(t) for t in templates]
+        self.threshold = threshold
+        self.energy_floor = energy_floor
+        longest = max(len(t) for t in self.templates)
+        self.min_frames = min(len(t) for t in self.templates) // 2
+        self.window_frames = longest * 2
+        self.check_frames = max(1, int(CHECK_INTERVAL / HOP_SECONDS))
+        self.last_score = None
+        self.reset()
+
+    def reset(self):
+        self._leftover = np.zeros(0, np.float32)
+        self._features = np.zeros((0, N_MFCC), np.float32)
+        self._rms = np.zeros(0, np.float32)
+        self._pending = 0
+
+    def process(self, pcm):
+        """Consume a chunk of 16-bit PCM; return True if the wake word was just spoken."""
+        samples = np.concatenate([self._leftover, _pcm_to_samples(pcm)])
+        count = self.extractor.frame_count(len(samples))
+        self._leftover = samples[count * self.extractor.hop:]
+        if count == 0:
+            return False
+
+        mfcc, rms = self.extractor(samples)
+        self._features = np.concatenate([self._features, mfcc])[-self.window_frames:]
+        self._rms = np.concatenate([self._rms, rms])[-self.window_frames:]
+        self._pending += count
+        if self._pending < self.check_frames or len(self._features) < self.min_frames:
+            return False
+        self._pending = 0
+
+        # Skip the DTW entirely while the room is quiet
+        if self._rms.max() < self.energy_floor:
+            self.last_score = None
+            return False
+
+        window = _normalize(self._features, self._rms >= self._rms.max() * VOICED_RATIO)
+        self.last_score = min(dtw_distance(t, window) for t in self.templates)
+        if self.last_score <= self.threshold:
+            self.reset()
+            return True
+        return False
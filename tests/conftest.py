@@ -0,0 +1,17 @@
+import os
+import sys
+import pytest
+
+# Make the src package importable when pytest runs from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import database
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A fresh SQLite database (and memory_vectors/ directory) under tmp_path."""
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "voice_ai.db"))
+    database.ensure_db()
+    yield database
+    database.close_db_pool()
@@ -0,0 +1,97 @@
+"""AudioRing and ring sources: wraparound, slow readers, close and skip spans."""
+
+import threading
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("pyaudio")
+
+from src.audio_capture import AudioRing, RingSource, _RingStream, SAMPLE_WIDTH
+
+
+def pcm(start, count):
+    """count 16-bit frames numbered from start, so positions are easy to check."""
+    return b"".join((n % 32768).to_bytes(2, "little") for n in range(start, start + count))
+
+
+def test_read_returns_what_was_written():
+    ring = AudioRing(64)
+    ring.write(b"abcdef")
+    assert ring.read(0, 4) == (b"abcd", 4)
+    assert ring.read(4, 100) == (b"ef", 6)
+
+
+def test_writes_wrap_around_the_buffer():
+    ring = AudioRing(8)
+    ring.write(b"012345")
+    ring.write(b"6789")  # wraps: bytes 8 and 9 land at the start
+    assert ring.written == 10
+    assert ring.oldest == 2
+    assert ring.read(2, 8) == (b"23456789", 10)
+    assert ring.read(6, 3) == (b"678", 9)
+
+
+def test_write_larger_than_capacity_keeps_the_tail():
+    ring = AudioRing(4)
+    ring.write(b"abcdefghij")
+    assert ring.written == 10
+    assert ring.read(6, 4) == (b"ghij", 10)
+
+
+def test_slow_reader_skips_ahead_to_the_oldest_byte():
+    ring = AudioRing(4)
+    ring.write(b"abcdef")
+    assert ring.read(0, 10) == (b"cdef", 6)
+
+
+def test_read_waits_for_new_audio():
+    ring = AudioRing(16)
+    result = []
+    reader = threading.Thread(target=lambda: result.append(ring.read(0, 4)))
+    reader.start()
+    ring.write(b"hi")
+    reader.join(5.0)
+    assert result == [(b"hi", 2)]
+
+
+def test_closed_ring_returns_empty_or_raises():
+    ring = AudioRing(16)
+    ring.write(b"hi")
+    ring.close()
+    assert ring.read(2, 4) == (b"", 2)
+
+    failed = AudioRing(16)
+    failed.close(OSError("device unplugged"))
+    with pytest.raises(OSError):
+        failed.read(0, 4)
+
+
+def test_stream_reads_frames_across_the_wrap():
+    ring = AudioRing(10 * SAMPLE_WIDTH)
+    ring.write(pcm(0, 8))
+    ring.write(pcm(8, 6))
+    stream = _RingStream(ring, 4 * SAMPLE_WIDTH)
+    assert stream.read(10) == pcm(4, 10)
+
+
+def test_stream_jumps_over_the_skip_span():
+    ring = AudioRing(100 * SAMPLE_WIDTH)
+    ring.write(pcm(0, 40))
+    ring.close()
+    stream = _RingStream(ring, 0, skip=(10 * SAMPLE_WIDTH, 30 * SAMPLE_WIDTH))
+    assert stream.read(15) == pcm(0, 10) + pcm(30, 5)
+    assert stream.read(100) == pcm(35, 5)
+
+
+def test_source_consumes_up_to_where_it_read():
+    ring = AudioRing(100 * SAMPLE_WIDTH)
+    ring.write(pcm(0, 40))
+    capture = SimpleNamespace(ring=ring, sample_rate=16000, chunk=10, consumed=0)
+
+    with RingSource(capture, 0, skip=(0, 10 * SAMPLE_WIDTH)) as source:
+        assert source.stream.read(10) == pcm(10, 10)
+    assert capture.consumed == 20 * SAMPLE_WIDTH
+
+    with RingSource(capture, 0, consume=False) as source:
+        source.stream.read(30)
+    assert capture.consumed == 20 * SAMPLE_WIDTH
@@ -0,0 +1,74 @@
+"""get_db connection pool: reuse, size cap, rollback and per-path pools."""
+
+import threading
+import sqlite3
+import pytest
+from src import database
+
+
+def test_connection_is_reused(db):
+    with db.get_db() as first:
+        pass
+    with db.get_db() as second:
+        assert second is first
+
+
+def test_concurrent_borrowers_get_distinct_connections(db):
+    with db.get_db() as first, db.get_db() as second:
+        assert first is not second
+
+
+def test_pool_keeps_at_most_pool_size_idle_connections(db, monkeypatch):
+    monkeypatch.setattr(database, "POOL_SIZE", 2)
+    borrowed = [db.get_db() for _ in range(4)]
+    connections = [cm.__enter__() for cm in borrowed]
+    for cm in borrowed:
+        cm.__exit__(None, None, None)
+    assert len(database._POOL[database.DB_PATH]) == 2
+    with pytest.raises(sqlite3.ProgrammingError):
+        connections[-1].execute("SELECT 1")  # closed, not pooled
+
+
+def test_uncommitted_work_is_rolled_back(db):
+    with db.get_db() as conn:
+        conn.execute("INSERT INTO memory (user_id, role, content) VALUES (1, 'user', 'lost')")
+    with db.get_db() as conn:
+        assert not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0] == 0
+
+
+def test_connections_are_tuned(db):
+    with db.get_db() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+
+def test_pool_follows_db_path(db, tmp_path, monkeypatch):
+    with db.get_db() as first:
+        pass
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "other.db"))
+    with db.get_db() as other:
+        assert other is not first
+
+
+def test_pool_is_safe_across_threads(db):
+    errors = []
+
+    def work(n):
+        try:
+            for _ in range(20):
+                with db.get_db() as conn:
+                    conn.execute("INSERT INTO memory (user_id, role, content) VALUES (?, 'user', 'hi')", (n,))
+                    conn.commit()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    with db.get_db() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM memory").fetchone()[0] == 160
+    assert len(database._POOL[database.DB_PATH]) <= database.POOL_SIZE
@@ -0,0 +1,98 @@
+"""The compiled intent router must route utterances like the substring scans it replaced."""
+
+import re
+import pytest
+from src.intents import INTENTS, IntentRouter, match_intent
+
+
+def legacy_route(user_input):
+    """The pre-router fast path (try_local_logic/_handle_nova_questions), reduced to (intent, slots)."""
+    raw = user_input.strip()
+    cmd = raw.lower()
+
+    if any(q in cmd for q in ["who are you", "what are you", "about yourself", "who is nova", "what is nova"]):
+        return "identity", {}
+    if any(q in cmd for q in ["who made you", "who created you", "who developed you", "your developer", "your creator"]):
+        return "creator", {}
+    if "your version" in cmd or "what version" in cmd:
+        return "version", {}
+    if "what can you do" in cmd or "your features" in cmd or "your capabilities" in cmd:
+        return "features", {}
+
+    if "open chrome" in cmd and "search" in cmd:
+        return "chrome_search", {"query": cmd.split("search", 1)[1].strip()}
+
+    search_match = re.search(r"\bsearch(?: for)?\s+(.+)", cmd)
+    if search_match:
+        return "search", {"query": search_match.group(1).strip()}
+
+    if any(word in cmd for word in ["weather", "temperature"]):
+        location = user_input.split(" in ", 1)[1].strip() if " in " in cmd else "your location"
+        return "weather", {"location": location}
+
+    open_matches = list(re.finditer(r"\b(?:open|launch|start)\s+([a-zA-Z0-9 ._-]+)", cmd))
+    if open_matches:
+        app_name = open_matches[-1].group(1).strip().split(" and ")[0].strip()
+        invalid_apps = {"name", "the", "a", "an", "it", "that", "this", "from", "to", "of", "in", "on", "at"}
+        if app_name not in invalid_apps and len(app_name) > 2:
+            return "open_app", {"app": app_name}
+
+    if any(word in cmd for word in ["what time", "current time", "time is it", "what date", "today's date", "what day"]):
+        return "time", {
+            "time": "time" in cmd,
+            "date": "date" in cmd or "day" in cmd or "today" in cmd,
+        }
+
+    return None, {}
+
+
+CORPUS = [
+    "who are you",
+    "Tell me about yourself",
+    "what is nova",
+    "who created you",
+    "what version are you running",
+    "what can you do",
+    "open chrome and search for python tutorials",
+    "open chrome and search",
+    "search for the best laptops 2024",
+    "search cheap flights to Rome",
+    "search",
+    "what's the weather in London",
+    "What's the weather in New York",
+    "what is the temperature outside",
+    "open calculator",
+    "launch visual studio code",
+    "start whatsapp and play music",
+    "open the",
+    "open it",
+    "open up",
+    "what time is it",
+    "what's today's date",
+    "what day is it today",
+    "tell me the current time and date",
+    "how far away is the moon",
+    "explain how photosynthesis works in simple terms",
+    "tell me a joke about programmers",
+    "why is the sky blue",
+    "",
+    "   ",
+]
+
+
+@pytest.mark.parametrize("utterance", CORPUS)
+def test_router_matches_legacy_scans(utterance):
+    assert match_intent(utterance) == legacy_route(utterance)
+
+
+def test_priority_follows_table_order():
+    # Both "open" and "weather" trigger; weather comes first in the table
+    assert match_intent("open the weather in Paris") == ("weather", {"location": "Paris"})
+
+
+def test_extra_intents_do_not_change_existing_routes():
+    extra = [{"name": f"extra_{i}", "any": [f"custom command {i}"]} for i in range(200)]
+    router = IntentRouter(INTENTS + extra)
+    for utterance in CORPUS:
+        assert router.match(utterance) == match_intent(utterance)
+    assert router.match("please run custom command 42") == ("extra_42", {})
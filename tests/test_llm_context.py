@@ -0,0 +1,49 @@
+"""ContextStore: per-user contexts, persistence and fingerprint invalidation."""
+
+from src.llm_context import ContextStore
+
+TOKENS = [101, 2023, 2003, 1037, 3231, 102]
+
+
+def test_put_then_get(db):
+    store = ContextStore("llama3.1:8b|prompt-v1")
+    assert store.get(1) is None
+    store.put(1, TOKENS)
+    assert store.get(1) == TOKENS
+    assert store.get(2) is None
+
+
+def test_context_persists_across_instances(db):
+    ContextStore("llama3.1:8b|prompt-v1").put(1, TOKENS)
+    assert ContextStore("llama3.1:8b|prompt-v1").get(1) == TOKENS
+
+
+def test_changed_fingerprint_discards_the_stored_context(db):
+    ContextStore("llama3.1:8b|prompt-v1").put(1, TOKENS)
+    assert ContextStore("llama3.1:8b|prompt-v2").get(1) is None
+    with db.get_db() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM llm_context").fetchone()[0] == 0
+    # The stale row is gone for the old fingerprint too
+    assert ContextStore("llama3.1:8b|prompt-v1").get(1) is None
+
+
+def test_reset_forgets_the_context(db):
+    store = ContextStore("llama3.1:8b|prompt-v1")
+    store.put(1, TOKENS)
+    store.reset(1)
+    assert store.get(1) is None
+    assert ContextStore("llama3.1:8b|prompt-v1").get(1) is None
+
+
+def test_context_over_max_tokens_starts_fresh(db):
+    store = ContextStore("llama3.1:8b|prompt-v1", max_tokens=4)
+    store.put(1, TOKENS[:3])
+    store.put(1, TOKENS)
+    assert store.get(1) is None
+
+
+def test_empty_context_is_ignored(db):
+    store = ContextStore("llama3.1:8b|prompt-v1")
+    store.put(1, TOKENS)
+    store.put(1, [])
+    assert store.get(1) == TOKENS
@@ -0,0 +1,120 @@
+"""Conversation memory: per-user ring buffers and the write-behind queue."""
+
+import threading
+import pytest
+from src import memory
+
+
+@pytest.fixture
+def mem(db, monkeypatch):
+    """The memory module with empty buffers over a fresh database."""
+    monkeypatch.setattr(memory, "_BUFFERS", memory.OrderedDict())
+    yield memory
+    memory.flush_memory()
+
+
+def _rows(db, user_id):
+    with db.get_db() as conn:
+        return [
+            (r["role"], r["content"])
+            for r in conn.execute("SELECT role, content FROM memory WHERE user_id = ? ORDER BY id", (user_id,))
+        ]
+
+
+def test_buffer_serves_recent_turns_oldest_first(mem):
+    mem.load_user_memory(1)
+    for n in range(5):
+        mem.save_memory(1, "user", f"question {n}")
+    assert [m["content"] for m in mem.get_memory(1, limit=3)] == ["question 2", "question 3", "question 4"]
+
+
+def test_buffer_keeps_only_the_last_turns(mem, monkeypatch):
+    monkeypatch.setattr(mem, "BUFFER_TURNS", 4)
+    mem.load_user_memory(1)
+    for n in range(10):
+        mem.save_memory(1, "user", f"question {n}")
+    assert [m["content"] for m in mem.get_memory(1, limit=4)] == [f"question {n}" for n in range(6, 10)]
+
+
+def test_buffer_is_filled_from_sqlite_on_load(mem):
+    for n in range(3):
+        mem.save_memory(1, "user", f"question {n}")
+    mem.load_user_memory(1)
+    assert [m["content"] for m in mem.get_memory(1, limit=3)] == ["question 0", "question 1", "question 2"]
+
+
+def test_least_recently_active_user_is_evicted(mem, monkeypatch):
+    monkeypatch.setattr(mem, "MAX_ACTIVE_USERS", 2)
+    mem.load_user_memory(1)
+    mem.load_user_memory(2)
+    mem.get_memory(1)  # user 1 is now the most recent
+    mem.load_user_memory(3)
+    assert list(mem._BUFFERS) == [1, 3]
+
+
+def test_evicted_user_reloads_from_sqlite(mem):
+    mem.load_user_memory(1)
+    mem.save_memory(1, "user", "hello")
+    mem.evict_user_memory(1)
+    assert 1 not in mem._BUFFERS
+    assert [m["content"] for m in mem.get_memory(1)] == ["hello"]
+    assert 1 in mem._BUFFERS
+
+
+def test_limit_beyond_the_buffer_reads_sqlite(mem, monkeypatch):
+    monkeypatch.setattr(mem, "BUFFER_TURNS", 2)
+    mem.load_user_memory(1)
+    for n in range(5):
+        mem.save_memory(1, "user", f"question {n}")
+    assert len(mem.get_memory(1, limit=5)) == 5
+
+
+@pytest.fixture
+def writer(mem, monkeypatch):
+    """A private writer thread with a small queue, batches recorded."""
+    monkeypatch.setattr(mem, "WRITE_QUEUE_SIZE", 4)
+    monkeypatch.setattr(mem, "ENQUEUE_TIMEOUT", 0.05)
+    gate = threading.Event()
+    batches = []
+    insert_rows = mem._insert_rows
+
+    def gated_insert(rows):
+        gate.wait(5.0)
+        batches.append(len(rows))
+        insert_rows(rows)
+
+    monkeypatch.setattr(mem, "_insert_rows", gated_insert)
+    monkeypatch.setattr(mem, "_WRITER", None)
+    mem._get_writer()
+    yield gate, batches
+    gate.set()
+    mem.flush_memory()
+
+
+def test_flush_waits_for_queued_rows(mem, writer, db):
+    gate, _ = writer
+    mem.save_memory(1, "user", "hello")
+    assert not mem.flush_memory(timeout=0.05)
+    gate.set()
+    assert mem.flush_memory(timeout=5.0)
+    assert _rows(db, 1) == [("user", "hello")]
+
+
+def test_rows_are_group_committed_in_order_when_the_queue_is_full(mem, writer, db):
+    gate, batches = writer
+    turns = [("user" if n % 2 == 0 else "assistant", f"turn {n}") for n in range(12)]
+
+    def produce():
+        for role, content in turns:
+            mem.save_memory(1, role, content)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    producer.join(0.5)
+    assert producer.is_alive()  # blocked on the full queue, not dropping rows
+    gate.set()
+    producer.join(5.0)
+    assert mem.flush_memory(timeout=5.0)
+
+    assert _rows(db, 1) == turns
+    assert len(batches) < len(turns)
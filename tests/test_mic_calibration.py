@@ -0,0 +1,81 @@
+"""Device scan: PortAudio open/close serialized, reads in parallel."""
+
+import threading
+import time
+import pytest
+
+pytest.importorskip("pyaudio")
+
+from src import mic_calibration
+
+
+class FakeAudio:
+    """PyAudio stand-in that records overlapping calls per kind."""
+
+    def __init__(self, devices, read_seconds=0.1):
+        self.devices = devices
+        self.read_seconds = read_seconds
+        self._lock = threading.Lock()
+        self.active = {"open": 0, "read": 0, "close": 0}
+        self.peak = {"open": 0, "read": 0, "close": 0}
+
+    def _enter(self, kind):
+        with self._lock:
+            self.active[kind] += 1
+            self.peak[kind] = max(self.peak[kind], self.active[kind])
+
+    def _leave(self, kind):
+        with self._lock:
+            self.active[kind] -= 1
+
+    def _call(self, kind, seconds=0.01):
+        self._enter(kind)
+        time.sleep(seconds)
+        self._leave(kind)
+
+    def get_device_count(self):
+        return len(self.devices)
+
+    def get_device_info_by_index(self, index):
+        return self.devices[index]
+
+    def open(self, rate, input_device_index, **kwargs):
+        self._call("open")
+        audio = self
+
+        class Stream:
+            def read(self, frames, exception_on_overflow=True):
+                audio._call("read", audio.read_seconds)
+                return (200).to_bytes(2, "little", signed=True) * frames
+
+            def close(self):
+                audio._call("close")
+
+        return Stream()
+
+
+def device(name):
+    return {"name": name, "maxInputChannels": 1, "defaultSampleRate": 16000.0}
+
+
+def test_scan_serializes_open_and_close_but_reads_in_parallel():
+    audio = FakeAudio([device(f"Mic {n}") for n in range(4)])
+    profiles = mic_calibration.scan(audio)
+
+    assert [p["name"] for p in profiles] == [f"Mic {n}" for n in range(4)]
+    assert audio.peak["open"] == 1
+    assert audio.peak["close"] == 1
+    assert audio.peak["read"] > 1
+
+
+def test_scan_skips_devices_that_fail_to_open():
+    audio = FakeAudio([device("Broken"), device("Mic")])
+    open_stream = audio.open
+
+    def open_or_fail(rate, input_device_index, **kwargs):
+        if input_device_index == 0:
+            raise OSError("Invalid sample rate")
+        return open_stream(rate, input_device_index, **kwargs)
+
+    audio.open = open_or_fail
+    assert [p["name"] for p in mic_calibration.scan(audio)] == ["Mic"]
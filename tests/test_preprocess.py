@@ -0,0 +1,77 @@
+"""Streaming audio preprocessing gives the same samples however the input is chunked."""
+
+import numpy as np
+import pytest
+from src.preprocess import Resampler, HighPass, Preprocessor, TARGET_RATE
+
+
+def _noise(rate, seconds=1.0, seed=0):
+    return (np.random.default_rng(seed).standard_normal(int(rate * seconds)) * 3000).astype(np.float32)
+
+
+def _stream(stage, samples, chunk):
+    return np.concatenate([stage.process(samples[i:i + chunk].copy()) for i in range(0, len(samples), chunk)])
+
+
+@pytest.mark.parametrize("rate", [8000, 22050, 44100, 48000])
+@pytest.mark.parametrize("chunk", [7, 160, 1024, 4099])
+def test_streaming_resampler_equals_one_shot(rate, chunk):
+    samples = _noise(rate)
+    whole = Resampler(rate).process(samples)
+    streamed = _stream(Resampler(rate), samples, chunk)
+    assert len(streamed) == len(whole)
+    np.testing.assert_allclose(streamed, whole, rtol=0, atol=1e-2)
+
+
+@pytest.mark.parametrize("rate", [44100, 48000])
+def test_resampler_keeps_in_band_tones(rate):
+    t = np.arange(rate) / rate
+    out = Resampler(rate).process((np.sin(2 * np.pi * 440 * t) * 10000).astype(np.float32))
+    assert abs(len(out) - TARGET_RATE) <= 1
+    steady = out[len(out) // 4: -len(out) // 4]
+    assert np.sqrt(np.mean(steady ** 2)) == pytest.approx(10000 / np.sqrt(2), rel=0.01)
+
+
+def test_resampler_passes_16k_through():
+    samples = _noise(TARGET_RATE)
+    assert Resampler(TARGET_RATE).process(samples) is samples
+
+
+@pytest.mark.parametrize("chunk", [7, 333, 1024])
+def test_streaming_highpass_equals_one_shot(chunk):
+    samples = _noise(TARGET_RATE) + 500
+    whole = HighPass(TARGET_RATE).process(samples.copy())
+    streamed = _stream(HighPass(TARGET_RATE), samples, chunk)
+    np.testing.assert_allclose(streamed, whole, rtol=0, atol=1e-1)
+
+
+def _tone_level_db(stage, frequency, rate=TARGET_RATE):
+    t = np.arange(2 * rate) / rate
+    out = stage.process((np.cos(2 * np.pi * frequency * t) * 1000).astype(np.float32))[rate:]
+    return 20 * np.log10(np.sqrt(np.mean(out ** 2)) / (1000 / np.sqrt(2)) + 1e-12)
+
+
+def test_highpass_is_a_butterworth_at_80_hz():
+    assert _tone_level_db(HighPass(TARGET_RATE), 0) < -60
+    assert _tone_level_db(HighPass(TARGET_RATE), 20) == pytest.approx(-24.1, abs=0.5)
+    assert _tone_level_db(HighPass(TARGET_RATE), 80) == pytest.approx(-3.0, abs=0.1)
+    assert _tone_level_db(HighPass(TARGET_RATE), 1000) == pytest.approx(0.0, abs=0.05)
+
+
+def test_highpass_matches_direct_form_biquad():
+    w0 = 2 * np.pi * 80 / TARGET_RATE
+    alpha, cos = np.sin(w0) / np.sqrt(2), np.cos(w0)
+    b = np.array([(1 + cos) / 2, -(1 + cos), (1 + cos) / 2]) / (1 + alpha)
+    a = np.array([1 + alpha, -2 * cos, 1 - alpha]) / (1 + alpha)
+    samples = _noise(TARGET_RATE, seconds=0.25) + 500
+    expected = np.zeros(len(samples))
+    for n in range(len(samples)):
+        expected[n] = sum(b[k] * samples[n - k] for k in range(3) if n >= k)
+        expected[n] -= sum(a[k] * expected[n - k] for k in (1, 2) if n >= k)
+    np.testing.assert_allclose(HighPass(TARGET_RATE).process(samples), expected, rtol=0, atol=1e-2)
+
+
+def test_preprocessor_outputs_16k_pcm():
+    pcm = np.clip(_noise(48000, seconds=0.5), -32768, 32767).astype("<i2").tobytes()
+    out = Preprocessor(48000).process(pcm)
+    assert len(out) == 2 * 8000
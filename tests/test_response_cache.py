@@ -0,0 +1,82 @@
+"""ResponseCache: keys, bypassed inputs, TTL expiry and size eviction."""
+
+import time
+from src import response_cache as rc
+from src.response_cache import ResponseCache, context_hash, is_cacheable
+
+CTX = context_hash("llama3.1:8b", "{}", "You are NOVA", 1)
+
+
+def test_hit_after_put_ignores_case_and_punctuation(db):
+    cache = ResponseCache()
+    assert cache.get("What is the capital of France?", CTX) is None
+    cache.put("What is the capital of France?", CTX, "Paris.")
+    assert cache.get("what is the capital of france", CTX) == "Paris."
+    stats = cache.get_stats()
+    assert (stats["misses"], stats["memory_hits"]) == (1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_key_includes_the_context(db):
+    cache = ResponseCache()
+    cache.put("what is the capital of france", CTX, "Paris.")
+    assert cache.get("what is the capital of france", context_hash("llama3.1:8b", "{}", "You are NOVA", 2)) is None
+    assert cache.get("what is the capital of france", context_hash("mistral", "{}", "You are NOVA", 1)) is None
+
+
+def test_disk_tier_survives_a_new_instance(db):
+    ResponseCache().put("how many legs does a spider have", CTX, "Eight.")
+    cache = ResponseCache()
+    assert cache.get("how many legs does a spider have", CTX) == "Eight."
+    assert cache.get_stats()["disk_hits"] == 1
+    assert cache.get("how many legs does a spider have", CTX) == "Eight."
+    assert cache.get_stats()["memory_hits"] == 1
+
+
+def test_time_sensitive_and_follow_up_inputs_bypass(db):
+    cache = ResponseCache()
+    for text in ("what's the weather today", "tell me more", "why is that", "what is my name", "and in germany"):
+        assert not is_cacheable(text)
+        cache.put(text, CTX, "anything")
+        assert cache.get(text, CTX) is None
+    assert cache.get_stats()["bypassed"] == 5
+    assert is_cacheable("what is the capital of france")
+
+
+def test_expired_entries_miss_in_both_tiers(db, monkeypatch):
+    cache = ResponseCache(ttl=60)
+    now = time.time()
+    cache.put("what is the capital of france", CTX, "Paris.")
+    monkeypatch.setattr(rc.time, "time", lambda: now + 61)
+    assert cache.get("what is the capital of france", CTX) is None
+    assert ResponseCache(ttl=60).get("what is the capital of france", CTX) is None
+    with db.get_db() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0] == 0
+
+
+def test_memory_tier_evicts_least_recently_used(db):
+    cache = ResponseCache(memory_max=2)
+    cache.put("question one", CTX, "1")
+    cache.put("question two", CTX, "2")
+    cache.get("question one", CTX)  # one is now the most recent
+    cache.put("question three", CTX, "3")
+    assert cache.get_stats()["memory_entries"] == 2
+    assert cache.get("question two", CTX) == "2"  # served from disk
+    assert cache.get_stats()["disk_hits"] == 1
+
+
+def test_disk_tier_is_pruned_to_disk_max(db, monkeypatch):
+    monkeypatch.setattr(rc, "_PRUNE_EVERY", 5)
+    cache = ResponseCache(disk_max=3)
+    for n in range(5):
+        cache.put(f"question {n}", CTX, str(n))
+    with db.get_db() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0] == 3
+
+
+def test_clear_empties_both_tiers(db):
+    cache = ResponseCache()
+    cache.put("what is the capital of france", CTX, "Paris.")
+    cache.clear()
+    assert cache.get("what is the capital of france", CTX) is None
+    assert ResponseCache().get("what is the capital of france", CTX) is None
@@ -0,0 +1,95 @@
+"""GenerationScheduler: shared in-flight jobs, priorities and cancellation."""
+
+import threading
+import pytest
+from src.scheduler import GenerationScheduler, GenerationCancelled, PRIORITY_VOICE, PRIORITY_BACKGROUND
+
+TIMEOUT = 5.0
+
+
+def gated(tokens, gate, calls=None):
+    """A run callable whose stream blocks until gate is set, then yields tokens."""
+    def run():
+        if calls is not None:
+            calls.append(tokens)
+        gate.wait(TIMEOUT)
+        yield from tokens
+    return run
+
+
+def endless(started, stopped):
+    """A run callable that streams until it is closed."""
+    def run():
+        started.set()
+        try:
+            while True:
+                yield "token "
+        finally:
+            stopped.set()
+    return run
+
+
+def test_identical_prompts_share_one_job():
+    scheduler = GenerationScheduler()
+    gate, calls = threading.Event(), []
+    first = scheduler.submit("prompt", gated(["a", "b"], gate, calls), owner="alice")
+    second = scheduler.submit("prompt", gated(["x"], gate, calls), owner="bob")
+    assert first is second
+    gate.set()
+    assert list(first.stream()) == ["a", "b"]
+    assert list(second.stream()) == ["a", "b"]
+    assert calls == [["a", "b"]]
+
+
+def test_new_request_cancels_the_owners_running_stream():
+    scheduler = GenerationScheduler()
+    started, stopped = threading.Event(), threading.Event()
+    old = scheduler.submit("old prompt", endless(started, stopped), owner="alice")
+    assert started.wait(TIMEOUT)
+
+    new = scheduler.submit("new prompt", lambda: iter(["fresh"]), owner="alice")
+    assert old.cancelled.is_set()
+    assert stopped.wait(TIMEOUT)  # the worker closed the stale stream
+    with pytest.raises(GenerationCancelled):
+        list(old.stream())
+    assert list(new.stream()) == ["fresh"]
+
+
+def test_shared_job_survives_until_every_owner_leaves():
+    scheduler = GenerationScheduler()
+    gate = threading.Event()
+    job = scheduler.submit("prompt", gated(["a"], gate), owner="alice")
+    scheduler.submit("prompt", gated(["a"], gate), owner="bob")
+
+    scheduler.cancel("alice")
+    assert not job.cancelled.is_set()
+    scheduler.cancel("bob")
+    assert job.cancelled.is_set()
+    gate.set()
+
+
+def test_higher_priority_jobs_run_first():
+    scheduler = GenerationScheduler()
+    gate, calls = threading.Event(), []
+    started, stopped = threading.Event(), threading.Event()
+    blocker = scheduler.submit("busy", endless(started, stopped), owner="alice")
+    assert started.wait(TIMEOUT)  # the worker is busy, so the next two queue up
+    background = scheduler.submit("later", gated(["later"], gate, calls), priority=PRIORITY_BACKGROUND)
+    voice = scheduler.submit("now", gated(["now"], gate, calls), priority=PRIORITY_VOICE)
+    scheduler.cancel("alice")
+    gate.set()
+    for job in (background, voice):
+        list(job.stream())
+    assert calls == [["now"], ["later"]]
+
+
+def test_errors_reach_every_consumer():
+    scheduler = GenerationScheduler()
+
+    def run():
+        yield "partial"
+        raise RuntimeError("model crashed")
+
+    job = scheduler.submit("prompt", run)
+    with pytest.raises(RuntimeError, match="model crashed"):
+        list(job.stream())
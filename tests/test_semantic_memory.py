@@ -0,0 +1,146 @@
+"""Semantic recall with the deterministic HashingEmbedder: ranking, catch-up, backoff and budget."""
+
+import threading
+import time
+import pytest
+from src import semantic_memory
+from src.semantic_memory import SemanticMemory, HashingEmbedder
+
+TURNS = [
+    ("how tall is the eiffel tower", "The Eiffel Tower is about 330 metres tall."),
+    ("what is my favourite colour", "You told me your favourite colour is green."),
+    ("recommend a pasta recipe", "Try spaghetti carbonara with eggs and pecorino."),
+    ("when does the gym open", "Your gym opens at six in the morning."),
+]
+
+
+def _store(db, user_id, turns):
+    """Write turns to the memory table, as the memory writer would."""
+    with db.get_db() as conn:
+        for user_text, reply in turns:
+            conn.execute("INSERT INTO memory (user_id, role, content) VALUES (?, 'user', ?)", (user_id, user_text))
+            conn.execute("INSERT INTO memory (user_id, role, content) VALUES (?, 'assistant', ?)", (user_id, reply))
+        conn.commit()
+
+
+def _loaded(memory, user_id):
+    """Load the user's index and wait for the background work to finish."""
+    memory.prime(user_id)
+    memory.flush()
+    return memory._get_index(user_id)
+
+
+class Flaky(HashingEmbedder):
+    """HashingEmbedder that can be made to fail, counting calls."""
+
+    def __init__(self):
+        super().__init__()
+        self.fail = False
+        self.calls = 0
+
+    def __call__(self, texts):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("model 'nomic-embed-text' not found")
+        return super().__call__(texts)
+
+
+def test_recall_ranks_the_most_similar_turn_first(db):
+    memory = SemanticMemory(HashingEmbedder())
+    _store(db, 1, TURNS)
+    _loaded(memory, 1)
+
+    hits = memory.recall(1, "any good pasta recipe with pecorino", k=2, exclude_recent=0, min_similarity=0.0)
+    assert hits[0].startswith("User: recommend a pasta recipe")
+    assert memory.recall(1, "how tall is the eiffel tower", k=1, exclude_recent=0)[0].startswith(
+        "User: how tall is the eiffel tower"
+    )
+
+
+def test_recall_is_per_user(db):
+    memory = SemanticMemory(HashingEmbedder())
+    _store(db, 1, TURNS)
+    _store(db, 2, [("what is the capital of peru", "Lima.")])
+    _loaded(memory, 1)
+    _loaded(memory, 2)
+    assert memory.recall(2, "how tall is the eiffel tower", exclude_recent=0) == []
+
+
+def test_index_catches_up_from_the_memory_table(db):
+    memory = SemanticMemory(HashingEmbedder())
+    _store(db, 1, TURNS[:2])
+    assert len(_loaded(memory, 1).texts) == 2
+    memory.flush()
+
+    # Turns saved while the index was not loaded (or not yet written to disk)
+    _store(db, 1, TURNS[2:])
+    index = _loaded(SemanticMemory(HashingEmbedder()), 1)
+    assert [t.split("\n")[0] for t in index.texts] == [f"User: {u}" for u, _ in TURNS]
+
+
+def test_add_turn_skips_turns_already_caught_up(db):
+    memory = SemanticMemory(HashingEmbedder())
+    _store(db, 1, TURNS)
+    memory.add_turn(1, *TURNS[-1])  # the memory writer got there first
+    memory.flush()
+    assert len(memory._get_index(1).texts) == len(TURNS)
+
+
+def test_embedding_failure_backs_off(db, monkeypatch):
+    monkeypatch.setattr(semantic_memory, "EMBED_BACKOFF_SECONDS", 0.2)
+    embedder = Flaky()
+    memory = SemanticMemory(embedder)
+    _store(db, 1, TURNS)
+    _loaded(memory, 1)
+
+    embedder.fail = True
+    assert memory.recall(1, "pasta recipe", exclude_recent=0) == []
+    calls = embedder.calls
+    for _ in range(5):
+        assert memory.recall(1, "pasta recipe", exclude_recent=0) == []
+        memory.add_turn(1, "one more question", "One more answer.")
+    memory.flush()
+    assert embedder.calls == calls  # paused, not retried every turn
+    assert not memory.available
+
+    time.sleep(0.25)
+    embedder.fail = False
+    assert memory.recall(1, "pasta recipe", exclude_recent=0, min_similarity=0.0)
+
+
+def test_recall_waits_for_warm_up(db):
+    memory = SemanticMemory(HashingEmbedder())
+    _store(db, 1, TURNS)
+    memory.prime(1)
+    memory.flush()
+    memory.set_embedder(HashingEmbedder())  # a new model that has not been loaded yet
+    _loaded(memory, 1)
+    memory._warm.clear()
+
+    assert memory.recall(1, "pasta recipe", exclude_recent=0, min_similarity=0.0) == []
+    memory.flush()  # the recall above queued a warm-up
+    assert memory.recall(1, "pasta recipe", exclude_recent=0, min_similarity=0.0)
+
+
+def test_recall_gives_up_on_a_slow_embedder(db):
+    release = threading.Event()
+
+    class Slow(HashingEmbedder):
+        slow = False
+
+        def __call__(self, texts):
+            if self.slow:
+                release.wait(5.0)
+            return super().__call__(texts)
+
+    embedder = Slow()
+    memory = SemanticMemory(embedder)
+    _store(db, 1, TURNS)
+    _loaded(memory, 1)
+
+    embedder.slow = True
+    started = time.monotonic()
+    assert memory.recall(1, "pasta recipe", exclude_recent=0) == []
+    assert memory.recall(1, "pasta recipe", exclude_recent=0) == []  # still busy: skipped at once
+    assert time.monotonic() - started < semantic_memory.RECALL_BUDGET_SECONDS + 0.2
+    release.set()
@@ -0,0 +1,102 @@
+"""SpeechQueue: one playback worker, priorities, coalescing and interruption."""
+
+import threading
+from src.speech_queue import SpeechQueue, PRIORITY_RESPONSE, PRIORITY_PROMPT, PRIORITY_GREETING
+
+TIMEOUT = 5.0
+
+
+class Player:
+    """Records what was played; a held utterance plays until released or interrupted."""
+
+    def __init__(self):
+        self.played = []
+        self.started = {}
+        self.release = threading.Event()
+
+    def __call__(self, name, hold=False):
+        self.started[name] = threading.Event()
+
+        def play(utterance):
+            self.started[name].set()
+            self.played.append(name)
+            if hold:
+                utterance.wake = self.release.set
+                self.release.wait(TIMEOUT)
+                self.release.clear()
+            return "interrupted" if utterance.interrupted.is_set() else "done"
+        return play
+
+
+def test_queued_speech_plays_in_order_of_priority():
+    queue, player = SpeechQueue(), Player()
+    busy = queue.submit(player("busy", hold=True), PRIORITY_RESPONSE)
+    assert player.started["busy"].wait(TIMEOUT)
+
+    first = queue.submit(player("first"), PRIORITY_PROMPT, key="first")
+    second = queue.submit(player("second"), PRIORITY_PROMPT, key="second")
+    # Re-submitting a queued key at a higher priority moves it ahead
+    urgent = queue.submit(player("second"), PRIORITY_RESPONSE, key="second")
+    assert urgent is second
+    player.release.set()
+    assert [f.result(TIMEOUT) for f in (busy, first, second)] == ["done"] * 3
+    assert player.played == ["busy", "second", "first"]
+
+
+def test_same_key_shares_one_future():
+    queue, player = SpeechQueue(), Player()
+    busy = queue.submit(player("busy", hold=True), PRIORITY_RESPONSE)
+    assert player.started["busy"].wait(TIMEOUT)
+
+    first = queue.submit(player("hello"), PRIORITY_PROMPT, key="hello")
+    second = queue.submit(player("hello again"), PRIORITY_PROMPT, key="hello")
+    assert first is second
+    player.release.set()
+    assert busy.result(TIMEOUT) == first.result(TIMEOUT) == "done"
+    assert player.played == ["busy", "hello"]
+
+
+def test_new_speech_drops_less_urgent_queued_speech():
+    queue, player = SpeechQueue(), Player()
+    busy = queue.submit(player("busy", hold=True), PRIORITY_RESPONSE)
+    assert player.started["busy"].wait(TIMEOUT)
+
+    greeting = queue.submit(player("greeting"), PRIORITY_GREETING)
+    answer = queue.submit(player("answer"), PRIORITY_RESPONSE)
+    player.release.set()
+    assert greeting.result(TIMEOUT) == "dropped"
+    assert answer.result(TIMEOUT) == "done"
+    assert player.played == ["busy", "answer"]
+
+
+def test_answer_interrupts_a_playing_greeting():
+    queue, player = SpeechQueue(), Player()
+    greeting = queue.submit(player("greeting", hold=True), PRIORITY_GREETING)
+    assert player.started["greeting"].wait(TIMEOUT)
+
+    answer = queue.submit(player("answer"), PRIORITY_RESPONSE)
+    assert greeting.result(TIMEOUT) == "interrupted"
+    assert answer.result(TIMEOUT) == "done"
+
+
+def test_answer_waits_for_a_playing_prompt():
+    queue, player = SpeechQueue(), Player()
+    prompt = queue.submit(player("prompt", hold=True), PRIORITY_PROMPT)
+    assert player.started["prompt"].wait(TIMEOUT)
+
+    answer = queue.submit(player("answer"), PRIORITY_RESPONSE)
+    assert not answer.done()
+    player.release.set()
+    assert prompt.result(TIMEOUT) == "done"
+    assert answer.result(TIMEOUT) == "done"
+
+
+def test_player_errors_reach_the_caller():
+    queue = SpeechQueue()
+
+    def broken(utterance):
+        raise OSError("output device lost")
+
+    future = queue.submit(broken)
+    assert isinstance(future.exception(TIMEOUT), OSError)
+    assert queue.submit(Player()("next")).result(TIMEOUT) == "done"
@@ -0,0 +1,51 @@
+"""File transcription runs the real VAD endpointing with no microphone or network."""
+
+import wave
+import numpy as np
+import pytest
+import speech_recognition as sr
+from src.stt import ScriptedTranscriber, Transcriber, transcribe_file
+from src.vad import VoiceActivityDetector, record_utterance
+
+RATE = 16000
+
+
+def _fixture(path, lead=0.5, speech=1.0, tail=1.5):
+    """Room noise, a voiced burst, then room noise again."""
+    rng = np.random.default_rng(1)
+    t = np.arange(int(speech * RATE)) / RATE
+    voice = sum(np.sin(2 * np.pi * 150 * h * t) / h for h in range(1, 12)) * 6000
+    clip = np.concatenate([np.zeros(int(lead * RATE)), voice, np.zeros(int(tail * RATE))])
+    clip += 50 * rng.standard_normal(len(clip))
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(RATE)
+        f.writeframes(np.clip(clip, -32768, 32767).astype("<i2").tobytes())
+    return str(path)
+
+
+class UtteranceLength(Transcriber):
+    """Reports the length in seconds of the utterance the VAD cut out."""
+
+    def transcribe(self, source, on_partial=None, timeout=None, phrase_time_limit=None, vad=None):
+        audio = record_utterance(source, vad or VoiceActivityDetector(source.SAMPLE_RATE), timeout, phrase_time_limit)
+        return len(audio.frame_data) / audio.sample_width / audio.sample_rate
+
+
+def test_transcribe_file_returns_the_transcript(tmp_path):
+    path = _fixture(tmp_path / "command.wav")
+    assert transcribe_file(path, ScriptedTranscriber("open calculator")) == "open calculator"
+
+
+def test_transcribe_file_endpoints_the_utterance(tmp_path):
+    path = _fixture(tmp_path / "command.wav", lead=0.5, speech=1.0, tail=1.5)
+    seconds = transcribe_file(path, UtteranceLength())
+    # The speech, plus a little pre-roll and the hangover, but not the trailing silence
+    assert 1.0 <= seconds < 2.0
+
+
+def test_transcribe_file_without_speech_times_out(tmp_path):
+    path = _fixture(tmp_path / "silence.wav", lead=1.0, speech=0.0, tail=1.0)
+    with pytest.raises(sr.WaitTimeoutError):
+        transcribe_file(path, ScriptedTranscriber())
@@ -0,0 +1,138 @@
+"""TTSCache: content-addressed store, lookups, sidecars, LRU eviction and what gets cached."""
+
+import os
+import threading
+from array import array
+import pytest
+from src.tts import EdgeTTSSynthesizer
+from src.tts_cache import TTSCache
+
+VOICE = "en-US-AriaNeural"
+
+
+def writer(size):
+    def write(path):
+        with open(path, "wb") as f:
+            f.write(b"\0" * size)
+    return write
+
+
+def age(cache, text, mtime):
+    """Backdate a cached file so LRU order does not depend on timestamp resolution."""
+    path = cache.path_for(text, VOICE)
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TTSCache(cache_dir=str(tmp_path / "tts_cache"), max_bytes=1000)
+
+
+def test_store_then_lookup(cache):
+    assert cache.lookup("Hello there.", VOICE) is None
+    path = cache.store("Hello there.", VOICE, writer(10))
+    assert cache.lookup("Hello there.", VOICE) == path
+    assert cache.lookup("Hello there.", "en-GB-SoniaNeural") is None
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_metadata_sidecar_round_trips(cache):
+    path = cache.store("Hello there.", VOICE, writer(10), metadata=[[0.0, 0.3, "Hello"]])
+    assert cache.load_metadata(path) == [[0.0, 0.3, "Hello"]]
+
+
+def test_failed_synthesis_leaves_nothing_behind(cache):
+    def fail(path):
+        open(path, "wb").close()
+        raise OSError("synthesis failed")
+
+    with pytest.raises(OSError):
+        cache.store("Hello there.", VOICE, fail)
+    assert cache.lookup("Hello there.", VOICE) is None
+    assert not [n for n in os.listdir(cache.cache_dir) if n.endswith(".part")]
+
+
+def test_least_recently_used_files_are_evicted_over_max_bytes(cache):
+    for n, text in enumerate(("one", "two", "three")):
+        cache.store(text, VOICE, writer(100), metadata=[])
+        age(cache, text, 1000 + n)
+    assert cache.lookup("one", VOICE)  # a hit refreshes "one"
+    cache.max_bytes = 250  # 300 bytes stored: the oldest ("two") goes, with its sidecar
+    cache._enforce_limit()
+
+    assert cache.lookup("two", VOICE) is None
+    assert not os.path.exists(cache.metadata_path(cache.path_for("two", VOICE)))
+    assert cache.lookup("one", VOICE) and cache.lookup("three", VOICE)
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_oversized_cache_shrinks_below_the_limit(cache):
+    for n in range(6):
+        cache.store(f"phrase {n}", VOICE, writer(100))
+        age(cache, f"phrase {n}", 1000 + n)
+    cache.max_bytes = 250
+    cache._enforce_limit()
+    sizes = [os.path.getsize(os.path.join(cache.cache_dir, name)) for name in os.listdir(cache.cache_dir)]
+    assert sum(sizes) == 200
+    assert cache.lookup("phrase 4", VOICE) and cache.lookup("phrase 5", VOICE)
+
+
+def test_seen_before_reports_repeats_per_voice(cache):
+    assert not cache.seen_before("Sure.", VOICE)
+    assert cache.seen_before("Sure.", VOICE)
+    assert not cache.seen_before("Sure.", "en-GB-SoniaNeural")
+
+
+def test_store_later_runs_on_the_writer_thread(cache):
+    threads = []
+
+    def write(path):
+        threads.append(threading.current_thread().name)
+        writer(10)(path)
+
+    path = cache.store_later("Hello there.", VOICE, write).result(5.0)
+    assert cache.lookup("Hello there.", VOICE) == path
+    assert threads[0].startswith("tts-cache")
+
+
+def test_store_only_rescans_once_over_the_limit(cache, monkeypatch):
+    scans = []
+    enforce_limit = cache._enforce_limit
+    monkeypatch.setattr(cache, "_enforce_limit", lambda: scans.append(1) or enforce_limit())
+    for n in range(12):
+        cache.store(f"phrase {n}", VOICE, writer(100))
+    # One scan to learn the size on disk, then one per store past max_bytes (1000)
+    assert len(scans) == 1 + 2
+    assert cache.get_stats()["evictions"] == 2
+
+
+class FakeEdge(EdgeTTSSynthesizer):
+    """EdgeTTSSynthesizer without the network or the MP3 decoder."""
+
+    async def _pump(self, text, events):
+        events.put(("audio", text.encode("utf-8")))
+        events.put(("end", None))
+
+    def _decode(self, source):
+        while True:
+            chunk = source.read(4096)
+            if not chunk:
+                return
+            yield array("h", bytes(chunk).ljust(2 * ((len(chunk) + 1) // 2), b"\0"))
+
+
+def test_stream_caches_only_sentences_spoken_twice(cache):
+    synth = FakeEdge(VOICE, cache=cache)
+    list(synth.stream("The answer is forty two."))
+    cache._writer.submit(lambda: None).result(5.0)
+    assert cache.lookup("The answer is forty two.", VOICE) is None
+
+    list(synth.stream("The answer is forty two."))
+    cache._writer.submit(lambda: None).result(5.0)
+    assert cache.lookup("The answer is forty two.", VOICE)
+
+
+def test_prefetch_caches_on_first_use(cache):
+    FakeEdge(VOICE, cache=cache).prefetch("One moment.")
+    assert cache.lookup("One moment.", VOICE)
@@ -0,0 +1,98 @@
+"""Wake-word spotting on synthetic "words": formant sweeps in quiet noise."""
+
+import numpy as np
+from src import wake_word
+from src.wake_word import WakeWordDetector, add_template, dtw_distance, load_templates, template_from_audio
+
+RATE = 16000
+CHUNK = 1024
+NOVA = [(300, 800), (500, 900), (500, 1500), (700, 1200)]
+OTHER = [(250, 2300), (250, 2300), (700, 1800), (300, 2000)]
+
+
+def word(formants, seconds=0.5, speed=1.0, pitch=1.0):
+    """Two tones gliding through the (f1, f2) pairs under a smooth envelope."""
+    n = int(RATE * seconds / speed)
+    pos = np.linspace(0, len(formants) - 1, n)
+    out = np.zeros(n)
+    for j in range(2):
+        freq = np.interp(pos, np.arange(len(formants)), [f[j] * pitch for f in formants])
+        out += np.sin(2 * np.pi * np.cumsum(freq) / RATE) / (j + 1)
+    return out * np.hanning(n) * 8000
+
+
+def pcm(samples, before=0.3, after=0.3, seed=0):
+    """Pad with silence, add a little room noise and convert to 16-bit PCM."""
+    rng = np.random.default_rng(seed)
+    y = np.concatenate([np.zeros(int(RATE * before)), samples, np.zeros(int(RATE * after))])
+    y += rng.normal(0, 30, len(y))
+    return np.clip(y, -32768, 32767).astype("<i2").tobytes()
+
+
+def templates():
+    return [template_from_audio(pcm(word(NOVA, pitch=p), seed=i), RATE) for i, p in enumerate((0.97, 1.0, 1.03))]
+
+
+def detect(detector, audio):
+    for i in range(0, len(audio), CHUNK):
+        if detector.process(audio[i:i + CHUNK]):
+            return True
+    return False
+
+
+def test_template_is_trimmed_to_the_voiced_frames():
+    template = template_from_audio(pcm(word(NOVA), before=0.5, after=0.5), RATE)
+    # 0.5 s of speech is ~48 frames at a 10 ms hop; the padding is dropped
+    assert 35 <= len(template) <= 50
+    assert template_from_audio(b"\0" * 100, RATE) is None
+
+
+def test_dtw_finds_the_template_inside_a_longer_window():
+    nova, other = templates(), template_from_audio(pcm(word(OTHER)), RATE)
+    template = wake_word._normalize(nova[0])
+    assert dtw_distance(template, template) < 1e-5
+    assert dtw_distance(template, wake_word._normalize(nova[1])) < 0.1
+    found = dtw_distance(template, wake_word._normalize(np.concatenate([other, nova[1], other])))
+    assert found < dtw_distance(template, wake_word._normalize(np.concatenate([other, other]))) / 2
+
+
+def test_detects_the_wake_word():
+    assert detect(WakeWordDetector(templates(), RATE), pcm(word(NOVA), seed=5))
+
+
+def test_detects_slower_and_faster_speech():
+    detector = WakeWordDetector(templates(), RATE)
+    assert detect(detector, pcm(word(NOVA, speed=0.8), seed=6))
+    assert detect(detector, pcm(word(NOVA, speed=1.25), seed=7))
+
+
+def test_ignores_other_sounds():
+    detector = WakeWordDetector(templates(), RATE)
+    assert not detect(detector, pcm(word(OTHER), seed=8))
+    assert not detect(detector, pcm(word(NOVA[::-1]), seed=9))
+    assert not detect(detector, pcm(np.random.default_rng(3).normal(0, 3000, RATE // 2), seed=10))
+    assert detector.last_score > detector.threshold
+
+
+def test_energy_floor_skips_quiet_audio():
+    detector = WakeWordDetector(templates(), RATE, energy_floor=20000)
+    assert not detect(detector, pcm(word(NOVA), seed=5))
+    assert detector.last_score is None
+
+
+def test_detector_resets_after_a_detection():
+    detector = WakeWordDetector(templates(), RATE)
+    audio = pcm(word(NOVA), seed=5)
+    assert detect(detector, audio)
+    assert detect(detector, audio)  # fires again for the next utterance, not stuck on the last one
+
+
+def test_templates_are_saved_and_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(wake_word, "MAX_TEMPLATES", 2)
+    path = str(tmp_path / "wake_templates.npz")
+    assert load_templates(path) == []
+    assert add_template(b"\0" * 100, RATE, path) == 0  # too short to learn from
+    for seed in range(3):
+        count = add_template(pcm(word(NOVA), seed=seed), RATE, path)
+    assert count == 2
+    assert len(load_templates(path)) == 2
@@ -93,6 +93,12 @@ function startWakeWordListener() {
     
     if (result && result.status === "wake_word_detected") {
       toggleListening();
+    } else if (result && result.status === "responding") {
+      // Command was spoken with the wake word; the reply is already on its way.
+      // The backend ignores wake words while NOVA speaks; talking over it is a barge-in.
+      const status = document.getElementById("status-text");
+      if (status) status.innerText = "🧠 PROCESSING...";
+      setTimeout(startWakeWordListener, 100);
     } else {
       // Continue listening for wake word
       setTimeout(startWakeWordListener, 100);
@@ -218,6 +224,10 @@ function onAuthSuccess(user) {
   }
 
   addMessage("nova", "Neural link active. Systems fully operational.");
+
+  pywebview.api.get_engine_status().then(result => {
+    if (result && result.ready) window.setEngineStatus(true);
+  }).catch(error => console.error("Engine status error:", error));
   
   // Start wake word listener
   setTimeout(startWakeWordListener, 1000);
@@ -371,6 +381,12 @@ window.updateStatus = function(status, userInput) {
   }
 };
 
+// Interim transcript from offline speech recognition
+window.showPartial = function(text) {
+  const statusEl = document.getElementById("status-text");
+  if (statusEl) statusEl.innerText = "🎤 " + text.toUpperCase() + "...";
+};
+
 // Start responding phase
 window.startResponding = function() {
   const statusEl = document.getElementById("status-text");
@@ -379,13 +395,27 @@ window.startResponding = function() {
 
 // Finish responding phase
 window.finishResponding = function() {
+  currentStreamMsg = null;
   const statusEl = document.getElementById("status-text");
   if (statusEl) statusEl.innerText = "SYSTEM STANDBY";
   resetMic();
   startWakeWordListener();
 };
 
-// Word streaming from backend
+// The user talked over NOVA: drop the rest of the answer and listen right away
+window.bargeIn = function() {
+  currentStreamMsg = null;
+  resetMic();
+  toggleListening();
+};
+
+// Model warm-up result from backend
+window.setEngineStatus = function(ready) {
+  const el = document.getElementById("engine-status");
+  if (el) el.innerText = ready ? "READY" : "OFFLINE";
+};
+
+// Word streaming from backend (total is 0 while the response is still streaming)
 let currentStreamMsg = null;
 window.streamWord = function(word, index, total) {
   if (index === 0) {
@@ -401,11 +431,16 @@ window.streamWord = function(word, index, total) {
     if (chatBox) chatBox.scrollTop = chatBox.scrollHeight;
   }
   
-  if (index === total - 1) {
+  if (total && index === total - 1) {
     currentStreamMsg = null;
   }
 };
 
+// Batched word streaming: [[word, index, total], ...] in one call per frame
+window.streamWords = function(batch) {
+  batch.forEach(([word, index, total]) => window.streamWord(word, index, total));
+};
+
 function resetMic() {
   isListening = false;
 